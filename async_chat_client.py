@@ -0,0 +1,426 @@
+# async_chat_client.py
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from hybrid_protocol import ChatProtocol, FrameBuffer
+from ping_tracker import PingTracker
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    """UDP datagramlarını AsyncChatClient'a iletir"""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def datagram_received(self, data, addr):
+        self.client._handle_udp(data, addr)
+    
+    def error_received(self, exc):
+        logging.warning(f"[{self.client.username}] UDP hatası: {exc}")
+
+
+class AsyncChatClient:
+    """GUI ve thread gerektirmeyen asyncio tabanlı istemci
+    
+    Bot ve otomasyon senaryoları için tasarlanmıştır: tek bir event loop
+    içinde yüzlerce oturum çalıştırılabilir. Gelen mesajlar events() ile
+    async iterator olarak okunur:
+        
+        client = AsyncChatClient()
+        await client.connect("bot1")
+        await client.send_message("merhaba")
+        async for event in client.events():
+            print(event["type"], event["user"], event["content"])
+    
+    Olaylar protokol mesajlarının kendisidir (type: CHAT, DIRECT, JOIN,
+    LEAVE, USERS, TOPO, PONG). ACK ve REPLAY gibi iç mesajlar olay olarak
+    verilmez; replay içindeki mesajlar tek tek CHAT/DIRECT olarak gelir.
+    PONG olaylarında ölçülen gecikme "target" ve "rtt_ms" alanlarındadır.
+    Olay kuyruğu max_events ile sınırlıdır; okunmayan olaylar birikirse en
+    eskileri atılır.
+    """
+    
+    def __init__(self, server_ip="127.0.0.1", tcp_port=12345, udp_port=12346,
+                 max_retries=3, ack_timeout=1.0, max_events=10000):
+        self.server_ip = server_ip
+        self.tcp_port = tcp_port
+        self.udp_port = udp_port
+        self.max_retries = max_retries
+        self.ack_timeout = ack_timeout  # saniye
+        
+        self.username = None
+        self.connected = False
+        self.reader = None
+        self.writer = None
+        self.udp_transport = None
+        
+        self.pending_acks = {}  # {msg_id: asyncio.Future}
+        self.pending_requests = {}  # {msg_type: [asyncio.Future]} USERS/TOPO yanıtları için
+        self.events_queue = asyncio.Queue(max_events)
+        self.dropped_events = 0
+        self.pings = PingTracker(timeout=5.0)
+        self._msg_counter = itertools.count()
+        self._reader_task = None
+        self._closing = False
+        
+        # Otomatik yeniden bağlanma ve oturum devamı
+        self.auto_reconnect = True
+        self.reconnect_base_delay = 0.5  # saniye
+        self.reconnect_max_delay = 30.0  # saniye
+        self.session_token = None
+        self.last_seen_id = 0
+        self.seen_sids = set()
+        self.seen_sid_order = deque()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def connect(self, username):
+        """Sunucuya bağlanır, başarılıysa True döndürür"""
+        self.username = username
+        self._closing = False
+        loop = asyncio.get_running_loop()
+        
+        try:
+            if not await self._open_session():
+                logging.error(f"[{username}] Doğrulama başarısız!")
+                return False
+            
+            self.udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _UDPProtocol(self),
+                local_addr=("0.0.0.0", 0)
+            )
+        except OSError as e:
+            logging.error(f"[{username}] Bağlantı hatası: {e}")
+            return False
+        
+        self.connected = True
+        self._reader_task = asyncio.create_task(self._read_tcp())
+        
+        # Sunucunun UDP adresimizi öğrenmesi için ping gönder
+        self.ping()
+        return True
+    
+    async def _open_session(self):
+        """TCP bağlantısını kurar ve AUTH ile oturumu açar veya devam ettirir"""
+        # Önceki bağlantı varsa transport'unu kapat
+        await self._close_writer()
+        
+        # Büyük topoloji yanıtları için satır sınırını çerçeve sınırına yükselt
+        self.reader, self.writer = await asyncio.open_connection(
+            self.server_ip, self.tcp_port, limit=FrameBuffer.MAX_FRAME_SIZE
+        )
+        
+        if self.session_token:
+            auth_content = {"session": self.session_token, "last_id": self.last_seen_id}
+        else:
+            auth_content = "Bağlanıyor"
+        
+        await self._send_tcp(ChatProtocol.encode(ChatProtocol.MSG_AUTH, self.username, auth_content))
+        
+        response = ChatProtocol.decode(await self.reader.readline())
+        if not response or response["type"] != ChatProtocol.MSG_AUTH:
+            await self._close_writer()
+            return False
+        
+        content = response["content"]
+        if isinstance(content, dict):
+            self.session_token = content.get("session")
+            if not content.get("resumed"):
+                self.last_seen_id = content.get("last_id", 0)
+                self.seen_sids.clear()
+                self.seen_sid_order.clear()
+        
+        logging.info(f"[{self.username}] Sunucuya bağlanıldı")
+        return True
+    
+    async def _close_writer(self):
+        """TCP yazıcısını kapatır ve transport'un kapanmasını bekler"""
+        writer, self.writer = self.writer, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+    
+    async def close(self):
+        """Bağlantıyı kapatır ve events() iteratörünü sonlandırır"""
+        self._closing = True
+        self.connected = False
+        
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        
+        await self._close_writer()
+        if self.udp_transport:
+            self.udp_transport.close()
+        
+        for future in self.pending_acks.values():
+            if not future.done():
+                future.set_result(False)
+        self.pending_acks.clear()
+        
+        self._put_event(None)
+    
+    async def events(self):
+        """Gelen olayları async iterator olarak döndürür"""
+        while True:
+            event = await self.events_queue.get()
+            if event is None:
+                return
+            yield event
+    
+    def __aiter__(self):
+        return self.events()
+    
+    def _put_event(self, event):
+        """Olayı kuyruğa ekler; kuyruk doluysa en eski olayı atar"""
+        if self.events_queue.full():
+            self.events_queue.get_nowait()
+            self.dropped_events += 1
+            if self.dropped_events % 1000 == 1:
+                logging.warning(f"[{self.username}] Olay kuyruğu dolu, eski olaylar atılıyor")
+        self.events_queue.put_nowait(event)
+    
+    async def _send_tcp(self, data):
+        """Kodlanmış mesajı çerçeveleyip TCP üzerinden gönderir"""
+        if self.writer is None:
+            raise ConnectionError("TCP bağlantısı yok")
+        self.writer.write(ChatProtocol.frame(data))
+        await self.writer.drain()
+    
+    def _send_udp(self, data):
+        """Kodlanmış mesajı sunucuya UDP ile gönderir"""
+        self.udp_transport.sendto(data, (self.server_ip, self.udp_port))
+    
+    def _next_msg_id(self):
+        """Aynı milisaniyede gönderilen mesajlar için de benzersiz ID üretir"""
+        return f"{int(time.time() * 1000)}-{next(self._msg_counter)}"
+    
+    async def send_message(self, content):
+        """Sohbet mesajı gönderir, ACK gelirse True döndürür"""
+        return await self._send_reliable(ChatProtocol.MSG_CHAT, content)
+    
+    async def send_direct_message(self, recipient, content):
+        """Özel mesaj gönderir, ACK gelirse True döndürür"""
+        return await self._send_reliable(ChatProtocol.MSG_DIRECT, content, recipient)
+    
+    async def _send_reliable(self, msg_type, content, recipient=None):
+        """Mesajı gönderir, ACK gelmezse max_retries kez yeniden dener"""
+        if not self.connected:
+            return False
+        
+        msg_id = self._next_msg_id()
+        data = ChatProtocol.encode(msg_type, self.username, content, msg_id, recipient=recipient)
+        future = asyncio.get_running_loop().create_future()
+        self.pending_acks[msg_id] = future
+        
+        try:
+            for attempt in range(self.max_retries):
+                self._send_udp(data)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), self.ack_timeout)
+                except asyncio.TimeoutError:
+                    logging.debug(f"[{self.username}] [{msg_id}] Deneme {attempt + 1}/{self.max_retries}...")
+            return False
+        finally:
+            self.pending_acks.pop(msg_id, None)
+    
+    async def get_user_list(self):
+        """Kullanıcı listesini ister ve yanıtı bekler"""
+        response = await self._request(ChatProtocol.MSG_USERS, "Kullanıcı listesi")
+        return response["content"] if response else None
+    
+    async def request_topology(self):
+        """Topoloji verisini ister ve yanıtı bekler"""
+        response = await self._request(ChatProtocol.MSG_TOPO, "GET")
+        return response["content"] if response else None
+    
+    async def _request(self, msg_type, content, timeout=5.0):
+        """TCP isteği gönderir ve aynı tipteki ilk yanıtı bekler"""
+        if not self.connected:
+            return None
+        
+        future = asyncio.get_running_loop().create_future()
+        self.pending_requests.setdefault(msg_type, []).append(future)
+        
+        try:
+            await self._send_tcp(ChatProtocol.encode(msg_type, self.username, content))
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            logging.warning(f"[{self.username}] {msg_type} isteği başarısız: {e}")
+            return None
+        finally:
+            waiters = self.pending_requests.get(msg_type, [])
+            if future in waiters:
+                waiters.remove(future)
+    
+    def ping(self, target_username=None):
+        """Sunucuya veya (target_username verilirse) bir kullanıcıya ping gönderir
+        
+        Ping'in nonce'unu döndürür; yanıt PONG olayı olarak gelir.
+        """
+        if not self.udp_transport:
+            return None
+        
+        # Yanıtı gelmeyen eski ping'leri kayıp say
+        self.pings.expire()
+        
+        nonce = self.pings.new_probe(target_username or "SERVER")
+        ping = ChatProtocol.encode(
+            ChatProtocol.MSG_PING,
+            self.username,
+            nonce,
+            nonce,
+            recipient=target_username
+        )
+        self._send_udp(ping)
+        return nonce
+    
+    async def _read_tcp(self):
+        """TCP mesajlarını okur, bağlantı koparsa yeniden bağlanır"""
+        while not self._closing:
+            try:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError("Sunucu bağlantıyı kapattı")
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+                # ValueError: satır sınırı aşıldı, akış senkronu kaybolduğu için
+                # bağlantı yenilenir (kaçırılan mesajlar replay ile gelir)
+                self.connected = False
+                await self._close_writer()
+                if self._closing or not self.auto_reconnect:
+                    if isinstance(e, ValueError):
+                        logging.error(f"[{self.username}] Çok büyük TCP çerçevesi: {e}")
+                    break
+                logging.warning(f"[{self.username}] TCP bağlantısı koptu: {e}")
+                if not await self._reconnect():
+                    break
+                continue
+            
+            message = ChatProtocol.decode(line)
+            if message:
+                self._handle_tcp(message)
+        
+        self.connected = False
+    
+    async def _reconnect(self):
+        """Jitter'lı üstel geri çekilme ile yeniden bağlanır"""
+        attempt = 0
+        while not self._closing:
+            backoff = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** min(attempt, 16)))
+            await asyncio.sleep(random.uniform(0, backoff))
+            
+            try:
+                if await self._open_session():
+                    self.connected = True
+                    self.ping()
+                    return True
+            except OSError as e:
+                logging.debug(f"[{self.username}] Yeniden bağlanma hatası: {e}")
+            
+            attempt += 1
+        return False
+    
+    def _handle_tcp(self, message):
+        """TCP mesajını işler"""
+        msg_type = message["type"]
+        
+        # Bekleyen istek varsa yanıtı ona ver
+        waiters = self.pending_requests.get(msg_type)
+        if waiters:
+            future = waiters.pop(0)
+            if not future.done():
+                future.set_result(message)
+        
+        if msg_type == ChatProtocol.MSG_REPLAY:
+            for missed in message["content"]:
+                self._deliver(missed)
+        else:
+            self._put_event(message)
+    
+    def _handle_udp(self, data, addr):
+        """UDP mesajını işler"""
+        message = ChatProtocol.decode(data)
+        if not message:
+            return
+        
+        msg_type = message["type"]
+        
+        if msg_type == ChatProtocol.MSG_ACK:
+            future = self.pending_acks.get(message["content"])
+            if future and not future.done():
+                future.set_result(True)
+        
+        elif msg_type == ChatProtocol.MSG_PING:
+            # Ping mesajına PONG ile cevap ver
+            pong = ChatProtocol.encode(
+                ChatProtocol.MSG_PONG,
+                self.username,
+                message["id"],
+                recipient=message["user"]
+            )
+            self.udp_transport.sendto(pong, addr)
+        
+        elif msg_type == ChatProtocol.MSG_PONG:
+            result = self.pings.complete(message["content"])
+            if result is not None:
+                message["target"], message["rtt_ms"] = result
+                self._put_event(message)
+        
+        elif msg_type == ChatProtocol.MSG_DIRECT:
+            if message.get("recipient") == self.username:
+                self._deliver(message)
+                
+                # Mesajı aldığımızı bildir
+                ack = ChatProtocol.encode(ChatProtocol.MSG_ACK, self.username, message["id"])
+                self.udp_transport.sendto(ack, addr)
+        
+        elif msg_type == ChatProtocol.MSG_CHAT:
+            self._deliver(message)
+        
+        else:
+            self._put_event(message)
+    
+    def _deliver(self, message):
+        """Sohbet/özel mesajı tekrarları ayıklayarak olay kuyruğuna ekler"""
+        sid = message.get("sid")
+        if sid is not None:
+            if sid in self.seen_sids:
+                return
+            self.seen_sids.add(sid)
+            self.seen_sid_order.append(sid)
+            if len(self.seen_sid_order) > 1000:
+                self.seen_sids.discard(self.seen_sid_order.popleft())
+            self.last_seen_id = max(self.last_seen_id, sid)
+        
+        self._put_event(message)
+
+
+async def _demo(count=100, server_ip="127.0.0.1"):
+    """Tek süreçte çok sayıda bot oturumu açıp birer mesaj gönderir"""
+    bots = [AsyncChatClient(server_ip) for _ in range(count)]
+    results = await asyncio.gather(*(bot.connect(f"bot{i}") for i, bot in enumerate(bots)))
+    print(f"{sum(results)}/{count} bot bağlandı")
+    
+    sent = await asyncio.gather(*(bot.send_message(f"merhaba, ben bot{i}") for i, bot in enumerate(bots)))
+    print(f"{sum(sent)}/{count} mesaj onaylandı")
+    
+    await asyncio.gather(*(bot.close() for bot in bots))
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
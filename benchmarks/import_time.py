@@ -0,0 +1,57 @@
+# benchmarks/import_time.py
+# Soğuk başlangıç: her modül yeni bir yorumlayıcıda import edilir, süre ve yüklenen ağır bağımlılıklar yazılır
+# Kullanım: python benchmarks/import_time.py [tekrar sayısı]
+import os
+import sys
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = [
+    "performance_metrices",
+    "hybrid_chat_client_fixed",
+    "chat_gui",
+    "performance_viewer",
+    "topology_view_fixed",
+]
+
+HEAVY = ("matplotlib", "numpy", "tkinter")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(module, repeat):
+    """Modülün en iyi import süresini (ms) ve yüklenen ağır bağımlılıkları döndürür"""
+    best = None
+    loaded = ""
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        elapsed, _, loaded = result.stdout.strip().splitlines()[-1].partition(" ")
+        elapsed = float(elapsed)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    print(f"{'Modül':<28}{'Süre':>10}  Yüklenen ağır bağımlılıklar")
+    for module in MODULES:
+        elapsed, loaded = measure(module, repeat)
+        if elapsed is None:
+            print(f"{module:<28}{'hata':>10}  {loaded}")
+        else:
+            print(f"{module:<28}{elapsed:>8.1f}ms  {loaded or '-'}")
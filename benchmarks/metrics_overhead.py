@@ -0,0 +1,70 @@
+# benchmarks/metrics_overhead.py
+# Paket başına metrik maliyeti: metrik kapalı / eski kilitli sayaç / parçalı sayaç
+# Kullanım: python benchmarks/metrics_overhead.py [paket sayısı] [thread sayısı]
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from performance_metrices import PerformanceMetrics
+
+
+class LockedCounters:
+    """Karşılaştırma için önceki uygulama: her pakette ortak kilit"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bytes_received = 0
+    
+    def record_message_received(self, size_bytes):
+        with self.lock:
+            self.bytes_received += size_bytes
+
+
+def receive_loop(record, packets):
+    """Alım döngüsünü taklit eder: paket başına bir kayıt çağrısı"""
+    data = b"x" * 200
+    if record is None:
+        for _ in range(packets):
+            len(data)
+    else:
+        for _ in range(packets):
+            record(len(data))
+
+
+def run(record, packets, threads):
+    """Tüm thread'lerin bitme süresini paket başına nanosaniye olarak döndürür"""
+    workers = [threading.Thread(target=receive_loop, args=(record, packets)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (packets * threads) * 1e9
+
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    
+    metrics = PerformanceMetrics()
+    metrics.collection_interval = 0.01  # Toplayıcı da sürekli okusun
+    locked = LockedCounters()
+    
+    cases = [
+        ("Metrik kapalı", None),
+        ("Kilitli sayaç (eski)", locked.record_message_received),
+        ("Parçalı sayaç", metrics.record_message_received),
+    ]
+    
+    print(f"{packets} paket x {threads} thread")
+    baseline = None
+    for name, record in cases:
+        per_packet = min(run(record, packets, threads) for _ in range(3))
+        if baseline is None:
+            baseline = per_packet
+        print(f"{name:<24}{per_packet:>8.1f} ns/paket  (+{per_packet - baseline:.1f} ns)")
+    
+    metrics.stop()
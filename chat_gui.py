@@ -5,8 +5,6 @@ import threading
 from hybrid_chat_client_fixed import HybridChatClient
 import time
 from datetime import datetime
-from topology_view_fixed import TopologyView
-from performance_metrices import PerformanceViewer
 
 class ModernChatGUI:
     def __init__(self):
@@ -34,6 +32,11 @@ class ModernChatGUI:
         # İstemci oluştur
         self.client = HybridChatClient()
         
+        # Ağ olayları kuyruğa alınır ve sadece Tk thread'inde işlenir
+        self.client.enable_event_queue()
+        self.event_pump_interval = 30  # ms
+        self.max_events_per_tick = 200
+        
         # Oturum durumu
         self.is_logged_in = False
         self.protocol_logs = []  # Protokol mesajlarını burada saklarız
@@ -50,12 +53,41 @@ class ModernChatGUI:
         self.client.on_user_leave = self.on_user_leave
         self.client.on_user_list = self.on_user_list
         self.client.on_direct_message = self.on_direct_message
+        self.client.on_connection_state = self.on_connection_state
+        
+        # Olay pompasını başlat
+        self.start_event_pump()
+        
+        # Kapanışta istemci durdurulur (metrik kaydı ve uç nokta dahil)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_app_close)
         
         # Kullanıcı adı al ve bağlan
         self.login()
         
         self.root.mainloop()
     
+    def on_app_close(self):
+        """Ana pencere kapatıldığında istemciyi durdurur"""
+        try:
+            self.client.disconnect()
+        except Exception as e:
+            print(f"[ERROR] İstemci kapatılırken hata: {e}")
+        self.root.destroy()
+    
+    def start_event_pump(self):
+        """İstemci olay kuyruğunu düzenli aralıklarla Tk thread'inde boşaltır"""
+        def pump():
+            try:
+                self.client.drain_events(self.max_events_per_tick)
+            except Exception as e:
+                print(f"[ERROR] Olay pompası hatası: {e}")
+            
+            # Kuyrukta hâlâ olay varsa beklemeden devam et
+            delay = 1 if self.client.event_queue else self.event_pump_interval
+            self.root.after(delay, pump)
+        
+        pump()
+    
     def create_widgets(self):
         # Ana frame
         self.main_frame = tk.Frame(self.root, bg=self.colors["bg"])
@@ -250,8 +282,9 @@ class ModernChatGUI:
             # Pencere kapatma işleyicisi
             self.perf_window.protocol("WM_DELETE_WINDOW", lambda: self.close_performance_window())
             
-            # Performans görüntüleyici oluştur
+            # Performans görüntüleyici oluştur (matplotlib ilk açılışta yüklenir)
             try:
+                from performance_viewer import PerformanceViewer
                 self.perf_viewer = PerformanceViewer(self.perf_window, self.client.metrics)
                 print("[DEBUG] Performans penceresi başarıyla oluşturuldu")
             except Exception as e:
@@ -323,11 +356,15 @@ class ModernChatGUI:
             self.root.destroy()
             return
         
-        # Bağlantı için thread başlat
+        self.connection_status.config(fg="#f39c12")  # Bağlanıyor (sarı)
+        
+        # Bağlantı thread'de kurulur, sonuç Tk thread'ine olay olarak gönderilir
         def connect():
-            self.connection_status.config(fg="#f39c12")  # Bağlanıyor (sarı)
-            
-            if self.client.connect(username):
+            success = self.client.connect(username)
+            self.client.post_event(on_connected, success)
+        
+        def on_connected(success):
+            if success:
                 self.is_logged_in = True
                 self.connection_status.config(fg=self.colors["status"])  # Bağlandı (yeşil)
                 self.header_title.config(text=f"Hibrit Chat - {username}")
@@ -370,9 +407,8 @@ class ModernChatGUI:
         })
 
         
-        # Gönderme işlemi için thread başlat
-        def send():
-            success = self.client.send_message(message)
+        # ACK sonucu geldiğinde çağrılır, gönderim beklemeden devam eder
+        def on_sent(success):
             if success:
                 # Mesaj başarıyla gönderildi
                 current_time = time.strftime("%H:%M:%S")
@@ -380,7 +416,7 @@ class ModernChatGUI:
             else:
                 self.add_system_message("Mesaj gönderilemedi! Bağlantınızı kontrol edin.")
         
-        threading.Thread(target=send).start()
+        self.client.send_message_async(message, callback=on_sent)
     
     def refresh_users(self):
         """Kullanıcı listesini yenileme"""
@@ -588,6 +624,18 @@ class ModernChatGUI:
         self.add_system_message(message)
         self.refresh_users()
     
+    def on_connection_state(self, state):
+        """Bağlantı koptuğunda veya yeniden kurulduğunda çağrılır"""
+        if state == "connected":
+            self.connection_status.config(fg=self.colors["status"])  # Bağlandı (yeşil)
+            self.add_system_message("Sunucuya yeniden bağlanıldı")
+        elif state == "reconnecting":
+            self.connection_status.config(fg="#f39c12")  # Bağlanıyor (sarı)
+            self.add_system_message("Bağlantı koptu, yeniden bağlanılıyor...")
+        else:
+            self.connection_status.config(fg="#e74c3c")  # Bağlantı hatası (kırmızı)
+            self.add_system_message("Sunucu bağlantısı kapandı.")
+    
     def on_user_list(self, users):
         """Kullanıcı listesi geldiğinde çağrılır"""
         self.update_user_list(users)
@@ -638,7 +686,8 @@ class ModernChatGUI:
         topo_window.transient(self.root)
         topo_window.protocol("WM_DELETE_WINDOW", lambda: self.close_topology_window(topo_window))
         
-        # Topoloji görünümü
+        # Topoloji görünümü (modül ve NumPy ilk açılışta yüklenir)
+        from topology_view_fixed import TopologyView
         topo_view = TopologyView(topo_window, width=680, height=500)
         
         # Debug bilgisi etiketi
@@ -1063,8 +1112,7 @@ class PrivateChatWindow:
         # Mesajı gönder
         timestamp = time.strftime("%H:%M:%S")
         
-        def send():
-            success = self.client.send_direct_message(self.recipient, content)
+        def on_sent(success):
             if success:
                 # Mesaj geçmişine ekle
                 self.add_message_to_history(self.username, content, timestamp)
@@ -1086,7 +1134,7 @@ class PrivateChatWindow:
         self.add_my_message(content, timestamp)
         
         # Asenkron olarak gönder
-        threading.Thread(target=send).start()
+        self.client.send_direct_message_async(self.recipient, content, callback=on_sent)
     
     def receive_message(self, content, timestamp):
         """Karşı taraftan gelen mesajı göster"""
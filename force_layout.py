@@ -0,0 +1,249 @@
+# force_layout.py
+import math
+import random
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy bulunamadı. Topoloji daire düzeninde gösterilecek.")
+
+
+def circle_layout(usernames, width, height):
+    """Düğümleri tek bir daire üzerine yerleştirir (NumPy yoksa kullanılır)"""
+    positions = {}
+    
+    count = len(usernames)
+    if count == 0:
+        return positions
+    
+    # Tek düğüm varsa merkezde olsun
+    if count == 1:
+        positions[usernames[0]] = (width / 2, height / 2)
+        return positions
+    
+    # Çoklu düğümler için daire üzerinde yerleştir
+    radius = min(width, height) * 0.35
+    center_x = width / 2
+    center_y = height / 2
+    
+    for i, username in enumerate(usernames):
+        angle = i * (2 * math.pi / count)
+        x = center_x + radius * math.cos(angle)
+        y = center_y + radius * math.sin(angle)
+        positions[username] = (x, y)
+    
+    return positions
+
+
+class ForceLayout:
+    """NumPy ile vektörleştirilmiş kuvvet yönelimli (Fruchterman-Reingold) yerleşim
+    
+    - İtme: küçük grafiklerde tüm çiftler, büyük grafiklerde çok seviyeli ızgara
+      yaklaşımı (yakın hücreler birebir, uzak hücreler ağırlık merkeziyle)
+    - Yay: bağlantı gecikmesi arttıkça çekim zayıflar, yüksek gecikmeli düğümler uzakta kalır
+    - Soğuma: adım büyüklüğü her iterasyonda azalır
+    - Sıcak başlangıç: önceki pozisyonlar korunur, yeni düğümler komşularının yanına konur
+    """
+    
+    def __init__(self, width, height, iterations=60, grid_threshold=300, margin=30):
+        self.width = width
+        self.height = height
+        self.iterations = iterations
+        self.grid_threshold = grid_threshold  # Bu düğüm sayısının üstünde ızgara yaklaşımı
+        self.margin = margin
+    
+    def compute(self, usernames, edges, previous=None):
+        """{username: (x, y)} döndürür
+        
+        edges: [(user1, user2, gecikme_ms veya None)], previous: önceki pozisyonlar
+        """
+        usernames = list(usernames)
+        if not NUMPY_AVAILABLE or len(usernames) < 3:
+            return circle_layout(usernames, self.width, self.height)
+        
+        previous = previous or {}
+        n = len(usernames)
+        index = {name: i for i, name in enumerate(usernames)}
+        
+        # Bağlantı dizileri
+        pairs = [(index[a], index[b], latency) for a, b, latency in edges
+                 if a in index and b in index and a != b]
+        if pairs:
+            src = np.array([p[0] for p in pairs], dtype=np.intp)
+            dst = np.array([p[1] for p in pairs], dtype=np.intp)
+            latency = np.array([p[2] if p[2] is not None else 0.0 for p in pairs], dtype=np.float64)
+            weight = 1.0 / (1.0 + latency / 100.0)  # 100 ms'de yarı çekim
+        else:
+            src = dst = np.zeros(0, dtype=np.intp)
+            weight = np.zeros(0)
+        
+        pos, warm_ratio = self._initial_positions(usernames, index, pairs, previous)
+        
+        area = (self.width - 2 * self.margin) * (self.height - 2 * self.margin)
+        k = math.sqrt(area / n)
+        
+        # Sıcak başlangıçta düğümler zaten yerinde; daha düşük sıcaklıkla başla
+        # (iterasyon sayısı da yarıya iner)
+        warm = warm_ratio >= 0.5
+        iterations = self.iterations // 2 if warm else self.iterations
+        temperature = max(self.width, self.height) / (40 if warm else 10)
+        cooling = 0.01 ** (1.0 / iterations)
+        
+        for _ in range(iterations):
+            if n > self.grid_threshold:
+                disp = self._grid_repulsion(pos, k)
+            else:
+                disp = self._exact_repulsion(pos, k)
+            
+            # Yay kuvvetleri (çekim): w * d^2 / k, bağlantı boyunca
+            if len(src):
+                delta = pos[src] - pos[dst]
+                dist = np.sqrt((delta ** 2).sum(axis=1)) + 1e-9
+                force = (weight * dist / k)[:, None] * delta
+                np.subtract.at(disp, src, force)
+                np.add.at(disp, dst, force)
+            
+            # Yer değiştirme sıcaklıkla sınırlanır
+            length = np.sqrt((disp ** 2).sum(axis=1)) + 1e-9
+            pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+            
+            np.clip(pos[:, 0], self.margin, self.width - self.margin, out=pos[:, 0])
+            np.clip(pos[:, 1], self.margin, self.height - self.margin, out=pos[:, 1])
+            temperature *= cooling
+        
+        return {name: (float(pos[i, 0]), float(pos[i, 1])) for i, name in enumerate(usernames)}
+    
+    def _initial_positions(self, usernames, index, pairs, previous):
+        """Önceki pozisyonlardan başlangıç dizisi kurar, (dizi, korunan oran) döndürür"""
+        n = len(usernames)
+        pos = np.empty((n, 2))
+        known = np.zeros(n, dtype=bool)
+        for i, name in enumerate(usernames):
+            if name in previous:
+                pos[i] = previous[name]
+                known[i] = True
+        
+        # Yeni düğümler: bilinen bir komşunun yakınına, yoksa rastgele
+        neighbor = {}
+        for a, b, _ in pairs:
+            if known[a] and not known[b]:
+                neighbor.setdefault(b, a)
+            elif known[b] and not known[a]:
+                neighbor.setdefault(a, b)
+        
+        jitter = min(self.width, self.height) / 20
+        for i in np.flatnonzero(~known):
+            if i in neighbor:
+                x, y = pos[neighbor[i]]
+                pos[i] = (x + random.uniform(-jitter, jitter), y + random.uniform(-jitter, jitter))
+            else:
+                pos[i] = (random.uniform(self.margin, self.width - self.margin),
+                          random.uniform(self.margin, self.height - self.margin))
+        
+        return pos, known.sum() / n
+    
+    @staticmethod
+    def _exact_repulsion(pos, k):
+        """Tüm düğüm çiftleri arasında k^2 / d itme
+        
+        sum_j s_ij (p_i - p_j) = p_i * sum_j s_ij - (S @ p)_i ile 3 boyutlu dizi kurulmaz.
+        """
+        x = pos[:, 0]
+        y = pos[:, 1]
+        dx = x[:, None] - x[None, :]
+        dy = y[:, None] - y[None, :]
+        strength = (k * k) / np.maximum(dx * dx + dy * dy, 0.01)
+        np.fill_diagonal(strength, 0.0)
+        return pos * strength.sum(axis=1)[:, None] - strength @ pos
+    
+    @staticmethod
+    def _grid_repulsion(pos, k, per_cell=4):
+        """Çok seviyeli ızgara yaklaşımıyla itme: O(n log n)
+        
+        En ince ızgarada düğümün kendi hücresi ve 8 komşu hücresindeki düğümler
+        birebir hesaplanır. Daha uzaktaki düğümler, her seviyede hücrenin üst
+        hücresinin komşularının alt hücrelerinden kendi komşusu olmayanlar
+        (en fazla 27 hücre) olarak, ağırlık merkezi ve düğüm sayısıyla tek nokta
+        gibi hesaplanır. Her düğüm çifti tam olarak bir seviyede sayılır.
+        """
+        n = len(pos)
+        kk = k * k
+        levels = max(2, int(math.ceil(math.log2(math.sqrt(n / per_cell)))))
+        lo = pos.min(axis=0)
+        span = np.maximum(pos.max(axis=0) - lo, 1e-6)
+        unit = (pos - lo) / span  # [0, 1] aralığına ölçeklenmiş
+        disp = np.zeros_like(pos)
+        
+        # Uzak alan: kaba seviyeden (4x4) en ince seviyeye
+        offsets = np.arange(-2, 4)
+        for level in range(2, levels + 1):
+            g = 1 << level
+            cell_xy = np.minimum((unit * g).astype(np.intp), g - 1)
+            cell = cell_xy[:, 0] * g + cell_xy[:, 1]
+            counts = np.bincount(cell, minlength=g * g)
+            filled = np.maximum(counts, 1)
+            cx = np.bincount(cell, pos[:, 0], g * g) / filled
+            cy = np.bincount(cell, pos[:, 1], g * g) / filled
+            
+            # Aday hücreler: üst hücrenin 3x3 komşuluğunun alt hücreleri (6x6)
+            base = (cell_xy >> 1) * 2
+            tx = base[:, 0, None, None] + offsets[None, :, None]  # (n, 6, 1)
+            ty = base[:, 1, None, None] + offsets[None, None, :]  # (n, 1, 6)
+            tx, ty = np.broadcast_arrays(tx, ty)
+            tx = tx.reshape(n, -1)
+            ty = ty.reshape(n, -1)
+            far = (np.maximum(np.abs(tx - cell_xy[:, 0, None]), np.abs(ty - cell_xy[:, 1, None])) > 1)
+            far &= (tx >= 0) & (tx < g) & (ty >= 0) & (ty < g)
+            rows, cols = np.nonzero(far)
+            target = tx[rows, cols] * g + ty[rows, cols]
+            mass = counts[target]
+            keep = mass > 0
+            rows = rows[keep]
+            target = target[keep]
+            mass = mass[keep]
+            
+            dx = pos[rows, 0] - cx[target]
+            dy = pos[rows, 1] - cy[target]
+            strength = mass * kk / np.maximum(dx * dx + dy * dy, 0.01)
+            disp[:, 0] += np.bincount(rows, dx * strength, n)
+            disp[:, 1] += np.bincount(rows, dy * strength, n)
+        
+        # Yakın alan: en ince seviyede aynı ve komşu hücrelerdeki düğüm çiftleri birebir
+        order = np.argsort(cell, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        occupied = np.flatnonzero(counts)
+        ox = occupied // g
+        oy = occupied % g
+        cell_a = []
+        cell_b = []
+        for step_x in (-1, 0, 1):
+            for step_y in (-1, 0, 1):
+                nx = ox + step_x
+                ny = oy + step_y
+                inside = (nx >= 0) & (nx < g) & (ny >= 0) & (ny < g)
+                neighbor = nx[inside] * g + ny[inside]
+                has_nodes = counts[neighbor] > 0
+                cell_a.append(occupied[inside][has_nodes])
+                cell_b.append(neighbor[has_nodes])
+        cell_a = np.concatenate(cell_a)
+        cell_b = np.concatenate(cell_b)
+        
+        # Hücre çiftlerini düğüm çiftlerine aç: çift başına counts[a] * counts[b] eleman
+        count_b = counts[cell_b]
+        sizes = counts[cell_a] * count_b
+        pair_cell = np.repeat(np.arange(len(sizes)), sizes)
+        local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        i = order[starts[cell_a][pair_cell] + local // count_b[pair_cell]]
+        j = order[starts[cell_b][pair_cell] + local % count_b[pair_cell]]
+        distinct = i != j
+        i = i[distinct]
+        j = j[distinct]
+        
+        dx = pos[i, 0] - pos[j, 0]
+        dy = pos[i, 1] - pos[j, 1]
+        strength = kk / np.maximum(dx * dx + dy * dy, 0.01)
+        disp[:, 0] += np.bincount(i, dx * strength, n)
+        disp[:, 1] += np.bincount(i, dy * strength, n)
+        return disp
@@ -4,12 +4,19 @@ import threading
 import time
 import json
 import queue
-from hybrid_protocol import ChatProtocol
+import random
+import itertools
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from hybrid_protocol import ChatProtocol, FrameBuffer
+from ping_tracker import PingTracker
 from network_topology import NetworkTopology
+from link_stats import LinkStats
 from performance_metrices import PerformanceMetrics
 
 class HybridChatClient:
-    def __init__(self, server_ip="127.0.0.1", tcp_port=12345, udp_port=12346):
+    def __init__(self, server_ip="127.0.0.1", tcp_port=12345, udp_port=12346, metrics_port=None,
+                 metrics_record_dir=None):
         self.server_ip = server_ip
         self.tcp_port = tcp_port
         self.udp_port = udp_port
@@ -23,44 +30,78 @@ class HybridChatClient:
         
         self.username = None
         self.connected = False
-        self.pending_acks = {}  # {msg_id: event}
         self.lock = threading.Lock()  # Eklendi
         
+        # Asenkron gönderim: ACK bekleyen mesajlar gönderim sırasıyla tutulur
+        self.outstanding = OrderedDict()  # {msg_id: {"data", "future", "attempts", "deadline"}}
+        self.send_cond = threading.Condition(self.lock)
+        self.max_retries = 3
+        self.ack_timeout = 1.0  # saniye
+        self._msg_counter = itertools.count()
+        self.sender_thread = None
+        
+        # Otomatik yeniden bağlanma ve oturum devamı
+        self.should_stop = threading.Event()  # Sadece disconnect() ile set edilir
+        self.auto_reconnect = True
+        self.reconnect_base_delay = 0.5  # saniye
+        self.reconnect_max_delay = 30.0  # saniye
+        self.session_token = None
+        self.last_seen_id = 0  # Sunucunun verdiği en son mesaj sıra numarası (sid)
+        self.seen_sids = set()  # Replay ile gelen tekrarları ayıklamak için
+        self.seen_sid_order = deque()
+        self.seen_direct = set()  # (gönderen, mesaj id): doğrudan ve aktarılan kopyalar için
+        self.seen_direct_order = deque()
+        self.tcp_frames = FrameBuffer()
+        self.tcp_pending = deque()  # Çözülmeyi bekleyen TCP çerçeveleri
+        
         # Callback fonksiyonları
         self.on_message = None
         self.on_user_join = None
         self.on_user_leave = None
         self.on_user_list = None
+        self.on_connection_state = None  # callback(state): "connected" | "reconnecting" | "disconnected"
+        
+        # GUI modu: callback'ler ağ thread'inde çağrılmaz, bu kuyruğa eklenir ve
+        # drain_events() ile arayüz thread'inde işlenir (None ise doğrudan çağrılır).
+        # deque.append/popleft atomik olduğu için ek kilit gerekmez.
+        self.event_queue = None
         
         # Topoloji için ekle
         self.topology = NetworkTopology()
         self.on_topology_data = None
+        
+        # Sunucu topolojisinin yerel kopyası; sadece TCP dinleyici thread'i değiştirir
+        self.server_topology = {
+            "epoch": None,
+            "version": 0,
+            "nodes": {},
+            "connections": {}  # {(user1, user2): bağlantı} sıralı çift anahtar
+        }
+        
+        # Yanıt bekleyen ping'ler (nonce -> hedef, gönderim zamanı)
+        self.pings = PingTracker(timeout=5.0)
+        
+        # Doğrudan (P2P) özel mesaj yolu: adresler sunucudan alınır, yol ölçülerek seçilir
+        self.p2p_enabled = True
+        self.peers = {}  # {username: {"addr": (ip, port) | None, "stats": LinkStats, "probed": monotonic}}
+        self.peer_pings = PingTracker(timeout=2.0, prefix="peer")  # Doğrudan gönderilen ölçüm ping'leri
+        self.peer_probe_interval = 10.0  # saniye
     
-        # Performans metrikleri
+        # Performans metrikleri (metrics_port verilirse OpenMetrics olarak sunulur,
+        # metrics_record_dir verilirse örnekler diske kaydedilir)
         self.metrics = PerformanceMetrics()
+        if metrics_port is not None:
+            self.metrics.start_exporter(metrics_port)
+        if metrics_record_dir is not None:
+            self.metrics.start_recording(metrics_record_dir)
     
     def connect(self, username):
         """Sunucuya bağlanır"""
         self.username = username
+        self.should_stop.clear()
         
         try:
-            # TCP ile bağlan
-            self.tcp_socket.connect((self.server_ip, self.tcp_port))
-            
-            # Doğrulama mesajı gönder
-            auth_msg = ChatProtocol.encode(
-                ChatProtocol.MSG_AUTH, 
-                username, 
-                "Bağlanıyor"
-            )
-            self.tcp_socket.send(auth_msg)
-            
-            # Yanıt bekle
-            data = self.tcp_socket.recv(1024)
-            response = ChatProtocol.decode(data)
-            
-            if response and response["type"] == ChatProtocol.MSG_AUTH:
-                print(f"Sunucuya bağlanıldı: {response['content']}")
+            if self._open_session():
                 self.connected = True
                 
                 # Dinleyici thread'leri başlat
@@ -72,6 +113,11 @@ class HybridChatClient:
                 udp_thread.daemon = True
                 udp_thread.start()
                 
+                # Yeniden gönderimleri yürüten tek zamanlayıcı thread
+                self.sender_thread = threading.Thread(target=self._send_scheduler)
+                self.sender_thread.daemon = True
+                self.sender_thread.start()
+                
                 return True
             else:
                 print("Doğrulama başarısız!")
@@ -82,83 +128,397 @@ class HybridChatClient:
             print(f"Bağlantı hatası: {e}")
             return False
     
+    def _open_session(self):
+        """TCP bağlantısını kurar ve AUTH ile oturumu açar veya devam ettirir"""
+        self.tcp_socket.connect((self.server_ip, self.tcp_port))
+        self.tcp_frames = FrameBuffer()
+        self.tcp_pending.clear()
+        
+        # Önceki oturum varsa token ve son görülen mesaj ID'si ile devam iste
+        if self.session_token:
+            auth_content = {"session": self.session_token, "last_id": self.last_seen_id}
+        else:
+            auth_content = "Bağlanıyor"
+        
+        # Doğrulama mesajı gönder
+        auth_msg = ChatProtocol.encode(
+            ChatProtocol.MSG_AUTH, 
+            self.username, 
+            auth_content
+        )
+        self.tcp_socket.sendall(ChatProtocol.frame(auth_msg))
+        
+        # Yanıt bekle
+        response = self._recv_tcp_message()
+        if not response or response["type"] != ChatProtocol.MSG_AUTH:
+            return False
+        
+        content = response["content"]
+        if isinstance(content, dict):
+            print(f"Sunucuya bağlanıldı: {content.get('text')}")
+            self.session_token = content.get("session")
+            
+            if not content.get("resumed"):
+                # Yeni oturum (ör. sunucu yeniden başladı): eski geçmiş istenmez
+                with self.lock:
+                    self.last_seen_id = content.get("last_id", 0)
+                    self.seen_sids.clear()
+                    self.seen_sid_order.clear()
+        else:
+            print(f"Sunucuya bağlanıldı: {content}")
+        
+        return True
+    
+    def _reconnect(self):
+        """Bağlantı koptuğunda jitter'lı üstel geri çekilme ile yeniden bağlanır"""
+        self._notify_connection_state("reconnecting")
+        attempt = 0
+        
+        while not self.should_stop.is_set():
+            # Full jitter: sunucu yeniden başladığında tüm istemciler aynı anda gelmez
+            backoff = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** min(attempt, 16)))
+            delay = random.uniform(0, backoff)
+            print(f"[RECONNECT] {delay:.1f} sn sonra yeniden bağlanılacak (deneme {attempt + 1})")
+            if self.should_stop.wait(delay):
+                break
+            
+            try:
+                self.tcp_socket.close()
+            except:
+                pass
+            self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            
+            try:
+                if self._open_session():
+                    self.connected = True
+                    print("[RECONNECT] Sunucuya yeniden bağlanıldı")
+                    self._notify_connection_state("connected")
+                    
+                    # UDP adresini sunucuya bildir ve kullanıcı listesini tazele
+                    self.ping_users()
+                    self.get_user_list()
+                    return True
+            except Exception as e:
+                print(f"[RECONNECT] Yeniden bağlanma hatası: {e}")
+            
+            attempt += 1
+        
+        return False
+    
+    def _notify_connection_state(self, state):
+        """Bağlantı durumu değişikliğini bildirir"""
+        self._emit("on_connection_state", state)
+    
+    def enable_event_queue(self):
+        """Callback'lerin kuyruk üzerinden, drain_events() çağıranın thread'inde çalışmasını sağlar"""
+        if self.event_queue is None:
+            self.event_queue = deque()
+    
+    def post_event(self, callback, *args, **kwargs):
+        """Herhangi bir fonksiyonu olay kuyruğu üzerinden çalıştırılmak üzere ekler"""
+        self._emit(callback, *args, **kwargs)
+    
+    def _emit(self, callback, *args, **kwargs):
+        """Olayı kuyruğa ekler; kuyruk yoksa callback'i hemen çağırır
+        
+        callback bir öznitelik adı ("on_message" gibi) ya da fonksiyon olabilir.
+        Öznitelik adları işlenirken çözülür, böylece o an ayarlı callback kullanılır.
+        """
+        if self.event_queue is not None:
+            self.event_queue.append((callback, args, kwargs))
+            return
+        
+        self._dispatch(callback, args, kwargs)
+    
+    def _dispatch(self, callback, args, kwargs):
+        """Tek bir olayı ilgili callback'e iletir"""
+        if isinstance(callback, str):
+            callback = getattr(self, callback, None)
+        if callback:
+            callback(*args, **kwargs)
+    
+    # Bir tur içinde sadece en son hali önemli olan olaylar
+    COALESCED_EVENTS = ("on_topology_data", "on_user_list")
+    
+    def drain_events(self, max_events=200):
+        """Kuyruktaki olayları işler (arayüz thread'inden çağrılır)
+        
+        Tek turda en fazla max_events olay alınır; aynı turdaki eski topoloji ve
+        kullanıcı listesi olayları atlanıp sadece sonuncusu işlenir.
+        İşlenen olay sayısını döndürür.
+        """
+        if not self.event_queue:
+            return 0
+        
+        batch = []
+        while self.event_queue and len(batch) < max_events:
+            batch.append(self.event_queue.popleft())
+        
+        # Birleştirilebilir olayların son konumunu bul
+        last_index = {}
+        for i, (callback, _, _) in enumerate(batch):
+            if callback in self.COALESCED_EVENTS:
+                last_index[callback] = i
+        
+        for i, (callback, args, kwargs) in enumerate(batch):
+            if callback in last_index and last_index[callback] != i:
+                continue
+            try:
+                self._dispatch(callback, args, kwargs)
+            except Exception as e:
+                print(f"[ERROR] Olay işleme hatası ({callback}): {e}")
+        
+        return len(batch)
+    
     def disconnect(self):
-        """Sunucudan bağlantıyı keser"""
+        """Sunucudan bağlantıyı keser; metrik toplama, kayıt ve uç nokta da durur"""
+        self.should_stop.set()
         self.connected = False
+        self._fail_outstanding()
         try:
             self.tcp_socket.close()
             self.udp_socket.close()
         except:
             pass
+        self.metrics.stop()
     
-    def send_message(self, content):
-        """Sohbet mesajı gönderir (UDP)"""
-        if not self.connected:
+    def _send_tcp(self, data):
+        """Kodlanmış mesajı çerçeveleyip TCP üzerinden gönderir"""
+        try:
+            self.tcp_socket.sendall(ChatProtocol.frame(data))
+            return True
+        except Exception as e:
+            print(f"[ERROR] TCP gönderme hatası: {e}")
             return False
-        
-        msg_id = f"{int(time.time() * 1000)}"
-        message = ChatProtocol.encode(
-            ChatProtocol.MSG_CHAT, 
-            self.username, 
-            content, 
-            msg_id
-        )
-        
-        # ACK için event oluştur
-        ack_event = threading.Event()
-        self.pending_acks[msg_id] = ack_event
-        
-        # Mesajı gönder
-        MAX_RETRIES = 3
-        for attempt in range(MAX_RETRIES):
-            self.udp_socket.sendto(message, (self.server_ip, self.udp_port))
-            # Metrik kaydı
-            self.metrics.record_message_sent(len(message))
-            
-            # ACK için bekle
-            if ack_event.wait(1.0):  # 1 saniye timeout
-                del self.pending_acks[msg_id]
-                return True
+    
+    def _recv_tcp_message(self):
+        """Sıradaki TCP mesajını döndürür, bağlantı kapanırsa None"""
+        while True:
+            while not self.tcp_pending:
+                data = self.tcp_socket.recv(4096)
+                if not data:
+                    return None
+                self.tcp_pending.extend(self.tcp_frames.feed(data))
             
-            print(f"Deneme {attempt + 1}/{MAX_RETRIES}...")
+            message = ChatProtocol.decode(self.tcp_pending.popleft())
+            if message:
+                return message
+    
+    def _next_msg_id(self):
+        """Aynı milisaniyede gönderilen mesajlar için de benzersiz ID üretir"""
+        return f"{int(time.time() * 1000)}-{next(self._msg_counter)}"
+    
+    def send_message_async(self, content, callback=None):
+        """Sohbet mesajını beklemeden gönderir (UDP)
         
-        # ACK alınamadı
-        del self.pending_acks[msg_id]
-        return False
+        Future döndürür; ACK gelince sonucu True, denemeler tükenince False olur.
+        callback verilirse callback(success) aynı anda çağrılır.
+        """
+        return self._submit(ChatProtocol.MSG_CHAT, content, callback=callback)
+    
+    def send_direct_message_async(self, recipient, content, callback=None):
+        """Özel mesajı beklemeden gönderir (UDP)
+        
+        Alıcıya doğrudan yol ölçülmüş ve sunucu üzerinden yoldan hızlıysa mesaj
+        doğrudan gönderilir; ACK gelmezse yeniden denemeler sunucu üzerinden yapılır.
+        """
+        if self.p2p_enabled and self.connected:
+            self._refresh_peer(recipient)
+        return self._submit(ChatProtocol.MSG_DIRECT, content, recipient=recipient, callback=callback)
+    
+    def send_message(self, content):
+        """Sohbet mesajı gönderir ve ACK'i bekler (UDP)"""
+        return self.send_message_async(content).result()
     
     def send_direct_message(self, recipient, content):
-        """Özel mesaj gönderir (UDP)"""
+        """Özel mesaj gönderir ve ACK'i bekler (UDP)"""
+        return self.send_direct_message_async(recipient, content).result()
+    
+    def _submit(self, msg_type, content, recipient=None, callback=None):
+        """Mesajı gönderim kuyruğuna ekler, gönderimi zamanlayıcı thread yapar"""
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: self._emit(callback, f.result()))
+        
         if not self.connected:
-            return False
+            future.set_result(False)
+            return future
         
-        msg_id = f"{int(time.time() * 1000)}"
+        msg_id = self._next_msg_id()
         message = ChatProtocol.encode(
-            ChatProtocol.MSG_DIRECT, 
-            self.username, 
-            content, 
+            msg_type,
+            self.username,
+            content,
             msg_id,
             recipient=recipient
         )
         
-        # ACK için event oluştur
-        ack_event = threading.Event()
-        self.pending_acks[msg_id] = ack_event
+        with self.send_cond:
+            self.outstanding[msg_id] = {
+                "data": message,
+                "future": future,
+                "attempts": 0,
+                "deadline": 0,
+                "recipient": recipient if msg_type == ChatProtocol.MSG_DIRECT else None,
+                "via_peer": False
+            }
+            self.send_cond.notify()
         
-        # Mesajı gönder
-        MAX_RETRIES = 3
-        for attempt in range(MAX_RETRIES):
-            self.udp_socket.sendto(message, (self.server_ip, self.udp_port))
+        return future
+    
+    def _send_scheduler(self):
+        """Bekleyen mesajları sırayla gönderir, ACK gelmeyenleri yeniden dener"""
+        while not self.should_stop.is_set():
+            to_send = []
+            failed = []
             
-            # ACK için bekle
-            if ack_event.wait(1.0):  # 1 saniye timeout
-                del self.pending_acks[msg_id]
-                return True
+            # Yanıtı gelmeyen ping'leri kayıp olarak say
+            for target in self.pings.expire():
+                print(f"[PING] Zaman aşımı: {target}")
+                self.metrics.record_ping_lost(target)
+                self.topology.record_node_loss(target)
+                self.topology.update_link(self.username, target, lost=True)
             
-            print(f"Deneme {attempt + 1}/{MAX_RETRIES}...")
+            # Doğrudan yola giden ölçümlerden yanıtsız kalanlar yolun kaybıdır
+            for target in self.peer_pings.expire():
+                with self.lock:
+                    peer = self.peers.get(target)
+                    if peer:
+                        peer["stats"].add_loss()
+            
+            # Yerel topolojide süresi dolan düğümleri temizle (heap başına bakmak ucuz)
+            self.topology.clean_inactive_nodes()
+            
+            with self.send_cond:
+                now = time.monotonic()
+                next_deadline = None
+                
+                # OrderedDict ekleme sırasını koruduğu için gönderim sırası da korunur
+                for msg_id, entry in list(self.outstanding.items()):
+                    if now >= entry["deadline"]:
+                        if entry["attempts"] >= self.max_retries:
+                            failed.append(self.outstanding.pop(msg_id))
+                            continue
+                        if entry["via_peer"]:
+                            # Doğrudan gönderim ACK almadı: yeni bir ölçüm başarılı olana
+                            # kadar yolu kullanma, sonraki gönderimde yeniden ölç
+                            peer = self.peers.get(entry["recipient"])
+                            if peer:
+                                peer["stats"] = LinkStats()
+                                peer["probed"] = 0
+                        
+                        entry["attempts"] += 1
+                        entry["deadline"] = now + self.ack_timeout
+                        
+                        # İlk deneme uygunsa doğrudan, sonrakiler her zaman sunucu üzerinden
+                        dest = None
+                        if entry["recipient"] and entry["attempts"] == 1:
+                            dest = self._peer_route(entry["recipient"])
+                        entry["via_peer"] = dest is not None
+                        to_send.append((msg_id, entry["data"], entry["attempts"], dest))
+                    
+                    if next_deadline is None or entry["deadline"] < next_deadline:
+                        next_deadline = entry["deadline"]
+                
+                if not to_send and not failed:
+                    # Yeni mesaj veya en yakın zaman aşımına kadar bekle
+                    timeout = 0.5 if next_deadline is None else min(0.5, max(0, next_deadline - now))
+                    self.send_cond.wait(timeout)
+                    continue
+            
+            # Soket işlemleri kilit dışında yapılır
+            for msg_id, data, attempt, dest in to_send:
+                if attempt > 1:
+                    print(f"[{msg_id}] Deneme {attempt}/{self.max_retries}...")
+                try:
+                    self.udp_socket.sendto(data, dest or (self.server_ip, self.udp_port))
+                    # Metrik kaydı
+                    self.metrics.record_message_sent(len(data))
+                except Exception as e:
+                    print(f"[ERROR] Mesaj gönderme hatası: {e}")
+            
+            for entry in failed:
+                entry["future"].set_result(False)
         
-        # ACK alınamadı
-        del self.pending_acks[msg_id]
-        return False
+        self._fail_outstanding()
+    
+    def _refresh_peer(self, username):
+        """Alıcının adresini sunucudan (yeniden) ister; yanıt gelince yol ölçülür"""
+        if username == self.username:
+            return
+        
+        now = time.monotonic()
+        with self.lock:
+            peer = self.peers.get(username)
+            if peer and now - peer["probed"] < self.peer_probe_interval:
+                return
+            if peer is None:
+                peer = self.peers[username] = {"addr": None, "stats": LinkStats(), "probed": now}
+            peer["probed"] = now
+        
+        request = ChatProtocol.encode(ChatProtocol.MSG_PEER, self.username, username)
+        try:
+            self.udp_socket.sendto(request, (self.server_ip, self.udp_port))
+        except Exception as e:
+            print(f"[PEER] Adres isteği hatası: {e}")
+    
+    def _on_peer_address(self, username, addr):
+        """Sunucunun bildirdiği eş adresini kaydeder ve iki yolu birlikte ölçer"""
+        with self.lock:
+            peer = self.peers.get(username)
+            if peer is None:
+                peer = self.peers[username] = {"addr": None, "stats": LinkStats(), "probed": time.monotonic()}
+            if peer["addr"] != addr:
+                # Yeni adres: eski ölçümler geçersiz
+                peer["addr"] = addr
+                peer["stats"] = LinkStats()
+        
+        # Doğrudan ping (karşı tarafın NAT'ında da delik açar)
+        nonce = self.peer_pings.new_probe(username)
+        ping = ChatProtocol.encode(
+            ChatProtocol.MSG_PING,
+            self.username,
+            nonce,
+            nonce,
+            recipient=username
+        )
+        try:
+            self.udp_socket.sendto(ping, addr)
+        except Exception as e:
+            print(f"[PEER] Doğrudan ping hatası: {e}")
+        
+        # Karşılaştırma için sunucu üzerinden ping
+        self.send_direct_ping(username)
+    
+    def _peer_route(self, username):
+        """Doğrudan yol ulaşılabilir ve sunucu üzerinden yoldan hızlıysa adresini döndürür"""
+        if not self.p2p_enabled:
+            return None
+        
+        peer = self.peers.get(username)
+        if not peer or peer["addr"] is None:
+            return None
+        
+        stats = peer["stats"]
+        if stats.samples == 0 or stats.loss > 0.5:
+            return None
+        
+        relay_rtt = self.topology.link_latency(self.username, username)
+        if relay_rtt is None:
+            relay_rtt = self.relay_latency(username)
+        if relay_rtt is None or stats.ewma >= relay_rtt:
+            return None
+        return peer["addr"]
+    
+    def _fail_outstanding(self):
+        """Bağlantı kapandığında bekleyen tüm gönderimleri başarısız sayar"""
+        with self.send_cond:
+            pending = list(self.outstanding.values())
+            self.outstanding.clear()
+        
+        for entry in pending:
+            if not entry["future"].done():
+                entry["future"].set_result(False)
     
     def get_user_list(self):
         """Kullanıcı listesini ister (TCP)"""
@@ -170,7 +530,7 @@ class HybridChatClient:
             self.username, 
             "Kullanıcı listesi"
         )
-        self.tcp_socket.send(request)
+        self._send_tcp(request)
         
         # Yanıt callback ile gelecek
     
@@ -183,164 +543,234 @@ class HybridChatClient:
         if callback:
             self.on_topology_data = callback 
         self.ping_users()       
-        # Topoloji isteği gönder
+        # Topoloji isteği gönder (sadece son bilinen sürümden bu yana farklar gelir)
         request = ChatProtocol.encode(
-            ChatProtocol.MSG_TOPO, 
+            ChatProtocol.MSG_TOPO_DELTA, 
             self.username, 
-            "GET"
+            {
+                "since": self.server_topology["version"],
+                "epoch": self.server_topology["epoch"]
+            }
         )
-        self.tcp_socket.send(request)
-        return True
+        return self._send_tcp(request)
     
     def ping_users(self):
-        """Tüm kullanıcılara ping gönderir"""
+        """Sunucuya ping gönderir"""
+        return self._send_ping("SERVER")
+    
+    def send_direct_ping(self, target_username):
+        """Belirli bir kullanıcıya (sunucu üzerinden) ping gönderir"""
+        if target_username == self.username:
+            return False
+        return self._send_ping(target_username)
+    
+    def _send_ping(self, target):
+        """Ping tablosuna kayıt açar ve nonce'u mesaj ID'si olarak gönderir"""
         if not self.connected:
             return False
         
-        timestamp = str(time.time())
-        print(f"[PING] Ping gönderiliyor... timestamp: {timestamp}")
+        nonce = self.pings.new_probe(target)
+        self.metrics.record_ping_sent(target)
         
-        # Ping mesajı gönder
         ping = ChatProtocol.encode(
             ChatProtocol.MSG_PING,
             self.username,
-            timestamp  # Timestamp
+            nonce,
+            nonce,
+            recipient=None if target == "SERVER" else target
         )
         
-        # UDP üzerinden gönder
+        # Sunucu üzerinden UDP olarak gönder
         try:
             self.udp_socket.sendto(ping, (self.server_ip, self.udp_port))
-            print(f"[PING] Ping gönderildi: {self.server_ip}:{self.udp_port}")
+            print(f"[PING] Ping gönderildi: {target} (nonce={nonce})")
             return True
         except Exception as e:
             print(f"[PING] Ping gönderme hatası: {e}")
             return False
     
-    def send_direct_ping(self, target_username):
-        """Belirli bir kullanıcıya doğrudan ping gönderir"""
-        if not self.connected or target_username == self.username:
-            return False
-        
-        timestamp = str(time.time())
-        
-        # Hedef kullanıcı için ping mesajı
-        direct_ping = ChatProtocol.encode(
-            ChatProtocol.MSG_PING,
-            self.username,
-            timestamp,  # Timestamp
-            recipient=target_username  # Hedef kullanıcı adı
-        )        
-        # Sunucu üzerinden UDP olarak gönder
-        try:
-            self.udp_socket.sendto(direct_ping, (self.server_ip, self.udp_port))
-            print(f"[PING] Doğrudan ping gönderildi: {target_username}")
-            return True
-        except Exception as e:
-            print(f"[PING] Doğrudan ping gönderme hatası: {e}")
-            return False
-    
     def ping_all_users(self):
-        """Tüm kullanıcılara ping gönderir"""
+        """Ağ ölçümlerini tazeler
+        
+        Kullanıcılar arası gecikmeyi sunucu kendisi ölçüp MSG_TOPO ile yayınlar;
+        bu yüzden diğer kullanıcılara tek tek ping gönderilmez. Sadece kendi
+        sunucu gecikmemizi ölçer ve kullanıcı listesini isteriz.
+        """
         if not self.connected:
             return False
         
-        # Önce sunucuya ping gönder
+        # Sunucuya ping gönder
         self.ping_users()
         
         # Kullanıcı listesini iste
         self.get_user_list()
-        
-        # Bilinen kullanıcı listesi varsa kullan
-        known_users = []
-        try:
-            # Topolojiden bilinen düğümleri al
-            with self.topology.lock:
-                known_users = list(self.topology.nodes.keys())
-            
-            # Kendimizi hariç tut
-            if self.username in known_users:
-                known_users.remove(self.username)
-        except Exception as e:
-            print(f"[ERROR] Kullanıcı listesi alma hatası: {e}")
-        
-        # Diğer kullanıcılara doğrudan ping gönder
-        for user in known_users:
-            self.send_direct_ping(user)
-        
-        print(f"[PING] {len(known_users)} kullanıcıya ping gönderildi")
         return True
     
     def _listen_tcp(self):
-        """TCP mesajlarını dinler"""
-        while self.connected:
+        """TCP mesajlarını dinler, bağlantı koparsa yeniden bağlanır"""
+        while not self.should_stop.is_set():
             try:
-                data = self.tcp_socket.recv(1024)
-                if not data:
+                message = self._recv_tcp_message()
+                if message is None:
+                    raise ConnectionError("Sunucu bağlantıyı kapattı")
+            except Exception as e:
+                if self.should_stop.is_set():
                     break
                 
-                message = ChatProtocol.decode(data)
-
-                if message:
-                    # Protokolü terminale yazdır
-                    print(f"[TCP ALINDI - CLIENT] {json.dumps(message, indent=2, ensure_ascii=False)}")
-
+                print(f"TCP dinleme hatası: {e}")
+                self.connected = False
+                if self.auto_reconnect and self._reconnect():
+                    continue
+                break
+            
+            try:
+                # Protokolü terminale yazdır
+                print(f"[TCP ALINDI - CLIENT] {json.dumps(message, indent=2, ensure_ascii=False)}")
                 
                 # Mesaj tipine göre işlem
                 if message["type"] == ChatProtocol.MSG_JOIN:
-                    if self.on_user_join:
-                        self.on_user_join(message["content"])
+                    self._emit("on_user_join", message["content"])
                 
                 elif message["type"] == ChatProtocol.MSG_LEAVE:
-                    if self.on_user_leave:
-                        self.on_user_leave(message["content"])
+                    self._emit("on_user_leave", message["content"])
                 
                 elif message["type"] == ChatProtocol.MSG_USERS:
-                    if self.on_user_list:
-                        self.on_user_list(message["content"])
-                        # Kullanıcı sayısını kaydet
-                        self.metrics.record_user_count(len(message["content"]))
+                    self._emit("on_user_list", message["content"])
+                    # Kullanıcı sayısını kaydet
+                    self.metrics.record_user_count(len(message["content"]))
                 
                 elif message["type"] == ChatProtocol.MSG_TOPO:
                     # Topoloji verisi
                     print(f"[TOPO] Topoloji verisi alındı: {json.dumps(message['content'], indent=2)}")
                     
-                    # Önce kendi client topolojisini mesaja entegre et
-                    client_topo = self.topology.get_topology_data()
                     server_topo = message['content']
                     
-                    # SERVER düğümünü kendi topolojisine ekle
-                    if "SERVER" in server_topo["nodes"]:
-                        client_topo["nodes"]["SERVER"] = server_topo["nodes"]["SERVER"]
-                    
-                    # Sunucudan gelen bağlantıları entegre et
-                    for conn in server_topo.get("connections", []):
-                        conn_found = False
-                        for client_conn in client_topo.get("connections", []):
-                            if ((conn["from"] == client_conn["from"] and conn["to"] == client_conn["to"]) or 
-                                (conn["from"] == client_conn["to"] and conn["to"] == client_conn["from"])):
-                                conn_found = True
-                                break
-                        
-                        if not conn_found:
-                            client_topo["connections"].append(conn)
+                    if self.on_topology_data:
+                        self._emit("on_topology_data", server_topo)
+                    else:
+                        print("[TOPO] Uyarı: on_topology_data callback'i ayarlanmamış!")
+                
+                elif message["type"] == ChatProtocol.MSG_TOPO_DELTA:
+                    # Farkları yerel kopyaya uygula, tam görünümü arayüze ver
+                    server_topo = self._apply_topology_delta(message["content"])
                     
-                    # Birleştirilmiş topolojiyi kullan 
                     if self.on_topology_data:
-                        self.on_topology_data(server_topo)  # server_topo kullan
+                        self._emit("on_topology_data", server_topo)
                     else:
                         print("[TOPO] Uyarı: on_topology_data callback'i ayarlanmamış!")
                 
+                elif message["type"] == ChatProtocol.MSG_REPLAY:
+                    # Bağlantı kopukken kaçırılan mesajlar
+                    print(f"[REPLAY] {len(message['content'])} kaçırılan mesaj alındı")
+                    for missed in message["content"]:
+                        if missed["type"] == ChatProtocol.MSG_CHAT:
+                            self._deliver_chat(missed)
+                        elif missed["type"] == ChatProtocol.MSG_DIRECT:
+                            self._deliver_direct(missed)
+                
             except Exception as e:
-                print(f"TCP dinleme hatası: {e}")
-                break
+                print(f"TCP mesaj işleme hatası: {e}")
         
         self.connected = False
+        self._notify_connection_state("disconnected")
+    
+    def relay_latency(self, username):
+        """Sunucu üzerinden username'e giden yolun RTT'si: iki sunucu bağlantısının toplamı"""
+        connections = self.server_topology["connections"]
+        total = 0
+        for user in (self.username, username):
+            conn = connections.get(NetworkTopology._edge_key("SERVER", user))
+            if conn is None or conn.get("latency") is None:
+                return None
+            total += conn["latency"]
+        return total
+    
+    def _apply_topology_delta(self, delta):
+        """Sunucudan gelen topoloji farkını yerel kopyaya uygular ve görünümü döndürür"""
+        mirror = self.server_topology
+        
+        if delta.get("full"):
+            # Tam görüntü: yerel kopyayı baştan kur
+            mirror["nodes"] = {}
+            mirror["connections"] = {}
+        
+        for name in delta.get("removed_nodes", []):
+            mirror["nodes"].pop(name, None)
+        for from_user, to_user in delta.get("removed_connections", []):
+            mirror["connections"].pop(NetworkTopology._edge_key(from_user, to_user), None)
+        
+        mirror["nodes"].update(delta.get("nodes", {}))
+        for conn in delta.get("connections", []):
+            mirror["connections"][NetworkTopology._edge_key(conn["from"], conn["to"])] = conn
+        
+        mirror["epoch"] = delta.get("epoch")
+        mirror["version"] = delta.get("version", 0)
+        
+        # Arayüz başka thread'de okuyacağı için kopyalar verilir
+        return {
+            "nodes": dict(mirror["nodes"]),
+            "connections": list(mirror["connections"].values()),
+            "version": mirror["version"]
+        }
+    
+    def _track_sid(self, message):
+        """Sunucu sıra numarasını kaydeder; mesaj daha önce görüldüyse False döner"""
+        sid = message.get("sid")
+        if sid is None:
+            return True
+        
+        with self.lock:
+            if sid in self.seen_sids:
+                return False
+            
+            self.seen_sids.add(sid)
+            self.seen_sid_order.append(sid)
+            if len(self.seen_sid_order) > 1000:
+                self.seen_sids.discard(self.seen_sid_order.popleft())
+            
+            self.last_seen_id = max(self.last_seen_id, sid)
+            return True
+    
+    def _deliver_chat(self, message):
+        """Sohbet mesajını (UDP veya replay) uygulamaya iletir"""
+        if not self._track_sid(message):
+            return
+        
+        self._emit(
+            "on_message",
+            message["user"],
+            message["content"],
+            message["time"]
+        )
+    
+    def _deliver_direct(self, message):
+        """Bana gelen özel mesajı (UDP, doğrudan yol veya replay) uygulamaya iletir"""
+        if not self._track_sid(message):
+            return
+        
+        # Doğrudan gönderilen mesajın ACK'i kaybolursa sunucu üzerinden tekrar gelir
+        key = (message["user"], message["id"])
+        with self.lock:
+            if key in self.seen_direct:
+                return
+            self.seen_direct.add(key)
+            self.seen_direct_order.append(key)
+            if len(self.seen_direct_order) > 1000:
+                self.seen_direct.discard(self.seen_direct_order.popleft())
+        
+        self._emit(
+            "on_direct_message",
+            message["user"],
+            message["content"],
+            message["time"],
+            is_direct=True
+        )
     
     def _listen_udp(self):
         """UDP mesajlarını dinler"""
         self.udp_socket.settimeout(0.5)  # Kısa timeout
         
-        while self.connected:
+        while not self.should_stop.is_set():
             try:
                 data, addr = self.udp_socket.recvfrom(4096)
                 message = ChatProtocol.decode(data)
@@ -354,25 +784,23 @@ class HybridChatClient:
                 
                 if message["type"] == ChatProtocol.MSG_CHAT:
                     # Chat mesajı
-                    if self.on_message:
-                        self.on_message(
-                            message["user"],
-                            message["content"],
-                            message["time"]
-                        )
+                    self._deliver_chat(message)
                 
                 elif message["type"] == ChatProtocol.MSG_ACK:
                     # ACK mesajı
                     msg_id = message["content"]
-                    if msg_id in self.pending_acks:
-                        self.pending_acks[msg_id].set()
+                    with self.send_cond:
+                        entry = self.outstanding.pop(msg_id, None)
+                    if entry and not entry["future"].done():
+                        entry["future"].set_result(True)
                 
                 elif message["type"] == ChatProtocol.MSG_PING:
-                    # Ping mesajına PONG ile cevap ver
+                    # Ping mesajına PONG ile cevap ver (sunucu yanıtı gönderene iletir)
                     pong = ChatProtocol.encode(
                         ChatProtocol.MSG_PONG,
                         self.username,
-                        message["id"]  # Orijinal mesaj ID'sini geri gönder
+                        message["id"],  # Orijinal mesaj ID'sini (nonce) geri gönder
+                        recipient=message["user"]
                     )
                     try:
                         self.udp_socket.sendto(pong, addr)
@@ -380,55 +808,56 @@ class HybridChatClient:
                         pass
                 elif message["type"] == ChatProtocol.MSG_PONG:
                     try:
-                        # Yanıt mesaj ID'si bizim gönderdiğimiz timestamp
-                        ping_time = float(message["id"])
-                        now = time.time()
+                        # Doğrudan yol ölçümünün yanıtı mı?
+                        peer_result = self.peer_pings.complete(message["content"])
+                        if peer_result is not None:
+                            target, latency = peer_result
+                            print(f"[PEER] Doğrudan yol: {target} latency={latency:.2f}ms")
+                            with self.lock:
+                                peer = self.peers.get(target)
+                                if peer:
+                                    peer["stats"].add_sample(latency)
+                            continue
                         
-                        # Doğru latency hesaplaması
-                        latency = max(0, (now - ping_time) * 1000)  # ms cinsinden, minimum 0
+                        # PONG içeriği bizim gönderdiğimiz nonce; RTT ping tablosundan hesaplanır
+                        result = self.pings.complete(message["content"])
+                        if result is None:
+                            # Bilinmeyen veya zaman aşımından sonra gelen yanıt
+                            continue
                         
-                        print(f"[PONG] Alındı: {message['user']} latency={latency:.2f}ms")
+                        target, latency = result
+                        print(f"[PONG] Alındı: {target} latency={latency:.2f}ms")
 
                         # Performans metriklerine gecikmeyi kaydet
-                        self.metrics.record_latency(message['user'], latency)
+                        self.metrics.record_latency(target, latency)
 
-                        if message["user"] != self.username:
-                            # Topolojiye bağlantı kalitesi güncelle
-                            quality = max(0, min(100, 100 - latency/10))  # Makul bir kalite değeri (0-100)
-                            
-                            self.topology.update_connection_quality(
-                                self.username,
-                                message["user"],
-                                quality  # latency yerine quality kullan
-                            )
+                        if target != self.username:
+                            # Bağlantı istatistiklerine ölçümü ekle (kalite EWMA, jitter ve kayıptan hesaplanır)
+                            self.topology.update_link(self.username, target, latency)
 
-                            # Düğüm bilgisi güncelle
+                            # Düğüm bilgisi güncelle (yerel kopya sadece doğrudan yol kararı
+                            # için kullanılır; arayüz sunucunun topolojisini gösterir)
                             self.topology.add_or_update_node(
-                                message["user"],
+                                target,
                                 addr[0],  # IP adresi
                                 addr[1],  # Port
                                 latency
                             )
 
-                            # Topoloji GUI güncellemesi tetikle
-                            if self.on_topology_data:
-                                topo_data = self.topology.get_topology_data()
-                                self.on_topology_data(topo_data)
-
                     except Exception as e:
                         print(f"[ERROR] PONG işleme hatası: {str(e)}")
                 
+                elif message["type"] == ChatProtocol.MSG_PEER:
+                    # Sunucu bir eşin UDP adresini bildirdi (biz istedik veya o bize ulaşmak istiyor)
+                    info = message["content"]
+                    if self.p2p_enabled and isinstance(info, dict):
+                        self._on_peer_address(info["user"], tuple(info["addr"]))
+                
                 elif message["type"] == ChatProtocol.MSG_DIRECT:
                     # Özel mesaj
                     if message["recipient"] == self.username:
                         # Bana gelen özel mesaj
-                        if self.on_direct_message:
-                            self.on_direct_message(
-                                message["user"],
-                                message["content"],
-                                message["time"],
-                                is_direct=True
-                            )
+                        self._deliver_direct(message)
                         
                         # Mesajı aldığımızı bildir
                         ack = ChatProtocol.encode(
@@ -17,6 +17,12 @@ class ChatProtocol:
     MSG_PING = "PING"        # Gecikme ölçümü (UDP)
     MSG_PONG = "PONG"        # Gecikme ölçümü yanıtı (UDP)
     MSG_TOPO = "TOPO"        # Topoloji bilgisi (TCP)
+    MSG_REPLAY = "REPLAY"    # Yeniden bağlanınca kaçırılan mesajlar (TCP)
+    MSG_TOPO_DELTA = "TOPO_DELTA"  # Belirli sürümden bu yana topoloji farkları (TCP)
+    MSG_PEER = "PEER"        # Doğrudan (P2P) yol için adres değişimi (UDP)
+    
+    # TCP akışında mesajları ayıran karakter (JSON çıktısı ham satır sonu içermez)
+    FRAME_DELIMITER = b"\n"
     
     @staticmethod
     def encode(msg_type, username, content, msg_id=None, sequence=None, recipient=None):
@@ -67,6 +73,18 @@ class ChatProtocol:
             print(f"Mesaj çözme hatası: {e}")
             return None
     
+    @staticmethod
+    def frame(data):
+        """Kodlanmış mesajı TCP üzerinden gönderilecek çerçeveye dönüştürür"""
+        return data + ChatProtocol.FRAME_DELIMITER
+    
+    @staticmethod
+    def reseal(message):
+        """Alanları değiştirilmiş bir mesajın özetini yenileyip tekrar kodlar"""
+        message = {k: v for k, v in message.items() if k != "checksum"}
+        message["checksum"] = ChatProtocol._generate_checksum(message)
+        return json.dumps(message).encode()
+    
     @staticmethod
     def _generate_checksum(message):
         """Mesaj özeti oluşturur"""
@@ -75,4 +93,54 @@ class ChatProtocol:
         # SHA-256 özet oluştur
         checksum = hashlib.sha256(message_str.encode()).digest()
         # Base64 olarak kodla ve kısalt
-        return base64.b64encode(checksum).decode()[:12]
\ No newline at end of file
+        return base64.b64encode(checksum).decode()[:12]
+
+
+class FrameBuffer:
+    """TCP akışından gelen parçaları tam mesaj çerçevelerine böler
+    
+    Gelen veri bytearray'e eklenir ve ayırıcı sadece henüz taranmamış kısımda
+    aranır; büyük bir çerçeve parça parça gelirken tampon tekrar tekrar
+    kopyalanıp taranmaz. max_frame_size'ı aşan çerçeve bir sonraki ayırıcıya
+    kadar atılır.
+    """
+    
+    MAX_FRAME_SIZE = 16 * 1024 * 1024
+    
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.buffer = bytearray()
+        self.scanned = 0  # Tamponun başından itibaren ayırıcı aranmış bayt sayısı
+        self.max_frame_size = max_frame_size
+        self.discarding = False  # Sınırı aşan çerçevenin kalanı atılıyor
+    
+    def feed(self, data):
+        """Yeni veriyi ekler ve tamamlanan çerçeveleri döndürür"""
+        buffer = self.buffer
+        buffer += data
+        delimiter = ChatProtocol.FRAME_DELIMITER
+        frames = []
+        start = 0
+        while True:
+            end = buffer.find(delimiter, max(start, self.scanned))
+            if end < 0:
+                break
+            if self.discarding:
+                self.discarding = False
+            elif end > start:
+                frames.append(bytes(buffer[start:end]))
+            start = end + len(delimiter)
+        
+        if start:
+            del buffer[:start]
+        self.scanned = len(buffer)
+        
+        if len(buffer) > self.max_frame_size:
+            print(f"[WARNING] {self.max_frame_size} baytı aşan çerçeve atlandı")
+            buffer.clear()
+            self.scanned = 0
+            self.discarding = True
+        elif self.discarding:
+            # Atılan çerçevenin kalanını tutma
+            buffer.clear()
+            self.scanned = 0
+        return frames
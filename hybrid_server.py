@@ -3,11 +3,17 @@ import socket
 import threading
 import json
 import time
-from hybrid_protocol import ChatProtocol
+import secrets
+from collections import deque
+from hybrid_protocol import ChatProtocol, FrameBuffer
 from network_topology import NetworkTopology
+from ping_tracker import PingTracker
+from timeseries_store import TimeSeriesStore
+from server_metrics import ServerMetrics
+from metrics_exporter import MetricsExporter
 
 class HybridChatServer:
-    def __init__(self, tcp_port=12345, udp_port=12346):
+    def __init__(self, tcp_port=12345, udp_port=12346, history_dir=None, metrics_port=None):
         self.tcp_port = tcp_port
         self.udp_port = udp_port
         
@@ -27,6 +33,39 @@ class HybridChatServer:
         # Topoloji verisi için
         self.topology = NetworkTopology()
         
+        # Gecikme/kayıp/kalite geçmişi (history_dir verilirse diske yazılır)
+        if history_dir:
+            self.topology.history = TimeSeriesStore(history_dir)
+        
+        # Sunucu tarafı gecikme ölçümü: her istemci probe_interval içinde bir kez,
+        # zamana yayılmış şekilde ping'lenir; istemcilerin birbirini ping'lemesi gerekmez
+        self.pings = PingTracker(timeout=5.0)
+        self.probe_interval = 5.0  # saniye
+        self.rtt = {}  # {username: sunucu <-> istemci RTT (ms)}
+        
+        # Oturum devamı için: bağlantı koptuğunda token bir süre geçerli kalır
+        self.sessions = {}  # {token: {"username": str, "udp_addr": addr, "expires": time}}
+        self.session_ttl = 300  # saniye
+        
+        # Yeniden bağlanan istemcilere kaçırdıklarını iletmek için mesaj geçmişi
+        self.history = deque(maxlen=500)  # [{"sid": int, "sender": str, "recipient": str, "message": dict}]
+        self.last_sid = 0
+        
+        # Sunucu metrikleri (metrics_port verilirse OpenMetrics olarak sunulur)
+        self.metrics = ServerMetrics()
+        self.metrics.add_gauge("clients", "Bağlı istemci sayısı", lambda: len(self.clients))
+        self.metrics.add_gauge("sessions", "Devam ettirilebilir oturum sayısı", lambda: len(self.sessions))
+        self.metrics.add_gauge("pending_probes", "Yanıt bekleyen ölçüm ping'leri", lambda: len(self.pings.outstanding))
+        self.metrics.add_gauge("history_messages", "Replay için tutulan mesaj sayısı", lambda: len(self.history))
+        self.metrics.add_gauge("topology_nodes", "Topolojideki düğüm sayısı", lambda: len(self.topology.nodes))
+        self.exporter = None
+        if metrics_port is not None:
+            self.exporter = MetricsExporter(
+                self.metrics.families,
+                port=metrics_port,
+                routes={"/stages": self.metrics.stage_breakdown}  # Aşama dökümü (JSON)
+            )
+        
         print(f"Sunucu başlatıldı. TCP port: {tcp_port}, UDP port: {udp_port}")
     
     def start(self):
@@ -40,6 +79,19 @@ class HybridChatServer:
         udp_thread.daemon = True
         udp_thread.start()
         
+        if self.exporter is not None:
+            self.exporter.start()
+        
+        # İnaktif topoloji düğümlerini arka planda temizle
+        self.topology.start_reaper()
+        if self.topology.history is not None:
+            self.topology.history.start_flusher()
+        
+        # Gecikme ölçüm thread'i
+        probe_thread = threading.Thread(target=self._probe_loop)
+        probe_thread.daemon = True
+        probe_thread.start()
+        
         # TCP bağlantıları kabul etme
         while True:
             try:
@@ -54,56 +106,163 @@ class HybridChatServer:
             except Exception as e:
                 print(f"Bağlantı hatası: {e}")
     
+    def _encode_topology(self, topo_data):
+        """Topoloji görüntüsünü RTT tablosuyla birlikte MSG_TOPO mesajına kodlar"""
+        with self.lock:
+            rtt = dict(self.rtt)
+        return ChatProtocol.encode(
+            ChatProtocol.MSG_TOPO,
+            "SERVER",
+            dict(topo_data, rtt=rtt)
+        )
+    
+    def _recv_messages(self, client_socket):
+        """TCP soketinden gelen çerçeveleri (çözülmüş mesaj, aşama zamanlayıcısı) olarak üretir"""
+        frames = FrameBuffer()
+        while True:
+            data = client_socket.recv(4096)
+            if not data:
+                return
+            
+            for frame in frames.feed(data):
+                timer = self.metrics.stage_timer()
+                message = ChatProtocol.decode(frame)
+                if message:
+                    timer.msg_type = message.get("type")
+                    timer.mark("decode")
+                    self.metrics.count_packet("tcp", message.get("type"), len(frame))
+                    yield message, timer
+                else:
+                    self.metrics.count_packet("tcp", "INVALID", len(frame))
+    
+    def _send_tcp(self, client_socket, data):
+        """Kodlanmış mesajı çerçeveleyip TCP üzerinden gönderir"""
+        frame = ChatProtocol.frame(data)
+        client_socket.sendall(frame)
+        self.metrics.count_sent("tcp", len(frame))
+    
+    def _send_udp(self, data, addr):
+        """Kodlanmış mesajı UDP üzerinden gönderir ve giden baytlara sayar"""
+        self.udp_socket.sendto(data, addr)
+        self.metrics.count_sent("udp", len(data))
+    
+    def _open_session(self, username, auth_content):
+        """AUTH isteği için oturumu açar veya mevcut oturumu devam ettirir
+        
+        (token, resumed, last_id, udp_addr) döndürür.
+        """
+        now = time.time()
+        with self.lock:
+            # Süresi dolan oturumları temizle
+            for token in [t for t, info in self.sessions.items() if info["expires"] < now]:
+                del self.sessions[token]
+            
+            if isinstance(auth_content, dict):
+                token = auth_content.get("session")
+                session = self.sessions.get(token)
+                if session and session["username"] == username:
+                    session["expires"] = float("inf")  # Bağlıyken süresi dolmaz
+                    return token, True, auth_content.get("last_id", 0), session.get("udp_addr")
+            
+            # Bilinmeyen token (ör. sunucu yeniden başladı): yeni oturum, replay yok.
+            # Kullanıcının eski oturumu geçersiz olur; bağlıyken süresi dolmadığı için
+            # silinmezse eski bağlantı kapanınca da hiç temizlenmezdi
+            for old in [t for t, info in self.sessions.items() if info["username"] == username]:
+                del self.sessions[old]
+            token = secrets.token_hex(16)
+            self.sessions[token] = {
+                "username": username,
+                "udp_addr": None,
+                "expires": float("inf")
+            }
+            return token, False, self.last_sid, None
+    
+    def _missed_messages(self, username, last_id):
+        """Kullanıcının last_id'den sonra kaçırdığı mesajları döndürür"""
+        with self.lock:
+            return [
+                entry["message"] for entry in self.history
+                if entry["sid"] > last_id
+                and entry["sender"] != username
+                and entry["recipient"] in (None, username)
+            ]
+    
+    def _record_history(self, message, recipient=None):
+        """Mesaja sunucu sıra numarası verir, geçmişe ekler ve yeniden kodlar"""
+        message = {k: v for k, v in message.items() if k != "checksum"}
+        with self.lock:
+            self.last_sid += 1
+            message["sid"] = self.last_sid
+            self.history.append({
+                "sid": self.last_sid,
+                "sender": message.get("user"),
+                "recipient": recipient,
+                "message": message
+            })
+        return ChatProtocol.reseal(message)
+    
     def _handle_tcp_client(self, client_socket, addr):
         """TCP istemcisini işler"""
         username = None
+        session_token = None
 
         try:
+            messages = self._recv_messages(client_socket)
+            
             # Doğrulama mesajı bekle
-            data = client_socket.recv(1024)
-            message = ChatProtocol.decode(data)
+            message, timer = next(messages, (None, None))
             
             if message:
                 print(f"[TCP ALINDI - SERVER] {json.dumps(message, indent=2, ensure_ascii=False)}")
 
             if message and message["type"] == ChatProtocol.MSG_AUTH:
                 username = message["user"]
+                session_token, resumed, last_id, udp_addr = self._open_session(username, message["content"])
 
                 with self.lock:
                     # İstemciyi kaydet
                     self.clients[username] = {
                         "tcp_socket": client_socket,
-                        "udp_addr": None,  # UDP adresi henüz bilinmiyor
-                        "last_seen": time.time()
+                        "udp_addr": udp_addr,  # Devam eden oturumda eski UDP adresi kullanılır
+                        "last_seen": time.time(),
+                        "session": session_token
                     }
 
                 # Hoşgeldin mesajı gönder
                 welcome = ChatProtocol.encode(
                     ChatProtocol.MSG_AUTH,
                     "SERVER",
-                    f"Hoş geldin {username}! UDP port: {self.udp_port}"
+                    {
+                        "text": f"Hoş geldin {username}! UDP port: {self.udp_port}",
+                        "session": session_token,
+                        "resumed": resumed,
+                        "last_id": self.last_sid
+                    }
                 )
-                client_socket.send(welcome)
+                self._send_tcp(client_socket, welcome)
+                
+                if resumed:
+                    # Sadece kaçırılan mesajları tek çerçevede gönder
+                    missed = self._missed_messages(username, last_id)
+                    print(f"[SESSION] {username} oturumu devam ettirildi, {len(missed)} mesaj yeniden gönderiliyor")
+                    replay = ChatProtocol.encode(ChatProtocol.MSG_REPLAY, "SERVER", missed)
+                    self._send_tcp(client_socket, replay)
 
                 # Diğer kullanıcılara bildir
                 self._broadcast_tcp(
                     ChatProtocol.MSG_JOIN,
                     "SERVER",
-                    f"{username} sohbete katıldı",
+                    f"{username} sohbete {'yeniden ' if resumed else ''}katıldı",
                     exclude=username
                 )
 
-                # Mesajları işlemeye devam et
-                while True:
-                    data = client_socket.recv(1024)
-                    if not data:
-                        break
+                timer.mark("handle")
+                timer.done()
 
-                    message = ChatProtocol.decode(data)
-                    if message:
-                        print(f"[TCP ALINDI - SERVER] {json.dumps(message, indent=2)}")
-                    else:
-                        continue
+                # Mesajları işlemeye devam et
+                for message, timer in messages:
+                    print(f"[TCP ALINDI - SERVER] {json.dumps(message, indent=2)}")
+                    timer.mark("log")
 
                     # Mesaj tipine göre işlem yap
                     if message["type"] == ChatProtocol.MSG_USERS:
@@ -116,53 +275,40 @@ class HybridChatServer:
                             "SERVER",
                             users
                         )
-                        client_socket.send(response)
+                        timer.mark("handle")
+                        self._send_tcp(client_socket, response)
+                        timer.mark("send")
 
                     elif message["type"] == ChatProtocol.MSG_TOPO:
-                        # İstemci topoloji verisi istedi
+                        # İstemci topoloji verisi istedi; bağlantılar sunucunun
+                        # ölçtüğü RTT'lerle _probe_loop tarafından güncel tutulur
                         print(f"[TOPO] Topoloji isteği alındı: {username}")
-                        topo_data = self.topology.get_topology_data()
-                        print(f"[TOPO] Mevcut topoloji: {json.dumps(topo_data, indent=2)}")
-                        
-                        # Her istemci için geçici topoloji verisi oluştur
-                        with self.lock:
-                            for client_name, client_info in self.clients.items():
-                                client_sock = client_info["tcp_socket"]
-                                client_addr = client_sock.getpeername()
-                                
-                                print(f"[TOPO] Düğüm ekleniyor: {client_name}")
-                                # Topolojiye düğüm ekle
-                                self.topology.add_or_update_node(
-                                    client_name,
-                                    client_addr[0],
-                                    client_addr[1]
-                                )
-                                
-                                # Eğer UDP adresi varsa, topoloji bağlantıları oluştur
-                                if client_info.get("udp_addr"):
-                                    for other_name, other_info in self.clients.items():
-                                        if client_name != other_name:
-                                            print(f"[TOPO] Bağlantı ekleniyor: {client_name} -> {other_name}")
-                                            # Rastgele bir kalite değeri (gerçek değer ping ile hesaplanmalı)
-                                            quality = 50  # Varsayılan değer
-                                            self.topology.update_connection_quality(
-                                                client_name,
-                                                other_name,
-                                                quality
-                                            )
-                        
-                        # Güncellenmiş topoloji verisini al
-                        topo_data = self.topology.get_topology_data()
-                        print(f"[TOPO] Güncellenmiş topoloji: {json.dumps(topo_data, indent=2)}")
+                        # Aynı sürümü isteyen istemciler tek serileştirmeyi paylaşır
+                        snapshot = self.topology.snapshot()
+                        response = snapshot.encoded(self._encode_topology)
+                        timer.mark("topology")
+                        self._send_tcp(client_socket, response)
+                        timer.mark("send")
+                        print(f"[TOPO] Topoloji verisi gönderildi: {username}")
+                    
+                    elif message["type"] == ChatProtocol.MSG_TOPO_DELTA:
+                        # İstemci son bildiği sürümü gönderir; sadece farklar döner
+                        request = message["content"] if isinstance(message["content"], dict) else {}
+                        delta = self.topology.get_delta(
+                            request.get("since", 0),
+                            request.get("epoch")
+                        )
                         
-                        # Topoloji verisini gönder
                         response = ChatProtocol.encode(
-                            ChatProtocol.MSG_TOPO,
+                            ChatProtocol.MSG_TOPO_DELTA,
                             "SERVER",
-                            topo_data
+                            delta
                         )
-                        client_socket.send(response)
-                        print(f"[TOPO] Topoloji verisi gönderildi: {username}")
+                        timer.mark("topology")
+                        self._send_tcp(client_socket, response)
+                        timer.mark("send")
+                    
+                    timer.done()
 
         except Exception as e:
             print(f"TCP istemci hatası: {e}")
@@ -170,16 +316,30 @@ class HybridChatServer:
         finally:
             # Temizlik
             if username:
+                replaced = False
                 with self.lock:
-                    if username in self.clients:
+                    client_info = self.clients.get(username)
+                    if client_info and client_info["tcp_socket"] is client_socket:
                         del self.clients[username]
+                        self.rtt.pop(username, None)
+                    else:
+                        # Kullanıcı yeni bir bağlantıyla zaten geri döndü
+                        replaced = True
+                    
+                    # Oturum token'ı bir süre daha devam ettirilebilir
+                    session = self.sessions.get(session_token)
+                    if session and not replaced:
+                        session["expires"] = time.time() + self.session_ttl
+                        if client_info:
+                            session["udp_addr"] = client_info.get("udp_addr")
 
                 # Diğer kullanıcılara bildir
-                self._broadcast_tcp(
-                    ChatProtocol.MSG_LEAVE,
-                    "SERVER",
-                    f"{username} ayrıldı"
-                )
+                if not replaced:
+                    self._broadcast_tcp(
+                        ChatProtocol.MSG_LEAVE,
+                        "SERVER",
+                        f"{username} ayrıldı"
+                    )
 
             client_socket.close()
 
@@ -191,11 +351,17 @@ class HybridChatServer:
         while True:
             try:
                 data, addr = self.udp_socket.recvfrom(4096)
+                timer = self.metrics.stage_timer()
                 message = ChatProtocol.decode(data)
 
                 if message:
+                    timer.msg_type = message.get("type")
+                    timer.mark("decode")
+                    self.metrics.count_packet("udp", message.get("type"), len(data))
                     print(f"[UDP ALINDI - SERVER] {json.dumps(message, indent=2, ensure_ascii=False)}")
+                    timer.mark("log")
                 else:
+                    self.metrics.count_packet("udp", "INVALID", len(data))
                     continue
 
                 username = message.get("user")
@@ -219,6 +385,7 @@ class HybridChatServer:
                         )
                     except:
                         pass
+                timer.mark("topology")
 
                 # Mesaj tipine göre işlem yap
                 if message["type"] == ChatProtocol.MSG_CHAT:
@@ -230,10 +397,14 @@ class HybridChatServer:
                         "SERVER",
                         msg_id
                     )
-                    self.udp_socket.sendto(ack, addr)
+                    self._send_udp(ack, addr)
+                    timer.mark("ack")
 
-                    # Mesajı diğer istemcilere yayınla
-                    self._broadcast_udp(message, exclude=username)
+                    # Mesajı geçmişe ekle ve diğer istemcilere yayınla
+                    data = self._record_history(message)
+                    timer.mark("history")
+                    self._broadcast_udp(data, exclude=username)
+                    timer.mark("broadcast")
                 
                 elif message["type"] == ChatProtocol.MSG_DIRECT:
                     msg_id = message["id"]
@@ -245,41 +416,64 @@ class HybridChatServer:
                         "SERVER",
                         msg_id
                     )
-                    self.udp_socket.sendto(ack, addr)
+                    self._send_udp(ack, addr)
+                    timer.mark("ack")
 
-                    # Alıcıya mesajı ilet
+                    # Alıcıya mesajı ilet (alıcı o an bağlı değilse replay ile ulaşır)
+                    data = self._record_history(message, recipient)
+                    timer.mark("history")
                     if recipient and recipient in self.clients:
                         recipient_addr = self.clients[recipient].get("udp_addr")
                         if recipient_addr:
                             try:
-                                self.udp_socket.sendto(data, recipient_addr)
+                                self._send_udp(data, recipient_addr)
                                 print(f"[DIRECT] {username} -> {recipient}: {message.get('content')}")
                             except Exception as e:
                                 print(f"[ERROR] Özel mesaj iletme hatası: {e}")
+                    timer.mark("relay")
+                
+                elif message["type"] == ChatProtocol.MSG_PEER:
+                    # Doğrudan yol isteği: iki tarafa da karşının UDP adresini bildir
+                    target = message.get("content")
+                    with self.lock:
+                        target_info = self.clients.get(target)
+                        target_addr = target_info.get("udp_addr") if target_info else None
+                    
+                    if target_addr and username in self.clients and target != username:
+                        to_requester = ChatProtocol.encode(
+                            ChatProtocol.MSG_PEER,
+                            "SERVER",
+                            {"user": target, "addr": list(target_addr)}
+                        )
+                        to_target = ChatProtocol.encode(
+                            ChatProtocol.MSG_PEER,
+                            "SERVER",
+                            {"user": username, "addr": list(addr)}
+                        )
+                        try:
+                            self._send_udp(to_requester, addr)
+                            self._send_udp(to_target, target_addr)
+                            print(f"[PEER] Adres değişimi: {username} <-> {target}")
+                        except Exception as e:
+                            print(f"[PEER] Adres gönderme hatası: {e}")
+                    timer.mark("peer")
+                
+                elif message["type"] == ChatProtocol.MSG_PING and message.get("recipient"):
+                    # Kullanıcıya yönelik ping: alıcıya ilet, PONG'u alıcı gönderir
+                    self._relay_udp(data, message["recipient"])
+                    timer.mark("relay")
                 
                 elif message["type"] == ChatProtocol.MSG_PING:
                     # Ping mesajı alındı, PONG ile yanıt ver
                     print(f"[PING] Alındı: {username} kullanıcısından")
                     
-                    # Topolojiyi güncelleyelim - kullanıcıyı ekle
+                    # Topolojiyi güncelleyelim - kullanıcıyı ekle (gecikme _probe_loop'tan gelir)
                     self.topology.add_or_update_node(
                         username,
                         addr[0],  # IP adresi
-                        addr[1],  # Port
-                        0  # Başlangıç gecikmesi
+                        addr[1]   # Port
                     )
-                    
-                    # Diğer kullanıcılarla bağlantı oluştur
-                    with self.lock:
-                        for other_name, other_info in self.clients.items():
-                            if username != other_name:
-                                # Varsayılan bağlantı kalitesi
-                                quality = 50
-                                self.topology.update_connection_quality(
-                                    username, 
-                                    other_name,
-                                    quality
-                                )
+                    timer.mark("register")
                     
                     # PONG yanıtı gönder
                     pong_response = ChatProtocol.encode(
@@ -288,21 +482,99 @@ class HybridChatServer:
                         message["id"]  # Orijinal mesaj ID'sini geri gönder
                     )
                     try:
-                        self.udp_socket.sendto(pong_response, addr)
+                        self._send_udp(pong_response, addr)
                         print(f"[PONG] Gönderildi: {username} kullanıcısına")
                     except Exception as e:
                         print(f"[PONG] Gönderme hatası: {e}")
+                    timer.mark("reply")
                 
                 elif message["type"] == ChatProtocol.MSG_PONG:
                     print(f"[PONG] Alındı: {username} kullanıcısından")
+                    
+                    # Başka bir kullanıcının ping'ine verilen yanıtı ona ilet
+                    recipient = message.get("recipient")
+                    if recipient and recipient != "SERVER":
+                        self._relay_udp(data, recipient)
+                        timer.mark("relay")
+                    else:
+                        # Sunucunun gönderdiği ölçüm ping'inin yanıtı
+                        self._record_probe_reply(message, addr)
+                        timer.mark("probe")
+                
+                timer.done()
 
             except Exception as e:
                 print(f"UDP hatası: {e}")
 
     
+    def _probe_loop(self):
+        """Her istemciye probe_interval içinde bir kez, aralıklara yayarak ping gönderir"""
+        while True:
+            try:
+                with self.lock:
+                    targets = [(name, info["udp_addr"]) for name, info in self.clients.items()
+                               if info.get("udp_addr")]
+                
+                # Sunucu düğümünü canlı tut
+                self.topology.add_or_update_node("SERVER", "0.0.0.0", self.udp_port)
+                
+                # Yanıtı gelmeyen ölçümleri kayıp say
+                for target in self.pings.expire():
+                    print(f"[PROBE] Zaman aşımı: {target}")
+                    self.topology.record_node_loss(target)
+                    self.topology.update_link("SERVER", target, lost=True, record=False)
+                
+                if not targets:
+                    time.sleep(self.probe_interval)
+                    continue
+                
+                # Ping'leri tek seferde değil, tur boyunca eşit aralıklarla gönder
+                spacing = self.probe_interval / len(targets)
+                for name, udp_addr in targets:
+                    nonce = self.pings.new_probe(name)
+                    ping = ChatProtocol.encode(ChatProtocol.MSG_PING, "SERVER", nonce, nonce)
+                    try:
+                        self._send_udp(ping, udp_addr)
+                    except Exception as e:
+                        print(f"[PROBE] Ping gönderme hatası: {e}")
+                    time.sleep(spacing)
+            
+            except Exception as e:
+                print(f"[PROBE] Ölçüm döngüsü hatası: {e}")
+                time.sleep(1)
+    
+    def _record_probe_reply(self, message, addr):
+        """Ölçüm ping'inin yanıtından RTT'yi hesaplar ve topolojiye işler"""
+        result = self.pings.complete(message["content"])
+        if result is None:
+            return
+        
+        username, rtt = result
+        with self.lock:
+            self.rtt[username] = rtt
+        
+        # Sadece sunucu <-> istemci bağlantıları tutulur; iki istemci arasındaki
+        # (sunucu üzerinden) yol RTT'si istemcide rtt[a] + rtt[b] olarak hesaplanır.
+        # Ölçüm geçmişe bir kez, düğüm serisine yazılır; bağlantı serisi aynı veri olurdu
+        self.topology.add_or_update_node(username, addr[0], addr[1], rtt)
+        self.topology.update_link("SERVER", username, rtt, record=False)
+    
+    def _relay_udp(self, data, recipient):
+        """UDP paketini olduğu gibi alıcının UDP adresine iletir"""
+        with self.lock:
+            client_info = self.clients.get(recipient)
+            recipient_addr = client_info.get("udp_addr") if client_info else None
+        
+        if recipient_addr:
+            try:
+                self._send_udp(data, recipient_addr)
+            except Exception as e:
+                print(f"[ERROR] UDP iletme hatası: {e}")
+    
     def _broadcast_tcp(self, msg_type, username, content, exclude=None):
         """TCP üzerinden tüm istemcilere mesaj yayınlar"""
         message = ChatProtocol.encode(msg_type, username, content)
+        start = time.perf_counter()
         
         with self.lock:
             for client_name, client_info in self.clients.items():
@@ -310,16 +582,18 @@ class HybridChatServer:
                     continue
                 
                 try:
-                    client_info["tcp_socket"].send(message)
+                    self._send_tcp(client_info["tcp_socket"], message)
                 except:
                     # Bu istemci bağlantısı kopmuş olabilir
                     # İstemci handler'ı bunu temizleyecek
                     pass
-    
-    def _broadcast_udp(self, message, exclude=None):
-        """UDP üzerinden tüm istemcilere mesaj yayınlar"""
-        data = json.dumps(message).encode()
         
+        self.metrics.record_fanout((time.perf_counter() - start) * 1000)
+    
+    def _broadcast_udp(self, data, exclude=None):
+        """UDP üzerinden tüm istemcilere kodlanmış mesajı yayınlar"""
+        start = time.perf_counter()
+
         with self.lock:
             for client_name, client_info in self.clients.items():
                 if exclude and client_name == exclude:
@@ -328,10 +602,12 @@ class HybridChatServer:
                 # UDP adresi kaydedilmiş mi kontrol et
                 if client_info["udp_addr"]:
                     try:
-                        self.udp_socket.sendto(data, client_info["udp_addr"])
+                        self._send_udp(data, client_info["udp_addr"])
                     except Exception as e:
                         print(f"UDP yayın hatası: {e}")
+        
+        self.metrics.record_fanout((time.perf_counter() - start) * 1000)
 
 if __name__ == "__main__":
-    server = HybridChatServer()
+    server = HybridChatServer(history_dir="topology_history", metrics_port=9464)
     server.start()
\ No newline at end of file
@@ -0,0 +1,127 @@
+# latency_histogram.py
+from array import array
+
+
+class LatencyHistogram:
+    """HDR tarzı log-doğrusal kovalı gecikme histogramı
+    
+    Değerler unit_ms çözünürlüğünde tamsayıya çevrilir. İlk 2 * sub_buckets
+    değer birebir, sonrası her ikinin kuvveti aralığında sub_buckets eşit
+    kovaya ayrılır: göreli hata en fazla 1 / sub_buckets. Kayıt O(1), bellek
+    sabit; aynı parametreli histogramlar kova kova toplanarak birleştirilir.
+    """
+    
+    def __init__(self, max_value_ms=60000.0, unit_ms=0.01, sub_buckets=128):
+        self.unit_ms = unit_ms
+        self.sub_buckets = sub_buckets
+        self.base_bits = (2 * sub_buckets).bit_length() - 1  # 2 * sub_buckets = 2 ** base_bits
+        self.max_units = int(max_value_ms / unit_ms)
+        self.counts = array("Q", [0]) * (self._index(self.max_units) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def _index(self, units):
+        """Tamsayı değerin kova numarası"""
+        shift = units.bit_length() - self.base_bits
+        if shift <= 0:
+            return units
+        return shift * self.sub_buckets + (units >> shift)
+    
+    def _bounds(self, index):
+        """Kovanın (en küçük tamsayı değeri, genişliği)"""
+        if index < 2 * self.sub_buckets:
+            return index, 1
+        shift = index // self.sub_buckets - 1
+        top = index - shift * self.sub_buckets
+        return top << shift, 1 << shift
+    
+    def _value(self, index):
+        """Kovanın temsil ettiği değer (aralığın ortası, ms)"""
+        low, width = self._bounds(index)
+        return (low + (width - 1) / 2) * self.unit_ms
+    
+    def record(self, value_ms):
+        """Bir gecikme ölçümü ekler"""
+        units = min(max(int(value_ms / self.unit_ms), 0), self.max_units)
+        self.counts[self._index(units)] += 1
+        self.count += 1
+        self.total += value_ms
+        if self.min is None or value_ms < self.min:
+            self.min = value_ms
+        if self.max is None or value_ms > self.max:
+            self.max = value_ms
+    
+    def merge(self, other):
+        """Aynı parametrelerle oluşturulmuş başka bir histogramı bu histograma ekler"""
+        if len(other.counts) != len(self.counts) or other.unit_ms != self.unit_ms:
+            raise ValueError("Histogram parametreleri uyuşmuyor")
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+    
+    def mean(self):
+        return self.total / self.count if self.count else 0
+    
+    def percentiles(self, percentiles=(50, 90, 99, 99.9)):
+        """{yüzdelik: değer_ms} döndürür, tek geçişte hesaplanır (örnek yoksa boş)"""
+        if not self.count:
+            return {}
+        
+        targets = sorted(percentiles)
+        ranks = [max(1, -(-p * self.count // 100)) for p in targets]  # Tavan: en az 1. örnek
+        result = {}
+        seen = 0
+        t = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            while t < len(targets) and seen >= ranks[t]:
+                # Kova ortası gerçek uçların dışına taşmasın
+                result[targets[t]] = min(max(self._value(index), self.min), self.max)
+                t += 1
+            if t == len(targets):
+                break
+        return result
+    
+    def cumulative_counts(self, bounds):
+        """Her sınır için değeri o sınıra eşit veya küçük örnek sayısı (artan sınırlar)
+        
+        Kova, alt ucu sınırı aşmıyorsa sınırın içinde sayılır (hata en fazla bir kova).
+        """
+        result = []
+        seen = 0
+        b = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            low = self._bounds(index)[0] * self.unit_ms
+            while b < len(bounds) and low > bounds[b]:
+                result.append(seen)
+                b += 1
+            if b == len(bounds):
+                break
+            seen += n
+        result.extend([seen] * (len(bounds) - len(result)))
+        return result
+    
+    def percentile(self, p):
+        """Tek bir yüzdelik değeri (örnek yoksa None)"""
+        return self.percentiles((p,)).get(p)
+    
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
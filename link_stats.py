@@ -0,0 +1,128 @@
+# link_stats.py
+
+
+class P2Quantile:
+    """P² algoritması ile sabit bellekte akan veri yüzdelik tahmini
+    
+    Jain & Chlamtac (1985): sadece 5 işaretçi tutulur, örnekler saklanmaz.
+    """
+    
+    def __init__(self, p):
+        self.p = p
+        self.heights = []  # İşaretçi yükseklikleri (ilk 5 örnekte ham değerler)
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def add(self, x):
+        """Yeni örnek ekler"""
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        
+        n = self.positions
+        
+        # x'in düştüğü aralığı bul, uç işaretçileri gerekirse genişlet
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        
+        # Ortadaki işaretçileri istenen konumlarına yaklaştır
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                
+                # Parabolik tahmin, sıralamayı bozarsa doğrusal tahmin
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                
+                q[i] = qp
+                n[i] += d
+    
+    def value(self):
+        """Güncel yüzdelik tahmini (örnek yoksa None)"""
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+
+class LinkStats:
+    """Bir düğüm veya bağlantı için akan gecikme istatistikleri
+    
+    Örnek sayısından bağımsız sabit bellek kullanır:
+    - EWMA gecikme
+    - RFC 3550 tarzı jitter: J += (|D| - J) / 16
+    - Kayıp oranı (kayıp/başarı olaylarının EWMA'sı)
+    - P² ile p50 ve p99 tahmini
+    """
+    
+    def __init__(self, alpha=0.125, loss_alpha=0.1):
+        self.alpha = alpha
+        self.loss_alpha = loss_alpha
+        self.ewma = None
+        self.jitter = 0.0
+        self.loss = 0.0
+        self.last = None
+        self.samples = 0
+        self.lost = 0
+        self.p50 = P2Quantile(0.5)
+        self.p99 = P2Quantile(0.99)
+    
+    def add_sample(self, latency_ms):
+        """Başarılı bir gecikme ölçümü ekler"""
+        if self.ewma is None:
+            self.ewma = latency_ms
+        else:
+            self.ewma += self.alpha * (latency_ms - self.ewma)
+        
+        if self.last is not None:
+            self.jitter += (abs(latency_ms - self.last) - self.jitter) / 16
+        self.last = latency_ms
+        
+        self.loss += self.loss_alpha * (0.0 - self.loss)
+        self.samples += 1
+        self.p50.add(latency_ms)
+        self.p99.add(latency_ms)
+    
+    def add_loss(self):
+        """Yanıtı gelmeyen bir ölçümü kayıp olarak ekler"""
+        self.loss += self.loss_alpha * (1.0 - self.loss)
+        self.lost += 1
+    
+    def quality(self):
+        """Gecikme, jitter ve kayıptan 0-100 arası bağlantı kalitesi"""
+        effective = (self.ewma or 0.0) + 2 * self.jitter
+        return max(0.0, min(100.0, (100 - effective / 10) * (1 - self.loss)))
+    
+    def to_dict(self):
+        """JSON ile gönderilebilecek özet"""
+        return {
+            "latency": self.ewma,
+            "jitter": self.jitter,
+            "loss": self.loss,
+            "p50": self.p50.value(),
+            "p99": self.p99.value(),
+            "samples": self.samples
+        }
@@ -0,0 +1,186 @@
+# metrics_exporter.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Gecikme histogramlarının dışa aktarılan kova sınırları (ms)
+LATENCY_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render_openmetrics(families):
+    """Metrik ailelerini OpenMetrics metin biçimine çevirir
+    
+    families: [{"name", "type", "help", "samples": [(ek, {etiket: değer}, değer)]}]
+    """
+    lines = []
+    for family in families:
+        name = family["name"]
+        lines.append(f"# TYPE {name} {family['type']}")
+        lines.append(f"# HELP {name} {_escape(family['help'])}")
+        for suffix, labels, value in family["samples"]:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name}{suffix} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_samples(histogram, labels=None, bounds=LATENCY_BOUNDS):
+    """LatencyHistogram'ı OpenMetrics histogram örneklerine çevirir (_bucket, _sum, _count)"""
+    labels = labels or {}
+    samples = []
+    for bound, count in zip(bounds, histogram.cumulative_counts(bounds)):
+        samples.append(("_bucket", dict(labels, le=_format_value(float(bound))), count))
+    samples.append(("_bucket", dict(labels, le="+Inf"), histogram.count))
+    samples.append(("_sum", labels, histogram.total))
+    samples.append(("_count", labels, histogram.count))
+    return samples
+
+
+def performance_metrics_families(metrics, prefix="chat_client"):
+    """İstemci PerformanceMetrics değerlerini metrik ailelerine çevirir"""
+    families = [
+        {
+            "name": f"{prefix}_sent_bytes",
+            "type": "counter",
+            "help": "Gönderilen toplam bayt",
+            "samples": [("_total", None, metrics.bytes_sent.value())]
+        },
+        {
+            "name": f"{prefix}_received_bytes",
+            "type": "counter",
+            "help": "Alınan toplam bayt",
+            "samples": [("_total", None, metrics.bytes_received.value())]
+        }
+    ]
+    
+    with metrics.lock:
+        throughput = metrics.throughput_history.last()
+        user_count = metrics.user_count_history.last()
+        pings = [(user, dict(counts)) for user, counts in metrics.ping_counts.items()]
+        latency_samples = []
+        for user, histogram in metrics.latency_histograms.items():
+            latency_samples += histogram_samples(histogram, {"user": user})
+        # Birleşik dağılım ayrı ailede: sum by (user) kullanıcı başına aileyi iki kez saymaz
+        total_latency_samples = histogram_samples(metrics.global_latency)
+    
+    families.append({
+        "name": f"{prefix}_throughput_bytes_per_second",
+        "type": "gauge",
+        "help": "Son ölçülen veri aktarım hızı",
+        "samples": [("", None, throughput[1] if throughput else 0)]
+    })
+    families.append({
+        "name": f"{prefix}_users",
+        "type": "gauge",
+        "help": "Sunucunun bildirdiği aktif kullanıcı sayısı",
+        "samples": [("", None, int(user_count[1]) if user_count else 0)]
+    })
+    families.append({
+        "name": f"{prefix}_pings_sent",
+        "type": "counter",
+        "help": "Kullanıcı başına gönderilen ping",
+        "samples": [("_total", {"user": user}, counts["sent"]) for user, counts in pings]
+    })
+    families.append({
+        "name": f"{prefix}_pings_lost",
+        "type": "counter",
+        "help": "Kullanıcı başına yanıtsız kalan ping",
+        "samples": [("_total", {"user": user}, counts["lost"]) for user, counts in pings]
+    })
+    families.append({
+        "name": f"{prefix}_latency_milliseconds",
+        "type": "histogram",
+        "help": "Kullanıcı başına ping gecikmesi (ms)",
+        "samples": latency_samples
+    })
+    families.append({
+        "name": f"{prefix}_all_latency_milliseconds",
+        "type": "histogram",
+        "help": "Tüm kullanıcıların birleşik ping gecikmesi (ms)",
+        "samples": total_latency_samples
+    })
+    return families
+
+
+class MetricsExporter:
+    """Metrikleri küçük bir HTTP uç noktasından OpenMetrics biçiminde sunar
+    
+    collect() her istekte çağrılır ve metrik ailelerini döndürür.
+    Varsayılan olarak sadece yerel adresten dinler: GET /metrics
+    routes ile ek JSON uç noktaları verilebilir: {"/yol": fonksiyon}
+    """
+    
+    def __init__(self, collect, host="127.0.0.1", port=9464, routes=None):
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self.routes = routes or {}
+        self.httpd = None
+        self.thread = None
+    
+    def start(self):
+        """HTTP sunucusunu arka plan thread'inde başlatır"""
+        if self.httpd is not None:
+            return
+        exporter = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path != "/metrics" and path not in exporter.routes:
+                    self.send_error(404)
+                    return
+                try:
+                    if path == "/metrics":
+                        body = render_openmetrics(exporter.collect()).encode("utf-8")
+                        content_type = CONTENT_TYPE
+                    else:
+                        body = json.dumps(exporter.routes[path](), ensure_ascii=False).encode("utf-8")
+                        content_type = "application/json; charset=utf-8"
+                except Exception as e:
+                    print(f"[METRICS] Metrikler toplanamadı: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # Her scrape isteğini konsola yazma
+                pass
+        
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]  # port=0 verildiyse atanan port
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        print(f"[METRICS] OpenMetrics uç noktası: http://{self.host}:{self.port}/metrics")
+    
+    def stop(self):
+        """HTTP sunucusunu durdurur"""
+        if self.httpd is None:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
+        self.thread = None
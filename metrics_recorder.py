@@ -0,0 +1,223 @@
+# metrics_recorder.py
+import os
+import sys
+import csv
+import glob
+import time
+import threading
+from latency_histogram import LatencyHistogram
+
+HEADER = ["timestamp", "kind", "name", "value"]
+
+# Kaydedilen örnek türleri
+KIND_LATENCY = "latency"        # name: kullanıcı, value: ms
+KIND_THROUGHPUT = "throughput"  # value: B/s
+KIND_USERS = "users"            # value: aktif kullanıcı sayısı
+KIND_PING_SENT = "ping_sent"    # name: kullanıcı, value: 1
+KIND_PING_LOST = "ping_lost"    # name: kullanıcı, value: 1
+
+
+class MetricsRecorder:
+    """Metrik örneklerini dönen (rotating) CSV dosyalarına yazar
+    
+    Her satır: zaman damgası, tür, ad, değer. Etkin dosya max_bytes'ı aşınca
+    metrics.csv -> metrics.csv.1 -> ... -> metrics.csv.<max_files> olarak kaydırılır,
+    en eskisi silinir.
+    """
+    
+    def __init__(self, directory, max_bytes=10 * 1024 * 1024, max_files=5):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.path = os.path.join(directory, "metrics.csv")
+        self.lock = threading.Lock()
+        self.file = None
+        self.writer = None
+        
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+    
+    def _open(self):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self.file = open(self.path, "a", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(HEADER)
+    
+    def _rotate(self):
+        """Etkin dosyayı kapatır, eski dosyaları bir kaydırır ve yeni dosya açar"""
+        self.file.close()
+        for i in range(self.max_files - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        oldest = f"{self.path}.{self.max_files + 1}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        self._open()
+    
+    def write(self, kind, name, value, timestamp=None):
+        """Bir örneği kaydeder"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            if self.file is None:
+                return
+            self.writer.writerow([f"{timestamp:.3f}", kind, name or "", f"{value:g}"])
+            if self.file.tell() >= self.max_bytes:
+                self._rotate()
+    
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+    
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def recording_files(path):
+    """Kayıt dizinindeki (veya tek dosyadaki) dosyaları eskiden yeniye sıralar"""
+    if os.path.isfile(path):
+        return [path]
+    base = os.path.join(path, "metrics.csv")
+    rotated = glob.glob(base + ".*")
+    rotated.sort(key=lambda name: int(name.rsplit(".", 1)[1]), reverse=True)
+    return rotated + ([base] if os.path.exists(base) else [])
+
+
+def load_recording(path):
+    """Kaydı (zaman, tür, ad, değer) demetleri olarak eskiden yeniye üretir"""
+    for file_path in recording_files(path):
+        with open(file_path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) != 4 or row[0] == HEADER[0]:
+                    continue
+                try:
+                    yield float(row[0]), row[1], row[2], float(row[3])
+                except ValueError:
+                    # Yarıda kalmış son satır
+                    continue
+
+
+def replay_into(metrics, records):
+    """Kaydı bir PerformanceMetrics nesnesine orijinal zaman damgalarıyla yükler"""
+    last = None
+    for timestamp, kind, name, value in records:
+        if kind == KIND_LATENCY:
+            metrics.record_latency(name, value, timestamp)
+        elif kind == KIND_THROUGHPUT:
+            metrics.record_throughput(value, timestamp)
+        elif kind == KIND_USERS:
+            metrics.record_user_count(int(value), timestamp)
+        elif kind == KIND_PING_SENT:
+            metrics.record_ping_sent(name)
+        elif kind == KIND_PING_LOST:
+            metrics.record_ping_lost(name)
+        last = timestamp
+    # Görüntüleyici zaman eksenini şimdiye göre değil kaydın sonuna göre çizer
+    metrics.replay_end = last
+    return metrics
+
+
+def summarize(records):
+    """Kayıttan özet istatistikler üretir"""
+    latency = {}  # {kullanıcı: LatencyHistogram}
+    all_latency = LatencyHistogram()
+    throughput = []
+    users = []
+    pings = {}  # {kullanıcı: [gönderilen, kayıp]}
+    first = last = None
+    
+    for timestamp, kind, name, value in records:
+        if first is None:
+            first = timestamp
+        last = timestamp
+        if kind == KIND_LATENCY:
+            latency.setdefault(name, LatencyHistogram()).record(value)
+            all_latency.record(value)
+        elif kind == KIND_THROUGHPUT:
+            throughput.append(value)
+        elif kind == KIND_USERS:
+            users.append(value)
+        elif kind == KIND_PING_SENT:
+            pings.setdefault(name, [0, 0])[0] += 1
+        elif kind == KIND_PING_LOST:
+            pings.setdefault(name, [0, 0])[1] += 1
+    
+    def latency_summary(histogram):
+        summary = {"count": histogram.count, "mean": histogram.mean(), "max": histogram.max}
+        summary.update({f"p{p:g}": v for p, v in histogram.percentiles().items()})
+        return summary
+    
+    return {
+        "start": first,
+        "end": last,
+        "duration": (last - first) if first is not None else 0,
+        "latency": latency_summary(all_latency),
+        "latency_by_user": {name: latency_summary(h) for name, h in sorted(latency.items())},
+        "throughput": {
+            "mean": sum(throughput) / len(throughput) if throughput else 0,
+            "max": max(throughput) if throughput else 0
+        },
+        "users": {"max": max(users) if users else 0, "last": users[-1] if users else 0},
+        "pings": {
+            name: {"sent": sent, "lost": lost, "loss": lost / sent if sent else 0}
+            for name, (sent, lost) in sorted(pings.items())
+        }
+    }
+
+
+def print_summary(summary):
+    """summarize() çıktısını okunur biçimde yazar"""
+    def fmt(value):
+        return "-" if value is None else f"{value:.1f}"
+    
+    if summary["start"] is None:
+        print("Kayıt boş")
+        return
+    print(f"Aralık: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['start']))} - "
+          f"{time.strftime('%H:%M:%S', time.localtime(summary['end']))} ({summary['duration']:.0f} sn)")
+    print(f"Veri hızı: ort. {summary['throughput']['mean']:.1f} B/s, en yüksek {summary['throughput']['max']:.1f} B/s")
+    print(f"Kullanıcı sayısı: en fazla {summary['users']['max']:.0f}, son {summary['users']['last']:.0f}")
+    print(f"{'Gecikme (ms)':<20}{'örnek':>8}{'ort':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'p99.9':>8}{'maks':>8}")
+    rows = [("(tümü)", summary["latency"])] + list(summary["latency_by_user"].items())
+    for name, s in rows:
+        print(f"{name:<20}{s['count']:>8}{fmt(s['mean']):>8}{fmt(s.get('p50')):>8}{fmt(s.get('p90')):>8}"
+              f"{fmt(s.get('p99')):>8}{fmt(s.get('p99.9')):>8}{fmt(s['max']):>8}")
+    for name, p in summary["pings"].items():
+        print(f"Ping {name}: {p['sent']} gönderildi, {p['lost']} kayıp (%{p['loss'] * 100:.1f})")
+
+
+if __name__ == "__main__":
+    # Kullanım: python metrics_recorder.py summary <kayıt dizini|dosya>
+    #           python metrics_recorder.py replay <kayıt dizini|dosya>
+    if len(sys.argv) < 3 or sys.argv[1] not in ("summary", "replay"):
+        print("Kullanım: python metrics_recorder.py <summary|replay> <kayıt dizini veya dosyası>")
+        sys.exit(1)
+    
+    if sys.argv[1] == "summary":
+        print_summary(summarize(load_recording(sys.argv[2])))
+    else:
+        import tkinter as tk
+        from performance_metrices import PerformanceMetrics
+        from performance_viewer import PerformanceViewer
+        
+        metrics = replay_into(PerformanceMetrics(collect=False), load_recording(sys.argv[2]))
+        root = tk.Tk()
+        root.title(f"Performans Kaydı - {sys.argv[2]}")
+        root.geometry("900x700")
+        viewer = PerformanceViewer(root, metrics)
+        viewer.auto_refresh_var.set(False)
+        viewer.update_graphs()
+        
+        def on_closing():
+            viewer.on_close()
+            root.destroy()
+        
+        root.protocol("WM_DELETE_WINDOW", on_closing)
+        root.mainloop()
@@ -3,106 +3,375 @@ import threading
 import json
 import socket
 import math
+import secrets
+import heapq
+from collections import OrderedDict
+from link_stats import LinkStats
+
+class TopologySnapshot:
+    """Topolojinin belirli bir sürümdeki değiştirilemez görüntüsü
+    
+    Yazarlar canlı yapıları değiştirirken okuyucular bu kopyayı kilitsiz kullanır.
+    İçerik hiçbir zaman değiştirilmez; serileştirilmiş hali bir kez üretilip paylaşılır.
+    """
+    
+    def __init__(self, version, nodes, connections):
+        self.version = version
+        self.nodes = nodes
+        self.connections = connections
+        self.data = {"nodes": nodes, "connections": connections}
+        self._json = None
+        self._encoded = None
+        self._lock = threading.Lock()
+    
+    def to_json(self):
+        """JSON metnini bir kez üretir, sonraki çağrılarda önbellekten döner"""
+        with self._lock:
+            if self._json is None:
+                self._json = json.dumps(self.data)
+            return self._json
+    
+    def encoded(self, encoder):
+        """encoder(data) sonucunu (ör. protokol mesajı) bir kez hesaplayıp paylaşır"""
+        with self._lock:
+            if self._encoded is None:
+                self._encoded = encoder(self.data)
+            return self._encoded
+
 
 class NetworkTopology:
     def __init__(self):
         self.nodes = {}  # {username: {"ip": ip, "port": port, "latency": avg_latency}}
-        self.connections = []  # [{"from": user1, "to": user2, "quality": quality}]
+        self.edges = {}  # {(user1, user2): {"from": user1, "to": user2, "quality": quality}} sıralı çift anahtar
+        self.adjacency = {}  # {username: set(komşu kullanıcılar)}
+        self.node_stats = {}  # {username: LinkStats}
+        self.edge_stats = {}  # {(user1, user2): LinkStats} edges ile aynı anahtar
         self.lock = threading.Lock()
+        
+        # Sürüm ve değişiklik günlüğü: istemciler sadece farkları ister
+        self.epoch = secrets.token_hex(4)  # Sunucu yeniden başlarsa değişir
+        self.version = 0
+        # Günlükte her anahtar bir kez, son değiştiği sürümle tutulur (sürüm sırasıyla);
+        # sık güncellenen düğümler günlüğü doldurmaz, boyut farklı anahtar sayısıyla sınırlıdır
+        self.journal = OrderedDict()  # {("node"/"edge", key): son sürüm}
+        self.journal_limit = 20000  # En fazla farklı anahtar (silinenler dahil)
+        self.journal_floor = 0  # Bu sürümden sonraki tüm değişiklikler günlükte
+        self._snapshot = None  # Son yayınlanan TopologySnapshot
+        self.history = None  # İsteğe bağlı TimeSeriesStore: ölçümler zaman serisine de yazılır
         self.inactive_timeout = 60  # 60 saniye boyunca görünmeyen düğümler inactive sayılacak
+        
+        # Süre dolumu: her düğüm için heap'te tek geçerli kayıt (deadline, username).
+        # last_seen güncellenince heap'e dokunulmaz; kayıt çıktığında tekrar kontrol edilir.
+        self.expiry_heap = []
+        self.expiry_deadlines = {}  # {username: heap'teki geçerli deadline}
+        self.reaper_thread = None
+        self.reaper_stop = threading.Event()
+    
+    @property
+    def connections(self):
+        """Bağlantıların liste hali (sadece serileştirme için üretilir)"""
+        return list(self.edges.values())
+    
+    @staticmethod
+    def _edge_key(user1, user2):
+        """Yönsüz bağlantı için sıralı anahtar"""
+        return (user1, user2) if user1 <= user2 else (user2, user1)
+    
+    def _touch(self, kind, key):
+        """Değişikliği yeni bir sürüm olarak günlüğe yazar (kilit altında çağrılır)"""
+        self.version += 1
+        entry = (kind, key)
+        self.journal.pop(entry, None)
+        self.journal[entry] = self.version
+        if len(self.journal) > self.journal_limit:
+            # En eski kayıt düşer; o sürümden eski istemciler tam görüntü alır
+            _, self.journal_floor = self.journal.popitem(last=False)
+    
+    def _record_history(self, sample):
+        """Ölçümü zaman serisi deposuna yazar (topoloji kilidi dışında çağrılır)"""
+        if sample is not None and self.history is not None:
+            self.history.record(*sample)
     
     def add_or_update_node(self, username, ip, port, latency=None):
         """Düğüm ekler veya günceller"""
+        sample = None
         with self.lock:
             if username in self.nodes:
                 # Düğüm zaten var, güncelle
                 self.nodes[username]["last_seen"] = time.time()
                 self.nodes[username]["ip"] = ip
                 self.nodes[username]["port"] = port
-                
-                if latency is not None:
-                    # Ortalama gecikmeyi güncelle
-                    old_latency = self.nodes[username].get("latency", latency)
-                    new_latency = (old_latency + latency) / 2
-                    self.nodes[username]["latency"] = new_latency
-                    print(f"[TOPO] Düğüm güncellendi: {username}, latency={new_latency:.2f}ms")
             else:
                 self.nodes[username] = {
                     "ip": ip,
                     "port": port,
-                    "latency": latency,
+                    "latency": None,
                     "last_seen": time.time()
                 }
+                self._schedule_expiry(username)
                 print(f"[TOPO] Yeni düğüm eklendi: {username}, ip={ip}:{port}")
-
-    def update_connection_quality(self, from_user, to_user, quality):
-        """İki düğüm arasındaki bağlantı kalitesini günceller"""
+            
+            if latency is not None:
+                # Gecikme istatistiklerini güncelle (EWMA, jitter, yüzdelikler)
+                stats = self.node_stats.setdefault(username, LinkStats())
+                stats.add_sample(latency)
+                self.nodes[username].update(stats.to_dict())
+                sample = ("node", username, latency, stats.loss, stats.quality())
+            
+            self._touch("node", username)
+        self._record_history(sample)
+    
+    def record_node_loss(self, username):
+        """Düğüme gönderilip yanıtı gelmeyen bir ölçümü kaydeder"""
+        with self.lock:
+            node = self.nodes.get(username)
+            if node is None:
+                return
+            stats = self.node_stats.setdefault(username, LinkStats())
+            stats.add_loss()
+            node.update(stats.to_dict())
+            sample = ("node", username, None, stats.loss, stats.quality())
+            self._touch("node", username)
+        self._record_history(sample)
+    
+    def update_link(self, from_user, to_user, latency=None, lost=False, record=True):
+        """Bağlantıya bir gecikme ölçümü veya kayıp ekler, kaliteyi istatistiklerden hesaplar
+        
+        record=False: ölçüm zaten düğüm serisine yazıldıysa geçmişe ikinci kez yazılmaz.
+        """
+        with self.lock:
+            key = self._edge_key(from_user, to_user)
+            if lost and key not in self.edges:
+                return
+            
+            stats = self.edge_stats.setdefault(key, LinkStats())
+            if lost:
+                stats.add_loss()
+            elif latency is not None:
+                stats.add_sample(latency)
+            
+            conn = self._get_or_create_edge(key, from_user, to_user)
+            conn.update(stats.to_dict())
+            conn["quality"] = stats.quality()
+            # Bağlantı serisinin adı sıralı kullanıcı çiftidir
+            sample = ("edge", key, None if lost else latency, stats.loss, conn["quality"]) if record else None
+            self._touch("edge", key)
+        self._record_history(sample)
+    
+    def _get_or_create_edge(self, key, from_user, to_user):
+        """Bağlantı kaydını döndürür, yoksa oluşturur (kilit altında çağrılır)"""
+        conn = self.edges.get(key)
+        if conn is None:
+            conn = {
+                "from": from_user,
+                "to": to_user,
+                "quality": 100
+            }
+            self.edges[key] = conn
+            self.adjacency.setdefault(from_user, set()).add(to_user)
+            self.adjacency.setdefault(to_user, set()).add(from_user)
+            print(f"[TOPO] Yeni bağlantı eklendi: {from_user} <-> {to_user}")
+        return conn
+    
+    def update_connection_quality(self, from_user, to_user, quality, latency=None):
+        """İki düğüm arasındaki bağlantı kalitesini (ve varsa gecikmesini) günceller"""
         with self.lock:
             try:
                 # Quality değerini sınırla (0-100)
                 quality = max(0, min(100, float(quality)))
                 
-                # Mevcut bağlantıyı ara ve güncelle
-                connection_found = False
-                for conn in self.connections:
-                    if (conn["from"] == from_user and conn["to"] == to_user) or \
-                       (conn["from"] == to_user and conn["to"] == from_user):
-                        # Ortalama değer yerine en güncel değeri kullan
-                        conn["quality"] = quality
-                        connection_found = True
-                        print(f"[TOPO] Bağlantı güncellendi: {from_user} <-> {to_user}, quality={quality:.1f}%")
-                        break
-                
-                # Bağlantı yoksa yeni ekle
-                if not connection_found:
-                    self.connections.append({
-                        "from": from_user,
-                        "to": to_user,
-                        "quality": quality
-                    })
-                    print(f"[TOPO] Yeni bağlantı eklendi: {from_user} <-> {to_user}, quality={quality}%")
+                # Bağlantıyı sözlükten bul (iki yön de aynı anahtara düşer)
+                key = self._edge_key(from_user, to_user)
+                conn = self._get_or_create_edge(key, from_user, to_user)
+                conn["quality"] = quality
+                if latency is not None:
+                    conn["latency"] = latency
+                self._touch("edge", key)
             except Exception as e:
                 print(f"[ERROR] Bağlantı kalitesi güncelleme hatası: {e}")
     
+    def link_latency(self, user1, user2):
+        """Bağlantının EWMA gecikmesini döndürür (ölçüm yoksa None)"""
+        with self.lock:
+            stats = self.edge_stats.get(self._edge_key(user1, user2))
+            if stats is None or stats.samples == 0:
+                return None
+            return stats.ewma
+    
+    def _remove_node(self, username):
+        """Düğümü ve bağlantılarını kaldırır (kilit altında çağrılır)
+        
+        Geçmiş deposundan bellekten çıkarılacak serileri [(kind, name)] döndürür.
+        """
+        retired = [("node", username)]
+        self.nodes.pop(username, None)
+        self.node_stats.pop(username, None)
+        self.expiry_deadlines.pop(username, None)
+        self._touch("node", username)
+        
+        # Sadece bu düğümün komşularına dokunulur
+        for neighbor in self.adjacency.pop(username, ()):
+            key = self._edge_key(username, neighbor)
+            self.edges.pop(key, None)
+            self.edge_stats.pop(key, None)
+            self._touch("edge", key)
+            retired.append(("edge", key))
+            neighbors = self.adjacency.get(neighbor)
+            if neighbors is not None:
+                neighbors.discard(username)
+        return retired
+    
+    def _schedule_expiry(self, username):
+        """Düğümün son görülme zamanına göre heap'e süre dolumu kaydı ekler (kilit altında çağrılır)"""
+        deadline = self.nodes[username]["last_seen"] + self.inactive_timeout
+        self.expiry_deadlines[username] = deadline
+        heapq.heappush(self.expiry_heap, (deadline, username))
+    
     def clean_inactive_nodes(self):
-        """Belirli bir süre görünmeyen düğümleri temizler"""
+        """Süresi dolan düğümleri temizler, bir sonraki kontrol zamanını döndürür
+        
+        Sadece heap'in başındaki süresi geçmiş kayıtlara bakılır; düğüm bu arada
+        görüldüyse yeni deadline ile tekrar eklenir.
+        """
+        retired = []
         with self.lock:
             current_time = time.time()
-            inactive_nodes = []
             
-            # İnaktif düğümleri belirle
-            for username, node in list(self.nodes.items()):
-                if current_time - node["last_seen"] > self.inactive_timeout:
-                    inactive_nodes.append(username)
-            
-            # İnaktif düğümleri kaldır
-            for username in inactive_nodes:
-                del self.nodes[username]
-                print(f"[TOPO] İnaktif düğüm kaldırıldı: {username}")
+            while self.expiry_heap and self.expiry_heap[0][0] <= current_time:
+                deadline, username = heapq.heappop(self.expiry_heap)
+                
+                # Düğüm silinmiş veya kayıt eskimişse atla
+                if self.expiry_deadlines.get(username) != deadline:
+                    continue
+                
+                if current_time - self.nodes[username]["last_seen"] > self.inactive_timeout:
+                    # İnaktif düğümü bağlantılarıyla birlikte kaldır
+                    retired += self._remove_node(username)
+                    print(f"[TOPO] İnaktif düğüm kaldırıldı: {username}")
+                else:
+                    self._schedule_expiry(username)
             
-            # İnaktif düğümlerin bağlantılarını da kaldır
-            if inactive_nodes:
-                self.connections = [conn for conn in self.connections 
-                                   if conn["from"] not in inactive_nodes and conn["to"] not in inactive_nodes]
-                print(f"[TOPO] İnaktif düğümlerin {len(inactive_nodes)} bağlantısı kaldırıldı")
+            next_deadline = self.expiry_heap[0][0] if self.expiry_heap else None
+        
+        # Ayrılan kullanıcıların serileri geçmiş deposunun belleğinden çıkarılır
+        if self.history is not None:
+            for kind, name in retired:
+                self.history.retire(kind, name)
+        return next_deadline
+    
+    def start_reaper(self, interval=5.0):
+        """İnaktif düğümleri arka planda temizleyen thread'i başlatır"""
+        if self.reaper_thread is not None:
+            return
+        
+        def reap():
+            while not self.reaper_stop.is_set():
+                try:
+                    next_deadline = self.clean_inactive_nodes()
+                except Exception as e:
+                    print(f"[TOPO] Temizleme hatası: {e}")
+                    next_deadline = None
+                
+                # Bir sonraki süre dolumuna kadar (en fazla interval kadar) bekle
+                wait = interval
+                if next_deadline is not None:
+                    wait = max(0.05, min(interval, next_deadline - time.time()))
+                self.reaper_stop.wait(wait)
+        
+        self.reaper_stop.clear()
+        self.reaper_thread = threading.Thread(target=reap)
+        self.reaper_thread.daemon = True
+        self.reaper_thread.start()
+    
+    def stop_reaper(self):
+        """Temizleme thread'ini durdurur"""
+        self.reaper_stop.set()
+        self.reaper_thread = None
+    
+    def snapshot(self):
+        """Güncel sürümün değiştirilemez görüntüsünü döndürür
+        
+        Görüntü her sürüm için bir kez kopyalanır; aynı sürümü isteyen okuyucular
+        kilit almadan aynı nesneyi paylaşır.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        
+        with self.lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self.version:
+                snapshot = TopologySnapshot(
+                    self.version,
+                    {name: dict(node) for name, node in self.nodes.items()},
+                    [dict(conn) for conn in self.edges.values()]
+                )
+                # Referans ataması atomik: eski görüntüyü tutan okuyucular etkilenmez
+                self._snapshot = snapshot
+                print(f"[TOPO] Topoloji görüntüsü oluşturuldu: v{snapshot.version}, "
+                      f"{len(snapshot.nodes)} düğüm, {len(snapshot.connections)} bağlantı")
+            return snapshot
     
     def get_topology_data(self):
-        """Topoloji verilerini döndürür"""
-        # Önce inaktif düğümleri temizle
-        self.clean_inactive_nodes()
+        """Topoloji verilerini döndürür (değiştirilmemesi gereken paylaşılan görüntü)"""
+        return self.snapshot().data
+    
+    def get_delta(self, since=0, epoch=None):
+        """since sürümünden bu yana eklenen, değişen ve silinen düğüm/bağlantıları döndürür
         
+        Günlük yetmiyorsa (çok eski sürüm veya farklı epoch) tam görüntü döner.
+        """
         with self.lock:
-            data = {
-                "nodes": self.nodes,
-                "connections": self.connections
+            full = epoch != self.epoch or since < self.journal_floor or since > self.version
+        
+        if full:
+            snapshot = self.snapshot()
+            return {
+                "epoch": self.epoch,
+                "version": snapshot.version,
+                "full": True,
+                "nodes": snapshot.nodes,
+                "connections": snapshot.connections
             }
-            print(f"[TOPO] Topoloji verisi oluşturuldu: {len(self.nodes)} düğüm, {len(self.connections)} bağlantı")
-            return data
+        
+        with self.lock:
+            # Günlüğü sondan geriye, since sürümüne kadar tara
+            changed_nodes = set()
+            changed_edges = set()
+            for (kind, key), version in reversed(self.journal.items()):
+                if version <= since:
+                    break
+                if kind == "node":
+                    changed_nodes.add(key)
+                else:
+                    changed_edges.add(key)
+            
+            delta = {
+                "epoch": self.epoch,
+                "version": self.version,
+                "full": False,
+                "nodes": {},
+                "connections": [],
+                "removed_nodes": [],
+                "removed_connections": []
+            }
+            for name in changed_nodes:
+                node = self.nodes.get(name)
+                if node is None:
+                    delta["removed_nodes"].append(name)
+                else:
+                    delta["nodes"][name] = dict(node)
+            for key in changed_edges:
+                conn = self.edges.get(key)
+                if conn is None:
+                    delta["removed_connections"].append(list(key))
+                else:
+                    delta["connections"].append(dict(conn))
+            
+            print(f"[TOPO] Fark verisi oluşturuldu: v{since} -> v{self.version}, "
+                  f"{len(changed_nodes)} düğüm, {len(changed_edges)} bağlantı")
+            return delta
     
     def to_json(self):
         """Topoloji verilerini JSON formatında döndürür"""
-        with self.lock:
-            return json.dumps({
-                "nodes": self.nodes,
-                "connections": self.connections
-            })
\ No newline at end of file
+        return self.snapshot().to_json()
\ No newline at end of file
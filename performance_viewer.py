@@ -0,0 +1,548 @@
+# performance_viewer.py
+import tkinter as tk
+from tkinter import ttk
+import time
+from performance_metrices import PerformanceMetrics
+
+# matplotlib ağır bir bağımlılık: sadece ilk görüntüleyici açıldığında yüklenir
+MATPLOTLIB_AVAILABLE = None  # None: henüz denenmedi
+Figure = None
+FigureCanvasTkAgg = None
+
+
+def load_matplotlib():
+    """matplotlib'i ilk çağrıda yükler, kullanılabilir olup olmadığını döndürür"""
+    global MATPLOTLIB_AVAILABLE, Figure, FigureCanvasTkAgg
+    if MATPLOTLIB_AVAILABLE is None:
+        try:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+            MATPLOTLIB_AVAILABLE = True
+            print("[DEBUG] Matplotlib başarıyla import edildi")
+        except ImportError as e:
+            print(f"[WARNING] Matplotlib import edilemedi: {e}")
+            MATPLOTLIB_AVAILABLE = False
+    return MATPLOTLIB_AVAILABLE
+
+
+class PerformanceViewer:
+    def __init__(self, master, metrics):
+        self.master = master
+        self.metrics = metrics
+        self.after_id = None
+        self.max_plot_points = 500  # Uzun geçmiş bu kadar noktaya indirgenip çizilir
+        self.x_spans = (60, 300, 900, 1800, 3600, 3 * 3600)  # Zaman ekseni genişlikleri (sn)
+        
+        print("[DEBUG] PerformanceViewer başlatılıyor...")
+        load_matplotlib()
+        
+        # Ana çerçeve
+        self.frame = ttk.Frame(master)
+        self.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Başlık
+        self.title_label = ttk.Label(
+            self.frame, 
+            text="Performans Metrikleri", 
+            font=("Segoe UI", 14, "bold")
+        )
+        self.title_label.pack(pady=(0, 10))
+        
+        # Veri durumu bilgisi
+        self.info_label = ttk.Label(
+            self.frame, 
+            text="Gerçek zamanlı veriler bekleniyor...", 
+            font=("Segoe UI", 10),
+            foreground="gray"
+        )
+        self.info_label.pack(pady=(0, 10))
+        
+        if not MATPLOTLIB_AVAILABLE:
+            # Matplotlib yoksa sadece metin tabanlı görünüm
+            self.create_text_view()
+        else:
+            # Matplotlib varsa grafik görünümü
+            self.create_graph_view()
+        
+        print("[DEBUG] PerformanceViewer başarıyla oluşturuldu")
+    
+    def create_text_view(self):
+        """Matplotlib olmadığında metin tabanlı görünüm"""
+        # Bilgi paneli
+        info_frame = ttk.LabelFrame(self.frame, text="Performans İstatistikleri", padding=10)
+        info_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # İstatistik etiketleri
+        self.avg_latency_label = ttk.Label(info_frame, text="Ortalama Gecikme: Veri yok")
+        self.avg_latency_label.pack(anchor=tk.W, pady=2)
+        
+        self.percentile_label = ttk.Label(info_frame, text="Gecikme Yüzdelikleri: Veri yok")
+        self.percentile_label.pack(anchor=tk.W, pady=2)
+        
+        self.avg_throughput_label = ttk.Label(info_frame, text="Ortalama Veri Hızı: Veri yok")
+        self.avg_throughput_label.pack(anchor=tk.W, pady=2)
+        
+        self.peak_throughput_label = ttk.Label(info_frame, text="En Yüksek Veri Hızı: Veri yok")
+        self.peak_throughput_label.pack(anchor=tk.W, pady=2)
+        
+        self.user_count_label = ttk.Label(info_frame, text="Kullanıcı Sayısı: Veri yok")
+        self.user_count_label.pack(anchor=tk.W, pady=2)
+        
+        # Veri sayısı bilgisi
+        self.data_count_label = ttk.Label(info_frame, text="Toplam Veri Noktası: 0")
+        self.data_count_label.pack(anchor=tk.W, pady=2)
+        
+        # Kontrol paneli
+        control_frame = ttk.Frame(self.frame)
+        control_frame.pack(fill=tk.X, pady=10)
+        
+        # Yenile düğmesi
+        self.refresh_btn = ttk.Button(
+            control_frame,
+            text="Yenile",
+            command=self.update_text_stats
+        )
+        self.refresh_btn.pack(side=tk.LEFT)
+        
+        # Otomatik yenile
+        self.auto_refresh_var = tk.BooleanVar(value=True)
+        auto_refresh_cb = ttk.Checkbutton(
+            control_frame,
+            text="Otomatik Yenile",
+            variable=self.auto_refresh_var,
+            onvalue=True,
+            offvalue=False
+        )
+        auto_refresh_cb.pack(side=tk.LEFT, padx=10)
+        
+        # İlk güncelleme
+        self.update_text_stats()
+        self.start_auto_refresh()
+    
+    def create_graph_view(self):
+        """Matplotlib ile grafik görünümü"""
+        # Grafik panelleri için notebook
+        self.notebook = ttk.Notebook(self.frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        
+        # Gecikme (Latency) grafik paneli
+        self.latency_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.latency_frame, text="Gecikme (Latency)")
+        
+        # Veri aktarım hızı (Throughput) grafik paneli
+        self.throughput_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.throughput_frame, text="Veri Aktarım Hızı")
+        
+        # Ölçeklenebilirlik (Scalability) grafik paneli
+        self.scalability_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.scalability_frame, text="Ölçeklenebilirlik")
+        
+        # Kontrol paneli
+        self.control_frame = ttk.Frame(self.frame)
+        self.control_frame.pack(fill=tk.X, pady=10)
+        
+        # Yenileme aralığı
+        ttk.Label(self.control_frame, text="Yenileme aralığı:").pack(side=tk.LEFT, padx=(0, 5))
+        self.refresh_var = tk.StringVar(value="1 sn")
+        refresh_combo = ttk.Combobox(
+            self.control_frame,
+            values=["0.5 sn", "1 sn", "2 sn", "5 sn", "10 sn"],
+            textvariable=self.refresh_var,
+            width=6,
+            state="readonly"
+        )
+        refresh_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Yenile düğmesi
+        self.refresh_btn = ttk.Button(
+            self.control_frame,
+            text="Grafikleri Yenile",
+            command=self.update_graphs
+        )
+        self.refresh_btn.pack(side=tk.RIGHT)
+        
+        # Otomatik yenile
+        self.auto_refresh_var = tk.BooleanVar(value=True)
+        auto_refresh_cb = ttk.Checkbutton(
+            self.control_frame,
+            text="Otomatik Yenile",
+            variable=self.auto_refresh_var,
+            onvalue=True,
+            offvalue=False
+        )
+        auto_refresh_cb.pack(side=tk.RIGHT, padx=10)
+        
+        # Grafikleri oluştur
+        self.create_latency_graph()
+        self.create_throughput_graph()
+        self.create_scalability_graph()
+        
+        # Sekme değişince görünür olan grafik hemen güncellensin
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.update_graphs())
+        
+        # Otomatik yenileme için
+        self.start_auto_refresh()
+    
+    def _create_graph(self, frame, title, ylabel, empty_text):
+        """Figür, eksen ve boş durum metnini bir kez oluşturur, çizim durumunu döndürür
+        
+        Çizgiler animated=True oluşturulur: canvas.draw() onları çizmez, arka plan
+        (eksenler, ızgara, lejant) bir kez çizilip saklanır, her yenilemede sadece
+        çizgiler bu arka planın üzerine çizilip blit edilir.
+        """
+        fig = Figure(figsize=(8, 6), dpi=100)
+        ax = fig.add_subplot(111)
+        
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        ax.set_title(title)
+        ax.set_xlabel('Zaman (sn önce)')
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+        ax.set_xlim(-self.x_spans[0], 0)
+        ax.set_ylim(0, 1)
+        empty = ax.text(0.5, 0.5, empty_text,
+                        horizontalalignment='center', verticalalignment='center',
+                        transform=ax.transAxes)
+        
+        graph = {
+            "fig": fig,
+            "ax": ax,
+            "canvas": canvas,
+            "background": None,
+            "lines": {},  # {etiket: Line2D}
+            "empty": empty,
+            "span": self.x_spans[0],
+            "top": 1
+        }
+        # Tam çizimden (boyut değişimi, sekme değişimi, eksen değişimi) sonra arka planı yenile
+        graph["draw_cid"] = canvas.mpl_connect("draw_event", lambda event: self._on_graph_draw(graph))
+        canvas.draw()
+        return graph
+    
+    def _on_graph_draw(self, graph):
+        """Tam çizimden sonra arka planı saklar ve çizgileri üzerine çizer"""
+        graph["background"] = graph["canvas"].copy_from_bbox(graph["fig"].bbox)
+        for line in graph["lines"].values():
+            graph["ax"].draw_artist(line)
+    
+    def _update_graph(self, graph, data, style=None, legend=False):
+        """Çizgilerin sadece verisini değiştirir ve blit ile ekrana basar
+        
+        data: {etiket: (x, y)}. Eksen sınırları veya seri kümesi değişirse bir kez
+        tam çizim yapılır; diğer yenilemelerde maliyet sadece çizgi sayısıyla orantılıdır.
+        """
+        ax = graph["ax"]
+        lines = graph["lines"]
+        full = False
+        
+        # Seri eklendi veya çıktıysa çizgileri ve lejantı yenile
+        if set(data) != set(lines):
+            for label in list(lines):
+                if label not in data:
+                    lines.pop(label).remove()
+            for label in data:
+                if label not in lines:
+                    lines[label] = ax.plot([], [], style or '-', label=label, animated=True)[0]
+            if legend:
+                if lines:
+                    ax.legend(handles=list(lines.values()))
+                elif ax.get_legend() is not None:
+                    ax.get_legend().remove()
+            full = True
+        
+        # Eksen sınırları kademeli değişir; her yenilemede tam çizim gerekmez
+        oldest = 0
+        highest = 0
+        for x, y in data.values():
+            if len(x):
+                oldest = min(oldest, x[0])
+                highest = max(highest, max(y))
+        
+        span = next((s for s in self.x_spans if s >= -oldest), self.x_spans[-1])
+        if span != graph["span"]:
+            graph["span"] = span
+            ax.set_xlim(-span, 0)
+            full = True
+        
+        if highest > graph["top"] or highest < graph["top"] * 0.25:
+            graph["top"] = highest * 1.3 if highest > 0 else 1
+            ax.set_ylim(0, graph["top"])
+            full = True
+        
+        has_data = bool(data)
+        if graph["empty"].get_visible() == has_data:
+            graph["empty"].set_visible(not has_data)
+            full = True
+        
+        for label, (x, y) in data.items():
+            line = lines[label]
+            line.set_data(x, y)
+            line.set_marker('o' if len(x) <= 100 else '')
+        
+        canvas = graph["canvas"]
+        if full or graph["background"] is None:
+            # draw_event arka planı saklar ve çizgileri çizer
+            canvas.draw()
+        else:
+            canvas.restore_region(graph["background"])
+            for line in lines.values():
+                ax.draw_artist(line)
+            canvas.blit(graph["fig"].bbox)
+    
+    def create_latency_graph(self):
+        """Gecikme grafiği oluştur"""
+        try:
+            # Yüzdelik özeti (ortalama kuyruktaki sıçramaları gizler)
+            self.percentile_label = ttk.Label(
+                self.latency_frame,
+                text="Gecikme yüzdelikleri: Veri yok",
+                font=("Segoe UI", 10)
+            )
+            self.percentile_label.pack(anchor=tk.W, pady=(5, 0))
+            
+            self.latency_graph = self._create_graph(
+                self.latency_frame,
+                'Gecikme Süresi (Latency)',
+                'Gecikme (ms)',
+                'Henüz gecikme verisi yok'
+            )
+            
+            print("[DEBUG] Gecikme grafiği oluşturuldu")
+        except Exception as e:
+            print(f"[ERROR] Gecikme grafiği oluşturulurken hata: {e}")
+    
+    def create_throughput_graph(self):
+        """Veri aktarım hızı grafiği oluştur"""
+        try:
+            self.throughput_graph = self._create_graph(
+                self.throughput_frame,
+                'Veri Aktarım Hızı (Throughput)',
+                'Hız (B/s)',
+                'Henüz veri aktarım hızı verisi yok'
+            )
+            
+            print("[DEBUG] Veri aktarım hızı grafiği oluşturuldu")
+        except Exception as e:
+            print(f"[ERROR] Veri aktarım hızı grafiği oluşturulurken hata: {e}")
+    
+    def create_scalability_graph(self):
+        """Ölçeklenebilirlik grafiği oluştur"""
+        try:
+            self.scalability_graph = self._create_graph(
+                self.scalability_frame,
+                'Kullanıcı Sayısı (Scalability)',
+                'Kullanıcı Sayısı',
+                'Henüz kullanıcı sayısı verisi yok'
+            )
+            
+            print("[DEBUG] Ölçeklenebilirlik grafiği oluşturuldu")
+        except Exception as e:
+            print(f"[ERROR] Ölçeklenebilirlik grafiği oluşturulurken hata: {e}")
+    
+    def update_latency_graph(self):
+        """Gecikme grafiğini güncelle"""
+        if not MATPLOTLIB_AVAILABLE:
+            return
+        
+        try:
+            data = {}
+            with self.metrics.lock:
+                for username, series in self.metrics.latency_history.items():
+                    if len(series):
+                        data[username] = self.plot_points(series)
+            
+            self._update_graph(self.latency_graph, data, legend=True)
+            
+            if data:
+                self.percentile_label.config(
+                    text="Gecikme yüzdelikleri (tümü): " + self.format_percentiles(self.metrics.get_latency_percentiles())
+                )
+        
+        except Exception as e:
+            print(f"[ERROR] Gecikme grafiği güncellenirken hata: {e}")
+    
+    def update_throughput_graph(self):
+        """Veri aktarım hızı grafiğini güncelle"""
+        if not MATPLOTLIB_AVAILABLE:
+            return
+        
+        try:
+            data = {}
+            with self.metrics.lock:
+                if len(self.metrics.throughput_history):
+                    data["throughput"] = self.plot_points(self.metrics.throughput_history)
+            
+            self._update_graph(self.throughput_graph, data, style='b-')
+        
+        except Exception as e:
+            print(f"[ERROR] Veri aktarım hızı grafiği güncellenirken hata: {e}")
+    
+    def update_scalability_graph(self):
+        """Ölçeklenebilirlik grafiğini güncelle"""
+        if not MATPLOTLIB_AVAILABLE:
+            return
+        
+        try:
+            data = {}
+            with self.metrics.lock:
+                if len(self.metrics.user_count_history):
+                    data["users"] = self.plot_points(self.metrics.user_count_history, how="max")
+            
+            self._update_graph(self.scalability_graph, data, style='g-')
+        
+        except Exception as e:
+            print(f"[ERROR] Ölçeklenebilirlik grafiği güncellenirken hata: {e}")
+    
+    def plot_points(self, series, how="mean"):
+        """Seriyi en fazla max_plot_points noktaya indirger, x ekseni 'kaç saniye önce' olur"""
+        times, values = series.arrays()
+        span = times[-1] - times[0]
+        if len(times) > self.max_plot_points and span > 0:
+            times, values = series.resample(span / self.max_plot_points, how=how)
+        now = self.metrics.replay_end or time.time()
+        return [t - now for t in times], values
+    
+    @staticmethod
+    def format_percentiles(values):
+        """{yüzdelik: ms} sözlüğünü 'p50 12.3 ms  p90 ...' metnine çevirir"""
+        if not values:
+            return "Veri yok"
+        return "  ".join(f"p{p:g} {value:.1f} ms" for p, value in sorted(values.items()))
+    
+    def update_text_stats(self):
+        """Metin tabanlı istatistikleri güncelle"""
+        try:
+            avg_latency = self.metrics.get_avg_latency()
+            avg_throughput = self.metrics.get_avg_throughput()
+            peak_throughput = self.metrics.get_peak_throughput()
+            user_stats = self.metrics.get_user_count_stats()
+            
+            # Veri var mı kontrol et
+            has_latency_data = any(len(latencies) > 0 for latencies in self.metrics.latency_history.values())
+            has_throughput_data = len(self.metrics.throughput_history) > 0
+            has_user_data = len(self.metrics.user_count_history) > 0
+            
+            # Toplam veri noktası sayısı
+            total_data_points = (sum(len(latencies) for latencies in self.metrics.latency_history.values()) + 
+                               len(self.metrics.throughput_history) + 
+                               len(self.metrics.user_count_history))
+            
+            if has_latency_data:
+                self.avg_latency_label.config(text=f"Ortalama Gecikme: {avg_latency:.2f} ms")
+                self.percentile_label.config(
+                    text="Gecikme Yüzdelikleri: " + self.format_percentiles(self.metrics.get_latency_percentiles())
+                )
+            else:
+                self.avg_latency_label.config(text="Ortalama Gecikme: Veri yok")
+                self.percentile_label.config(text="Gecikme Yüzdelikleri: Veri yok")
+            
+            if has_throughput_data:
+                self.avg_throughput_label.config(text=f"Ortalama Veri Hızı: {avg_throughput:.2f} B/s")
+                self.peak_throughput_label.config(text=f"En Yüksek Veri Hızı: {peak_throughput:.2f} B/s")
+            else:
+                self.avg_throughput_label.config(text="Ortalama Veri Hızı: Veri yok")
+                self.peak_throughput_label.config(text="En Yüksek Veri Hızı: Veri yok")
+            
+            if has_user_data:
+                self.user_count_label.config(text=f"Kullanıcı Sayısı: {user_stats['current']}")
+            else:
+                self.user_count_label.config(text="Kullanıcı Sayısı: Veri yok")
+            
+            self.data_count_label.config(text=f"Toplam Veri Noktası: {total_data_points}")
+            
+            # Ana bilgi etiketini güncelle
+            if total_data_points > 0:
+                self.info_label.config(text=f"Gerçek zamanlı veriler görüntüleniyor ({total_data_points} veri noktası)")
+            else:
+                self.info_label.config(text="Gerçek zamanlı veriler bekleniyor...")
+        
+        except Exception as e:
+            print(f"[ERROR] Metin istatistikleri güncellenirken hata: {e}")
+    
+    def update_graphs(self):
+        """Görünür sekmedeki grafiği güncelle (gizli sekmeler çizilmez)"""
+        if MATPLOTLIB_AVAILABLE:
+            updates = (self.update_latency_graph, self.update_throughput_graph, self.update_scalability_graph)
+            updates[self.notebook.index("current")]()
+        else:
+            self.update_text_stats()
+    
+    def start_auto_refresh(self):
+        """Otomatik yenileme döngüsü"""
+        def refresh_loop():
+            try:
+                # Pencere hala var mı kontrol et
+                if not self.master.winfo_exists():
+                    return
+                
+                if self.auto_refresh_var.get():
+                    self.update_graphs()
+                    
+                    # Seçilen aralığa göre zamanla
+                    interval_text = self.refresh_var.get() if hasattr(self, 'refresh_var') else "2 sn"
+                    if interval_text == "0.5 sn":
+                        interval = 500
+                    elif interval_text == "1 sn":
+                        interval = 1000
+                    elif interval_text == "2 sn":
+                        interval = 2000
+                    elif interval_text == "5 sn":
+                        interval = 5000
+                    else:
+                        interval = 10000
+                    
+                    # after_id'yi saklayarak daha sonra iptal edebiliriz
+                    self.after_id = self.master.after(interval, refresh_loop)
+                else:
+                    # Otomatik yenileme kapalıysa 500ms sonra tekrar kontrol et
+                    self.after_id = self.master.after(500, refresh_loop)
+            
+            except Exception as e:
+                print(f"[ERROR] Otomatik yenileme hatası: {e}")
+        
+        # İlk yenilemeyi başlat
+        refresh_loop()
+    
+    def stop_auto_refresh(self):
+        """Otomatik yenilemeyi ve blit durumunu durdurur
+        
+        Metrik toplama, disk kaydı ve OpenMetrics uç noktası istemciye aittir;
+        pencere kapansa da çalışmaya devam eder (istemci kapanınca durur).
+        """
+        if self.after_id:
+            try:
+                self.master.after_cancel(self.after_id)
+            except:
+                pass
+            self.after_id = None
+        
+        for name in ("latency_graph", "throughput_graph", "scalability_graph"):
+            graph = getattr(self, name, None)
+            if graph is not None:
+                graph["canvas"].mpl_disconnect(graph["draw_cid"])
+                graph["background"] = None
+    
+    def on_close(self):
+        """Pencere kapatıldığında"""
+        self.stop_auto_refresh()
+
+
+# Test için basit örnek (gerçek uygulamada kullanılmayacak)
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Performans Metrikleri - Gerçek Zamanlı")
+    root.geometry("900x700")
+    
+    metrics = PerformanceMetrics()
+    viewer = PerformanceViewer(root, metrics)
+    
+    def on_closing():
+        viewer.on_close()
+        root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    
+    print("Performans metrikleri penceresi açıldı. Gerçek veriler için chat uygulamasını kullanın.")
+    root.mainloop()
\ No newline at end of file
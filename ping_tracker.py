@@ -0,0 +1,61 @@
+# ping_tracker.py
+import time
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class PingTracker:
+    """Yanıt bekleyen ping'leri nonce ile takip eden tablo
+    
+    Gönderim zamanları time.monotonic_ns() ile tutulur; sistem saati
+    değişse bile RTT doğru kalır. Zaman aşımına uğrayan ping'ler tablodan
+    düşürülür; kayıp sayımı çağıranın metriklerinde tutulur.
+    
+    Aynı PONG akışını paylaşan tablolar farklı prefix almalıdır; her tablonun
+    sayacı ayrı olduğu için aynı prefix'le nonce'lar çakışır.
+    """
+    
+    def __init__(self, timeout=5.0, prefix="ping"):
+        self.timeout_ns = int(timeout * 1_000_000_000)
+        self.outstanding = OrderedDict()  # {nonce: (target, sent_ns)} gönderim sırasıyla
+        self.lock = threading.Lock()
+        self.prefix = prefix
+        self._counter = itertools.count()
+    
+    def new_probe(self, target):
+        """Hedef için yeni bir ping kaydı açar ve nonce döndürür"""
+        nonce = f"{self.prefix}-{next(self._counter)}"
+        with self.lock:
+            self.outstanding[nonce] = (target, time.monotonic_ns())
+        return nonce
+    
+    def complete(self, nonce):
+        """PONG geldiğinde (target, rtt_ms) döndürür
+        
+        Bilinmeyen, tekrar gelen veya zaman aşımına uğramış nonce için None döner.
+        """
+        now = time.monotonic_ns()
+        with self.lock:
+            probe = self.outstanding.pop(nonce, None)
+        if probe is None:
+            return None
+        
+        target, sent_ns = probe
+        return target, (now - sent_ns) / 1_000_000
+    
+    def expire(self):
+        """Zaman aşımına uğrayan ping'leri tablodan düşürür ve hedeflerini döndürür"""
+        deadline = time.monotonic_ns() - self.timeout_ns
+        expired = []
+        
+        with self.lock:
+            # Tablo gönderim sırasında olduğu için sadece baştaki eski kayıtlara bakılır
+            while self.outstanding:
+                nonce, (target, sent_ns) = next(iter(self.outstanding.items()))
+                if sent_ns > deadline:
+                    break
+                del self.outstanding[nonce]
+                expired.append(target)
+        
+        return expired
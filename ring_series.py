@@ -0,0 +1,145 @@
+# ring_series.py
+import bisect
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class RingSeries:
+    """Sabit kapasiteli halka tampon zaman serisi
+    
+    Zaman damgaları ve değerler iki paralel dizide tutulur (NumPy varsa ndarray,
+    yoksa array("d")). Ekleme O(1), bellek sabittir; kapasite dolunca en eski
+    örneğin üzerine yazılır. Zaman damgalarının artan sırada eklendiği varsayılır.
+    Pencere toplamları (ortalama, maksimum, hız, yeniden örnekleme) NumPy ile
+    vektörleştirilir.
+    """
+    
+    def __init__(self, capacity=10800):
+        self.capacity = capacity
+        if NUMPY_AVAILABLE:
+            self.times = np.zeros(capacity)
+            self.values = np.zeros(capacity)
+        else:
+            self.times = array("d", bytes(8 * capacity))
+            self.values = array("d", bytes(8 * capacity))
+        self.head = 0  # Bir sonraki yazılacak konum
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def append(self, timestamp, value):
+        """Yeni örnek ekler"""
+        i = self.head
+        self.times[i] = timestamp
+        self.values[i] = value
+        self.head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+    
+    def last(self):
+        """En son (zaman, değer) örneği, boşsa None"""
+        if not self.size:
+            return None
+        i = self.head - 1
+        return float(self.times[i]), float(self.values[i])
+    
+    def _segments(self, column):
+        """Sütunun kronolojik sıradaki iki bitişik parçası (kopyasız)"""
+        if self.size < self.capacity:
+            return column[:self.size], column[:0]
+        return column[self.head:], column[:self.head]
+    
+    def _search(self, older, newer, timestamp):
+        """timestamp'ten küçük olmayan ilk örneğin kronolojik indeksi"""
+        search = np.searchsorted if NUMPY_AVAILABLE else bisect.bisect_left
+        i = int(search(older, timestamp))
+        if i < len(older):
+            return i
+        return len(older) + int(search(newer, timestamp))
+    
+    def arrays(self, start=None, end=None):
+        """[start, end) penceresindeki (zamanlar, değerler) dizilerini döndürür
+        
+        Sınırlar iki bitişik parça üzerinde ikili aramayla bulunur; sadece
+        penceredeki örnekler kopyalanır, maliyet kapasiteyle değil pencereyle orantılıdır.
+        """
+        older, newer = self._segments(self.times)
+        lo = 0 if start is None else self._search(older, newer, start)
+        hi = self.size if end is None else self._search(older, newer, end)
+        return self._slice(self.times, lo, hi), self._slice(self.values, lo, hi)
+    
+    def _slice(self, column, lo, hi):
+        """Kronolojik [lo, hi) aralığının kopyası"""
+        older, newer = self._segments(column)
+        split = len(older)
+        first = older[lo:min(hi, split)]
+        second = newer[max(lo - split, 0):max(hi - split, 0)]
+        if NUMPY_AVAILABLE:
+            return np.concatenate((first, second))
+        return first + second
+    
+    def mean(self, start=None, end=None):
+        """Penceredeki değerlerin ortalaması (boşsa 0)"""
+        _, values = self.arrays(start, end)
+        if not len(values):
+            return 0
+        if NUMPY_AVAILABLE:
+            return float(values.mean())
+        return sum(values) / len(values)
+    
+    def max(self, start=None, end=None):
+        """Penceredeki en büyük değer (boşsa 0)"""
+        _, values = self.arrays(start, end)
+        if not len(values):
+            return 0
+        return float(values.max()) if NUMPY_AVAILABLE else max(values)
+    
+    def rate(self, start=None, end=None):
+        """Penceredeki saniye başına değişim (artan sayaçlar için), hesaplanamazsa 0"""
+        times, values = self.arrays(start, end)
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0
+        return float((values[-1] - values[0]) / (times[-1] - times[0]))
+    
+    def resample(self, step, start=None, end=None, how="mean"):
+        """Pencereyi step saniyelik kovalara böler
+        
+        Boş olmayan kovalar için (kova başlangıç zamanları, mean/max değerleri) döndürür.
+        """
+        times, values = self.arrays(start, end)
+        if not len(times):
+            return times, values
+        origin = times[0] if start is None else start
+        
+        if NUMPY_AVAILABLE:
+            index = ((times - origin) // step).astype(np.intp)
+            counts = np.bincount(index)
+            filled = np.flatnonzero(counts)
+            if how == "max":
+                result = np.full(len(counts), -np.inf)
+                np.maximum.at(result, index, values)
+                result = result[filled]
+            else:
+                result = np.bincount(index, values)[filled] / counts[filled]
+            return origin + filled * step, result
+        
+        buckets = {}
+        for t, v in zip(times, values):
+            key = int((t - origin) // step)
+            acc = buckets.get(key)
+            if acc is None:
+                buckets[key] = [v, 1]
+            elif how == "max":
+                acc[0] = max(acc[0], v)
+            else:
+                acc[0] += v
+                acc[1] += 1
+        keys = sorted(buckets)
+        result = [buckets[k][0] if how == "max" else buckets[k][0] / buckets[k][1] for k in keys]
+        return [origin + k * step for k in keys], result
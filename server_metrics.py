@@ -0,0 +1,198 @@
+# server_metrics.py
+import time
+import threading
+from latency_histogram import LatencyHistogram
+from sharded_counter import ShardedCounter
+from metrics_exporter import histogram_samples
+
+
+class StageTimer:
+    """Bir mesajın işlem aşamalarını sırayla ölçer: her mark() son işaretten bu yana geçen süreyi biriktirir
+    
+    Süreler done() çağrılınca tek kilitle kaydedilir.
+    """
+    
+    __slots__ = ("metrics", "msg_type", "start", "last", "stages")
+    
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.msg_type = None
+        self.start = self.last = time.perf_counter()
+        self.stages = []  # [(aşama, ms)]
+    
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, (now - self.last) * 1000))
+        self.last = now
+    
+    def done(self):
+        """Biriken aşamaları ve toplam süreyi ("total" aşaması) kaydeder"""
+        self.stages.append(("total", (time.perf_counter() - self.start) * 1000))
+        self.metrics.record_stages(self.msg_type, self.stages)
+        self.stages = []
+
+
+class _NullTimer:
+    """Örneklenmeyen mesajlar için hiçbir şey yapmayan zamanlayıcı"""
+    
+    msg_type = None
+    
+    def mark(self, stage):
+        pass
+    
+    def done(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class ServerMetrics:
+    """Sunucu metrikleri: mesaj tipine göre paket/bayt sayaçları, yayın süresi, anlık değerler
+    
+    Sayaçlar thread başına parçalı olduğu için alım döngüleri kilit almaz;
+    anlık değerler (bağlı istemci, kuyruk derinlikleri) sorgu anında
+    kaydedilen fonksiyonlardan okunur.
+    """
+    
+    def __init__(self, prefix="chat_server"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.packets = {}  # {(taşıma, mesaj tipi): ShardedCounter}
+        self.bytes = {}  # {(taşıma, yön): ShardedCounter}
+        self.fanout = LatencyHistogram()  # Yayın (fan-out) süresi, ms
+        self.fanout_lock = threading.Lock()
+        self.gauges = []  # [(ad, açıklama, fonksiyon)]
+        
+        # Mesaj tipi ve aşamaya göre işlem süreleri; sample_every = N ise her
+        # thread'de N mesajdan biri ölçülür (1: hepsi, 0: kapalı). Varsayılan
+        # örnekleme ortak kilidi mesajların sadece 1/64'ünde alır
+        self.sample_every = 64
+        self.stages = {}  # {(mesaj tipi, aşama): LatencyHistogram}
+        self.stages_lock = threading.Lock()
+        self.local = threading.local()
+    
+    def _counter(self, table, key):
+        counter = table.get(key)
+        if counter is None:
+            with self.lock:
+                counter = table.setdefault(key, ShardedCounter())
+        return counter
+    
+    def count_packet(self, transport, msg_type, size):
+        """Alınan bir paketi tipine göre sayar"""
+        self._counter(self.packets, (transport, msg_type)).add()
+        self._counter(self.bytes, (transport, "in")).add(size)
+    
+    def count_sent(self, transport, size):
+        """Gönderilen baytları sayar"""
+        self._counter(self.bytes, (transport, "out")).add(size)
+    
+    def record_fanout(self, duration_ms):
+        """Bir yayının tüm alıcılara gönderilme süresini kaydeder"""
+        with self.fanout_lock:
+            self.fanout.record(duration_ms)
+    
+    def stage_timer(self):
+        """Yeni mesaj için zamanlayıcı; örneklenmeyen mesajlarda maliyetsiz NULL_TIMER"""
+        every = self.sample_every
+        if every <= 0:
+            return NULL_TIMER
+        if every > 1:
+            n = getattr(self.local, "n", 0) + 1
+            self.local.n = n
+            if n % every:
+                return NULL_TIMER
+        return StageTimer(self)
+    
+    def record_stage(self, msg_type, stage, duration_ms):
+        """Bir aşamanın süresini kaydeder"""
+        self.record_stages(msg_type, [(stage, duration_ms)])
+    
+    def record_stages(self, msg_type, stages):
+        """Bir mesajın [(aşama, ms)] sürelerini tek kilitle kaydeder"""
+        msg_type = msg_type or "UNKNOWN"
+        with self.stages_lock:
+            for stage, duration_ms in stages:
+                key = (msg_type, stage)
+                histogram = self.stages.get(key)
+                if histogram is None:
+                    # Aşama süreleri için %3 hassasiyet yeterli, kova sayısı küçük kalır
+                    histogram = self.stages[key] = LatencyHistogram(max_value_ms=10000.0, sub_buckets=32)
+                histogram.record(duration_ms)
+    
+    def stage_breakdown(self):
+        """Anlık aşama dökümü: {mesaj tipi: {aşama: {"count", "mean", "p50", "p99", "max"}}}"""
+        breakdown = {}
+        with self.stages_lock:
+            for (msg_type, stage), histogram in self.stages.items():
+                values = histogram.percentiles((50, 99))
+                breakdown.setdefault(msg_type, {})[stage] = {
+                    "count": histogram.count,
+                    "mean": histogram.mean(),
+                    "p50": values.get(50),
+                    "p99": values.get(99),
+                    "max": histogram.max
+                }
+        return breakdown
+    
+    def add_gauge(self, name, help_text, read):
+        """Sorgu anında read() ile okunacak anlık değer ekler"""
+        self.gauges.append((name, help_text, read))
+    
+    def families(self):
+        """OpenMetrics metrik aileleri"""
+        prefix = self.prefix
+        with self.lock:
+            packets = list(self.packets.items())
+            byte_counts = list(self.bytes.items())
+        
+        families = [
+            {
+                "name": f"{prefix}_packets",
+                "type": "counter",
+                "help": "Taşıma ve mesaj tipine göre alınan paketler",
+                "samples": [
+                    ("_total", {"transport": transport, "type": msg_type}, counter.value())
+                    for (transport, msg_type), counter in sorted(packets)
+                ]
+            },
+            {
+                "name": f"{prefix}_bytes",
+                "type": "counter",
+                "help": "Taşıma ve yöne göre bayt",
+                "samples": [
+                    ("_total", {"transport": transport, "direction": direction}, counter.value())
+                    for (transport, direction), counter in sorted(byte_counts)
+                ]
+            }
+        ]
+        
+        with self.fanout_lock:
+            fanout_samples = histogram_samples(self.fanout)
+        families.append({
+            "name": f"{prefix}_fanout_milliseconds",
+            "type": "histogram",
+            "help": "Bir mesajın tüm alıcılara yayın süresi (ms)",
+            "samples": fanout_samples
+        })
+        
+        stage_samples = []
+        with self.stages_lock:
+            for (msg_type, stage), histogram in sorted(self.stages.items()):
+                stage_samples += histogram_samples(histogram, {"type": msg_type, "stage": stage})
+        families.append({
+            "name": f"{prefix}_stage_milliseconds",
+            "type": "histogram",
+            "help": "Mesaj tipi ve işlem aşamasına göre süre (ms, örneklenmiş)",
+            "samples": stage_samples
+        })
+        
+        for name, help_text, read in self.gauges:
+            families.append({
+                "name": f"{prefix}_{name}",
+                "type": "gauge",
+                "help": help_text,
+                "samples": [("", None, read())]
+            })
+        return families
@@ -0,0 +1,59 @@
+# sharded_counter.py
+import threading
+import weakref
+
+
+class _ShardOwner:
+    """Thread-local'de tutulan sahip nesne; thread bitince toplanır"""
+    __slots__ = ("__weakref__",)
+
+
+class ShardedCounter:
+    """Thread başına parçalı (sharded) sayaç
+    
+    Her thread sadece kendi parçasını artırır, ortak kilit alınmaz. Okuyucu
+    (toplayıcı thread) parçaları toplar; parçalar hiç sıfırlanmadığı için
+    yazarla yarışma olmaz, drain() farkı son okumaya göre hesaplar.
+    Kilit yalnızca bir thread ilk kez sayaca yazdığında ve thread bittiğinde
+    alınır: biten thread'in parçası taban değere katılıp listeden çıkarılır,
+    bağlantı başına açılan kısa ömürlü thread'ler parça biriktirmez.
+    """
+    
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = {}  # {id(parça): parça}, parça tek elemanlı liste: [değer]
+        self.shards_lock = threading.Lock()
+        self.base = 0  # Biten thread'lerden kalan toplam
+        self.drained = 0
+    
+    def add(self, amount=1):
+        """Sayacı artırır (sıcak yol)"""
+        try:
+            self.local.shard[0] += amount
+        except AttributeError:
+            shard = [amount]
+            owner = _ShardOwner()
+            with self.shards_lock:
+                self.shards[id(shard)] = shard
+            # Thread bitince thread-local temizlenir, sahip toplanır ve parça katlanır
+            weakref.finalize(owner, self._retire, shard)
+            self.local.owner = owner
+            self.local.shard = shard
+    
+    def _retire(self, shard):
+        """Biten thread'in parçasını taban değere katar"""
+        with self.shards_lock:
+            self.base += shard[0]
+            del self.shards[id(shard)]
+    
+    def value(self):
+        """Başlangıçtan beri toplam değer"""
+        with self.shards_lock:
+            return self.base + sum(shard[0] for shard in self.shards.values())
+    
+    def drain(self):
+        """Son drain() çağrısından bu yana eklenen miktarı döndürür (tek okuyucu için)"""
+        total = self.value()
+        delta = total - self.drained
+        self.drained = total
+        return delta
@@ -0,0 +1,116 @@
+# spatial_index.py
+import math
+
+
+class SpatialGrid:
+    """Noktaları eşit boyutlu ızgara hücrelerine dağıtan uzamsal indeks
+    
+    Hücre boyutu arama yarıçapı mertebesinde seçilirse en yakın nokta sorgusu
+    sadece birkaç hücreye bakar: ortalama O(1).
+    """
+    
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.cells = {}  # {(hücre_x, hücre_y): [(anahtar, x, y), ...]}
+        self.count = 0
+    
+    def _cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+    
+    def build(self, points):
+        """İndeksi {anahtar: (x, y)} sözlüğünden baştan kurar"""
+        cells = {}
+        for key, (x, y) in points.items():
+            cells.setdefault(self._cell(x, y), []).append((key, x, y))
+        self.cells = cells
+        self.count = len(points)
+    
+    def nearest(self, x, y, radius, accept=None):
+        """(x, y) noktasına radius içindeki en yakın anahtarı döndürür, yoksa None
+        
+        accept verilirse sadece accept(anahtar) True olan noktalar değerlendirilir.
+        """
+        reach = int(math.ceil(radius / self.cell_size))
+        cx, cy = self._cell(x, y)
+        best = None
+        best_distance = radius * radius
+        
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for key, px, py in self.cells.get((i, j), ()):
+                    distance = (px - x) ** 2 + (py - y) ** 2
+                    if distance <= best_distance and (accept is None or accept(key)):
+                        best = key
+                        best_distance = distance
+        return best
+    
+    def _cell_range(self, left, top, right, bottom):
+        x0, y0 = self._cell(left, top)
+        x1, y1 = self._cell(right, bottom)
+        return x0, y0, x1, y1
+    
+    def query(self, left, top, right, bottom):
+        """Dikdörtgen içindeki noktaların anahtarlarını üretir
+        
+        Dikdörtgen dolu hücre sayısından fazla hücre kapsıyorsa dolu hücreler taranır.
+        """
+        x0, y0, x1, y1 = self._cell_range(left, top, right, bottom)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            cells = (points for (i, j), points in self.cells.items() if x0 <= i <= x1 and y0 <= j <= y1)
+        else:
+            cells = (self.cells.get((i, j), ()) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1))
+        
+        for points in cells:
+            for key, px, py in points:
+                if left <= px <= right and top <= py <= bottom:
+                    yield key
+
+
+class SegmentGrid(SpatialGrid):
+    """Doğru parçalarını geçtikleri ızgara hücrelerine dağıtan uzamsal indeks
+    
+    Uçları görüş alanı dışında kalıp alanı kesen parçalar da bulunur; query()
+    aday kümesi döndürür, kesin kesişim testi çağırana kalır.
+    """
+    
+    def _segment_cells(self, x0, y0, x1, y1):
+        """Parçanın geçtiği hücreleri sütun sütun üretir"""
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        size = self.cell_size
+        slope = (y1 - y0) / (x1 - x0) if x1 > x0 else 0.0
+        first = int(math.floor(x0 / size))
+        last = int(math.floor(x1 / size))
+        
+        for i in range(first, last + 1):
+            # Parçanın bu sütundaki y aralığı
+            if first == last:
+                ya, yb = y0, y1
+            else:
+                ya = y0 + (max(x0, i * size) - x0) * slope
+                yb = y0 + (min(x1, (i + 1) * size) - x0) * slope
+            for j in range(int(math.floor(min(ya, yb) / size)), int(math.floor(max(ya, yb) / size)) + 1):
+                yield i, j
+    
+    def build(self, segments):
+        """İndeksi {anahtar: (x0, y0, x1, y1)} sözlüğünden baştan kurar"""
+        cells = {}
+        for key, coords in segments.items():
+            for cell in self._segment_cells(*coords):
+                cells.setdefault(cell, []).append(key)
+        self.cells = cells
+        self.count = len(segments)
+    
+    def query(self, left, top, right, bottom):
+        """Dikdörtgenle kesişen hücrelerdeki parçaların anahtar kümesini döndürür"""
+        x0, y0, x1, y1 = self._cell_range(left, top, right, bottom)
+        found = set()
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            for (i, j), keys in self.cells.items():
+                if x0 <= i <= x1 and y0 <= j <= y1:
+                    found.update(keys)
+        else:
+            for i in range(x0, x1 + 1):
+                for j in range(y0, y1 + 1):
+                    found.update(self.cells.get((i, j), ()))
+        return found
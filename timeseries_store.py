@@ -0,0 +1,359 @@
+# timeseries_store.py
+import os
+import sys
+import json
+import time
+import math
+import bisect
+import threading
+from array import array
+
+# (kova süresi saniye, saklama süresi saniye): kaba katmanlar daha uzun saklanır.
+# 5 sn'lik ölçüm aralığında seri başına yaklaşık 47 KB (100 kullanıcı ~5 MB).
+DEFAULT_TIERS = (
+    (1, 900),           # 1 sn çözünürlük, 15 dakika
+    (60, 86400),        # 1 dk çözünürlük, 1 gün
+    (3600, 30 * 86400)  # 1 saat çözünürlük, 30 gün
+)
+
+FIELDS = ("latency", "latency_max", "loss", "quality")
+
+
+class _TierSeries:
+    """Tek bir serinin tek bir katmanı: sütun dizileri + açık kova toplayıcısı
+    
+    Kova başına 4 bayt zaman (uint32) ve alan başına 4 bayt (float32) tutulur.
+    Örnek gelmeyen kovalar hiç yazılmaz.
+    """
+    
+    def __init__(self, step, retention):
+        self.step = step
+        self.retention = retention
+        self.time = array("I")
+        self.columns = {field: array("f") for field in FIELDS}
+        self.open_bucket = None
+        self.acc = None  # [gecikme sayısı, gecikme toplamı, gecikme maks, örnek sayısı, kayıp toplamı, kalite toplamı]
+        self.dirty = False
+    
+    def add(self, timestamp, latency, loss, quality):
+        """Örneği ait olduğu kovaya ekler, kova değiştiyse öncekini kapatır"""
+        bucket = int(timestamp) // self.step * self.step
+        if self.open_bucket is not None and bucket != self.open_bucket:
+            self._close_bucket()
+        
+        if self.open_bucket is None:
+            self.open_bucket = bucket
+            self.acc = [0, 0.0, float("nan"), 0, 0.0, 0.0]
+        
+        acc = self.acc
+        if latency is not None:
+            acc[0] += 1
+            acc[1] += latency
+            acc[2] = latency if math.isnan(acc[2]) else max(acc[2], latency)
+        acc[3] += 1
+        acc[4] += loss
+        acc[5] += quality
+    
+    def _close_bucket(self):
+        """Açık kovanın ortalamalarını sütunlara ekler"""
+        if self.open_bucket is None:
+            return
+        for field, value in zip(FIELDS, self._bucket_values()):
+            self.columns[field].append(value)
+        self.time.append(self.open_bucket)
+        self.open_bucket = None
+        self.acc = None
+        self.dirty = True
+    
+    def _bucket_values(self):
+        """Açık kovanın (gecikme ort., gecikme maks, kayıp ort., kalite ort.) değerleri"""
+        lat_n, lat_sum, lat_max, n, loss_sum, quality_sum = self.acc
+        return (
+            lat_sum / lat_n if lat_n else float("nan"),
+            lat_max,
+            loss_sum / n,
+            quality_sum / n
+        )
+    
+    def trim(self, now):
+        """Saklama süresini aşan baştaki kovaları atar"""
+        cut = bisect.bisect_left(self.time, int(now) - self.retention)
+        if cut:
+            del self.time[:cut]
+            for column in self.columns.values():
+                del column[:cut]
+            self.dirty = True
+    
+    def query(self, start, end):
+        """[start, end) aralığındaki kovaları sütunlar halinde döndürür"""
+        lo = bisect.bisect_left(self.time, int(start))
+        hi = bisect.bisect_left(self.time, int(end))
+        result = {"time": list(self.time[lo:hi])}
+        for field in FIELDS:
+            result[field] = list(self.columns[field][lo:hi])
+        
+        # Henüz kapanmamış kova da sorguya dahil edilir
+        if self.open_bucket is not None and start <= self.open_bucket < end:
+            result["time"].append(self.open_bucket)
+            for field, value in zip(FIELDS, self._bucket_values()):
+                result[field].append(value)
+        return result
+    
+    def copy(self):
+        """Kapanmış kovaların (zaman, sütunlar) kopyası; kilit dışında diske yazmak için"""
+        self.dirty = False
+        return array("I", self.time), [array("f", self.columns[field]) for field in FIELDS]
+    
+    @staticmethod
+    def save(path, times, columns):
+        """Sütunları tek dosyaya yazar: sayı (uint32), zaman dizisi, alan dizileri"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            array("I", [len(times)]).tofile(f)
+            times.tofile(f)
+            for column in columns:
+                column.tofile(f)
+        os.replace(tmp_path, path)
+    
+    def load(self, path):
+        """save() ile yazılmış dosyayı okur"""
+        with open(path, "rb") as f:
+            count = array("I")
+            count.fromfile(f, 1)
+            self.time = array("I")
+            self.time.fromfile(f, count[0])
+            for field in FIELDS:
+                column = array("f")
+                column.fromfile(f, count[0])
+                self.columns[field] = column
+
+
+class TimeSeriesStore:
+    """Düğüm ve bağlantı gecikme/kayıp/kalite geçmişini diskte tutan zaman serisi deposu
+    
+    Her seri için her katman (1 sn / 1 dk / 1 saat) ayrı sütun dizileri olarak
+    bellekte tutulur ve flush() ile diske yazılır. Sorgular aralığı kapsayan en
+    ince katmandan cevaplanır. Seriler ilk erişimde diskten yüklenir; retire()
+    edilen seriler (ayrılan kullanıcılar) bir sonraki flush() sonrası bellekten
+    çıkarılır. Dosya yazımı kilit dışında yapılır, record() diske yazılırken beklemez.
+    
+    Seri adları: düğüm için kullanıcı adı, bağlantı için (kullanıcı1, kullanıcı2).
+    """
+    
+    def __init__(self, directory, tiers=DEFAULT_TIERS):
+        self.directory = directory
+        self.tiers = tiers
+        self.series = {}  # {(kind, name): [_TierSeries, ...]} katman sırasıyla, bellekteki seriler
+        self.series_ids = {}  # {(kind, name): dosya numarası} diskteki tüm seriler
+        self.retired = set()  # Bir sonraki flush() sonrası bellekten çıkarılacak seriler
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # Aynı anda tek flush() diske yazar
+        self.flush_thread = None
+        self.flush_stop = threading.Event()
+        
+        for step, _ in tiers:
+            os.makedirs(os.path.join(directory, f"{step}s"), exist_ok=True)
+        self._load()
+    
+    def _index_path(self):
+        return os.path.join(self.directory, "series.json")
+    
+    def _series_path(self, key, step):
+        return os.path.join(self.directory, f"{step}s", f"{self.series_ids[key]}.bin")
+    
+    def _load(self):
+        """Dizindeki seri listesini okur (seriler ilk erişimde yüklenir)"""
+        try:
+            with open(self._index_path()) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        for kind, name, series_id in index:
+            if isinstance(name, list):
+                name = tuple(name)
+            self.series_ids[(kind, name)] = series_id
+    
+    def _new_tiers(self):
+        return [_TierSeries(step, retention) for step, retention in self.tiers]
+    
+    def _get_tiers(self, key, create=False):
+        """Serinin katmanlarını döndürür, gerekirse diskten yükler (kilit altında çağrılır)
+        
+        Sadece sorgu için yüklenen seri bir sonraki flush() sonrası tekrar bellekten çıkarılır.
+        """
+        tiers = self.series.get(key)
+        if tiers is not None:
+            return tiers
+        if key not in self.series_ids:
+            if not create:
+                return None
+            self.series_ids[key] = len(self.series_ids)
+            tiers = self.series[key] = self._new_tiers()
+            return tiers
+        
+        tiers = self._new_tiers()
+        for tier in tiers:
+            path = self._series_path(key, tier.step)
+            if not os.path.exists(path):
+                # Henüz kapanmış kovası olmayan katman
+                continue
+            try:
+                tier.load(path)
+            except (OSError, EOFError) as e:
+                print(f"[HISTORY] Seri okunamadı {path}: {e}")
+        self.series[key] = tiers
+        if not create:
+            self.retired.add(key)
+        return tiers
+    
+    def record(self, kind, name, latency=None, loss=0.0, quality=100.0, timestamp=None):
+        """Bir ölçümü tüm katmanlara ekler
+        
+        kind: "node" veya "edge"; latency None ise ölçüm kayıptır.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        key = (kind, name)
+        
+        with self.lock:
+            tiers = self._get_tiers(key, create=True)
+            self.retired.discard(key)
+            for tier in tiers:
+                tier.add(timestamp, latency, loss, quality)
+    
+    def retire(self, kind, name):
+        """Seriyi bir sonraki flush() sonrası bellekten çıkarır (diskteki kayıt kalır)"""
+        key = (kind, name)
+        with self.lock:
+            tiers = self.series.get(key)
+            if tiers is None:
+                return
+            # Açık kovalar da diske yazılsın
+            for tier in tiers:
+                tier._close_bucket()
+            self.retired.add(key)
+    
+    def query(self, kind, name, start, end=None, step=None):
+        """[start, end) aralığını döndürür
+        
+        step verilmezse aralığın başını hâlâ saklayan en ince katman seçilir.
+        Sonuç: {"step", "time", "latency", "latency_max", "loss", "quality"}
+        """
+        now = time.time()
+        if end is None:
+            end = now
+        
+        with self.lock:
+            tiers = self._get_tiers((kind, name))
+            if tiers is None:
+                return None
+            
+            chosen = tiers[-1]
+            for tier in tiers:
+                if (step is not None and tier.step >= step) or \
+                   (step is None and now - start <= tier.retention):
+                    chosen = tier
+                    break
+            
+            result = chosen.query(start, end)
+            result["step"] = chosen.step
+            return result
+    
+    def names(self):
+        """Kayıtlı (kind, name) serilerini döndürür"""
+        with self.lock:
+            return list(self.series_ids.keys())
+    
+    def flush(self):
+        """Kapanan kovaları diske yazar, saklama süresi dolanları atar
+        
+        Değişen katmanlar kilit altında kopyalanır, dosyalar kilit bırakıldıktan sonra yazılır.
+        """
+        now = time.time()
+        with self.flush_lock:
+            pending = []  # [(yol, katman, zamanlar, sütunlar)]
+            with self.lock:
+                for key, tiers in self.series.items():
+                    for tier in tiers:
+                        tier.trim(now)
+                        if tier.dirty:
+                            pending.append((self._series_path(key, tier.step), tier) + tier.copy())
+                retired = set(self.retired)
+                index = [[kind, list(name) if isinstance(name, tuple) else name, series_id]
+                         for (kind, name), series_id in self.series_ids.items()]
+            
+            try:
+                for path, tier, times, columns in pending:
+                    _TierSeries.save(path, times, columns)
+                tmp_path = self._index_path() + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(index, f)
+                os.replace(tmp_path, self._index_path())
+            except OSError:
+                # Yazılamayan katmanlar bir sonraki flush()'ta tekrar denenir
+                with self.lock:
+                    for _, tier, _, _ in pending:
+                        tier.dirty = True
+                raise
+            
+            with self.lock:
+                # Bu arada tekrar kayıt almamış emekli seriler bellekten çıkarılır
+                for key in retired & self.retired:
+                    self.series.pop(key, None)
+                    self.retired.discard(key)
+    
+    def start_flusher(self, interval=60.0):
+        """Depoyu belirli aralıklarla diske yazan thread'i başlatır"""
+        if self.flush_thread is not None:
+            return
+        
+        def run():
+            while not self.flush_stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"[HISTORY] Diske yazma hatası: {e}")
+        
+        self.flush_stop.clear()
+        self.flush_thread = threading.Thread(target=run)
+        self.flush_thread.daemon = True
+        self.flush_thread.start()
+    
+    def close(self):
+        """Yazma thread'ini durdurur ve son durumu diske yazar"""
+        self.flush_stop.set()
+        self.flush_thread = None
+        self.flush()
+
+
+if __name__ == "__main__":
+    # Kullanım: python timeseries_store.py <dizin> node <ad> [son N saniye]
+    #           python timeseries_store.py <dizin> edge <ad1> <ad2> [son N saniye]
+    usage = "Kullanım: python timeseries_store.py <dizin> <node <ad>|edge <ad1> <ad2>> [son N saniye]"
+    if len(sys.argv) < 4 or (sys.argv[2] == "edge" and len(sys.argv) < 5):
+        print(usage)
+        sys.exit(1)
+    
+    store = TimeSeriesStore(sys.argv[1])
+    if sys.argv[2] == "edge":
+        # Bağlantı adları sıralı çifttir
+        name = tuple(sorted(sys.argv[3:5]))
+        rest = sys.argv[5:]
+    else:
+        name = sys.argv[3]
+        rest = sys.argv[4:]
+    span = float(rest[0]) if rest else 3600
+    result = store.query(sys.argv[2], name, time.time() - span)
+    if result is None:
+        print("Seri bulunamadı. Kayıtlı seriler:")
+        for kind, series_name in store.names():
+            print(f"  {kind} {' '.join(series_name) if isinstance(series_name, tuple) else series_name}")
+        sys.exit(1)
+    
+    print(f"Çözünürlük: {result['step']} sn")
+    print(f"{'Zaman':<20}{'Gecikme':>10}{'Maks':>10}{'Kayıp':>8}{'Kalite':>8}")
+    for i, ts in enumerate(result["time"]):
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)):<20}"
+              f"{result['latency'][i]:>10.2f}{result['latency_max'][i]:>10.2f}"
+              f"{result['loss'][i] * 100:>7.1f}%{result['quality'][i]:>8.1f}")
@@ -3,6 +3,10 @@ from tkinter import ttk
 import math
 import colorsys
 import time
+import random
+import threading
+from force_layout import ForceLayout, NUMPY_AVAILABLE, circle_layout
+from spatial_index import SpatialGrid, SegmentGrid
 
 class TopologyView:
     def __init__(self, master, width=400, height=300):
@@ -44,6 +48,14 @@ class TopologyView:
         )
         self.ping_button.pack(side=tk.LEFT, padx=(0, 5))
         
+        # Görünümü sıfırlama düğmesi (yakınlaştırma ve kaydırma)
+        self.reset_view_button = ttk.Button(
+            self.toolbar,
+            text="Görünümü Sıfırla",
+            command=self.reset_view
+        )
+        self.reset_view_button.pack(side=tk.LEFT, padx=(0, 5))
+        
         self.on_ping_all_callback = None  # Callback fonksiyonu
         
         # Bilgi etiketi
@@ -68,12 +80,55 @@ class TopologyView:
         
         # Düğümler ve bağlantılar
         self.node_radius = 20
-        self.nodes = {}  # {username: (x, y, canvas_id)}
+        self.nodes = {}  # {username: (x, y, canvas_id)} ekranda çizili düğümler
+        self.nodes_data = {}  # Son topoloji verisindeki düğümler (tooltip istatistikleri için)
+        self.connections = []
+        self.edge_data = {}  # {(user1, user2): bağlantı} sıralı anahtarla
+        self.adjacency = {}  # {username: [(user1, user2), ...]}
+        
+        # Artımlı çizim: her düğüm/bağlantının canvas öğeleri ve son çizilen hali
+        self.node_items = {}  # {username: {"oval", "label", "latency", "pos", "style"}}
+        self.edge_items = {}  # {(user1, user2): {"line", "label", "coords", "style"}}
+        self.empty_item = None
+        self.positions = {}
+        self.position_index = SpatialGrid(2 * self.node_radius)  # Dünya koordinatlarında isabet testi ve kırpma
+        self.edge_index = SegmentGrid(8 * self.node_radius)  # Bağlantıların geçtiği hücreler
+        self.layout_key = None  # (üyeler, bağlantılar, boyut) değişince yerleşim yenilenir
+        
+        # Kuvvet yönelimli yerleşim arka plan thread'inde hesaplanır, sonuç Tk
+        # thread'inde after() ile alınır; bu sırada önceki pozisyonlar gösterilir
+        self.layout = ForceLayout(width, height)
+        self.layout_lock = threading.Lock()
+        self.layout_request = None
+        self.layout_result = None
+        self.layout_thread = None
+        self.last_topology = None
         
         # Tooltip için
         self.current_tooltip = None
+        self.tooltip_user = None
         self.canvas.bind("<Motion>", self.on_mouse_move)
         
+        # Yakınlaştırma ve kaydırma: ekran = dünya * zoom + offset
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.pan_start = None
+        self.visible_radius = self.node_radius
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)  # Windows / macOS
+        self.canvas.bind("<Button-4>", self.on_mouse_wheel)    # Linux yukarı
+        self.canvas.bind("<Button-5>", self.on_mouse_wheel)    # Linux aşağı
+        self.canvas.bind("<ButtonPress-1>", self.on_pan_start)
+        self.canvas.bind("<B1-Motion>", self.on_pan_move)
+        self.canvas.bind("<ButtonRelease-1>", self.on_pan_end)
+        
+        # Ayrıntı düzeyi: etiketler sadece yakında, çok uzakta düğümler kümelenir
+        self.label_zoom = 0.75
+        self.cluster_zoom = 0.4
+        self.cluster_cell = 48  # Küme ızgara hücresi (piksel)
+        self.cluster_items = {}  # {hücre: {"oval", "text", "pos", "style"}}
+        self.cluster_edge_items = {}  # {(hücre1, hücre2): {"line", "coords", "style"}}
+        
         # Son güncelleme zamanı
         self.last_update = None
     
@@ -89,14 +144,7 @@ class TopologyView:
     def on_mouse_move(self, event):
         """Fare hareketi takibi için"""
         # Fare bir düğümün üzerinde mi kontrol et
-        closest_node = None
-        closest_distance = self.node_radius
-        
-        for username, (x, y, _) in self.nodes.items():
-            distance = math.sqrt((event.x - x)**2 + (event.y - y)**2)
-            if distance <= self.node_radius and (closest_node is None or distance < closest_distance):
-                closest_node = username
-                closest_distance = distance
+        closest_node = self.node_at(event.x, event.y)
         
         # Tooltip güncelle
         if closest_node:
@@ -104,13 +152,50 @@ class TopologyView:
         else:
             self.hide_tooltip()
     
+    def node_at(self, x, y):
+        """Ekran koordinatındaki düğümü döndürür (yoksa None)
+        
+        Pozisyon indeksiyle sadece imlecin çevresindeki hücrelere bakılır.
+        """
+        if not self.nodes:
+            return None
+        world_x = (x - self.offset_x) / self.zoom
+        world_y = (y - self.offset_y) / self.zoom
+        radius = self.visible_radius / self.zoom
+        return self.position_index.nearest(world_x, world_y, radius, accept=self.nodes.__contains__)
+    
+    def _set_positions(self, positions):
+        """Pozisyonları değiştirir, düğüm ve bağlantı indekslerini yeniden kurar"""
+        self.positions = positions
+        self.position_index.build(positions)
+        self._index_edges()
+    
+    def _index_edges(self):
+        """Bağlantıları dünya koordinatlarındaki parçalar olarak indeksler"""
+        segments = {}
+        for a, b in self.edge_data:
+            from_pos = self.positions.get(a)
+            to_pos = self.positions.get(b)
+            if from_pos is not None and to_pos is not None:
+                segments[(a, b)] = (from_pos[0], from_pos[1], to_pos[0], to_pos[1])
+        self.edge_index.build(segments)
+    
     def show_tooltip(self, username, x, y):
         """Düğüm üzerinde tooltip göster"""
         if self.current_tooltip:
             self.canvas.delete(self.current_tooltip)
         
-        # Tooltip metni
+        self.tooltip_user = username
+        
+        # Tooltip metni (bağlantı istatistikleri varsa eklenir)
         text = f"Kullanıcı: {username}"
+        info = self.nodes_data.get(username, {})
+        if info.get("latency") is not None:
+            text += f"\nGecikme: {info['latency']:.1f}ms (jitter {info.get('jitter', 0):.1f}ms)"
+        if info.get("p50") is not None:
+            text += f"\np50/p99: {info['p50']:.1f}/{info.get('p99') or 0:.1f}ms"
+        if info.get("loss"):
+            text += f"\nKayıp: %{info['loss'] * 100:.1f}"
         self.current_tooltip = self.canvas.create_text(
             x + self.node_radius + 10, 
             y - self.node_radius - 5,
@@ -126,128 +211,528 @@ class TopologyView:
         if self.current_tooltip:
             self.canvas.delete(self.current_tooltip)
             self.current_tooltip = None
+            self.tooltip_user = None
+    
+    def on_mouse_wheel(self, event):
+        """Fare tekerleğiyle imlecin altındaki nokta sabit kalacak şekilde yakınlaştırır"""
+        if getattr(event, "num", None) == 5 or getattr(event, "delta", 0) < 0:
+            factor = 1 / 1.2
+        else:
+            factor = 1.2
+        
+        zoom = max(0.05, min(8.0, self.zoom * factor))
+        factor = zoom / self.zoom
+        self.offset_x = event.x - (event.x - self.offset_x) * factor
+        self.offset_y = event.y - (event.y - self.offset_y) * factor
+        self.zoom = zoom
+        
+        self.hide_tooltip()
+        self._render()
+    
+    def on_pan_start(self, event):
+        """Sürükleyerek kaydırmayı başlatır"""
+        self.pan_start = (event.x, event.y, self.offset_x, self.offset_y)
+    
+    def on_pan_move(self, event):
+        """Sürükleme sırasında görünümü kaydırır"""
+        if self.pan_start is None:
+            return
+        start_x, start_y, offset_x, offset_y = self.pan_start
+        self.offset_x = offset_x + event.x - start_x
+        self.offset_y = offset_y + event.y - start_y
+        
+        self.hide_tooltip()
+        self._render()
+    
+    def on_pan_end(self, event):
+        """Sürüklemeyi bitirir"""
+        self.pan_start = None
+    
+    def reset_view(self):
+        """Yakınlaştırma ve kaydırmayı başlangıç haline getirir"""
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._render()
     
     def update_topology(self, topology_data):
-        """Topoloji görünümünü günceller"""
-        self.canvas.delete("all")
-        self.nodes = {}
+        """Topoloji görünümünü günceller
         
+        Her düğüm ve bağlantının canvas öğeleri saklanır; sadece değişen koordinat,
+        renk ve metinler güncellenir, öğe ekleme/silme sadece üyelik değişince olur.
+        """
         # Son güncelleme zamanını kaydet
         self.last_update = time.time()
         self.timestamp_label.config(text=f"Son Güncelleme: {time.strftime('%H:%M:%S')}")
         
-        # Düğümlerin pozisyonlarını hesapla
         nodes_data = topology_data.get("nodes", {})
         connections = topology_data.get("connections", [])
+        self.last_topology = topology_data
+        self.nodes_data = nodes_data
+        self.connections = connections
+        edge_data = {}
+        for conn in connections:
+            from_user = conn.get("from")
+            to_user = conn.get("to")
+            if from_user is None or to_user is None or from_user == to_user:
+                continue
+            edge_data[(from_user, to_user) if from_user <= to_user else (to_user, from_user)] = conn
+        edges_changed = edge_data.keys() != self.edge_data.keys()
+        self.edge_data = edge_data
+        if edges_changed:
+            adjacency = {}
+            for key in edge_data:
+                adjacency.setdefault(key[0], []).append(key)
+                adjacency.setdefault(key[1], []).append(key)
+            self.adjacency = adjacency
         
         # Bilgi etiketini güncelle
         self.info_label.config(text=f"Düğüm Sayısı: {len(nodes_data)}, Bağlantı Sayısı: {len(connections)}")
         
         if not nodes_data:
             # Topoloji boşsa bilgi mesajı göster
-            self.canvas.create_text(
-                self.width / 2,
-                self.height / 2,
-                text="Topoloji verisi bulunamadı",
-                fill="gray"
-            )
+            self._clear_detail()
+            self._clear_clusters()
+            if self.empty_item is None:
+                self.empty_item = self.canvas.create_text(
+                    self.width / 2,
+                    self.height / 2,
+                    text="Topoloji verisi bulunamadı",
+                    fill="gray"
+                )
             return
         
-        # Düğüm pozisyonlarını hesapla ve çiz
-        positions = self._calculate_node_positions(list(nodes_data.keys()))
+        if self.empty_item is not None:
+            self.canvas.delete(self.empty_item)
+            self.empty_item = None
         
-        # Önce bağlantıları çiz (düğümlerin altında kalsın)
-        for conn in connections:
-            from_user = conn.get("from")
-            to_user = conn.get("to")
-            quality = conn.get("quality", 0)
+        # Pozisyonlar sadece üyelik, bağlantı kümesi veya boyut değişince yeniden hesaplanır
+        layout_key = (
+            frozenset(nodes_data),
+            frozenset((conn.get("from"), conn.get("to")) for conn in connections),
+            self.width,
+            self.height
+        )
+        if layout_key != self.layout_key:
+            self.layout_key = layout_key
+            self._request_layout(nodes_data, connections)
+        elif edges_changed:
+            self._index_edges()
+        
+        self._render()
+    
+    def _render(self):
+        """Görünür bölgeyi yakınlaştırma düzeyine göre çizer
+        
+        Görüş alanındaki düğümler ve bağlantılar uzamsal indekslerden sorgulanır;
+        kaydırma/yakınlaştırma maliyeti topolojinin tamamıyla değil, ekranda
+        görünenle orantılıdır.
+        """
+        zoom = self.zoom
+        view_width = self.canvas.winfo_width()
+        view_height = self.canvas.winfo_height()
+        if view_width <= 1 or view_height <= 1:
+            view_width, view_height = self.width, self.height
+        
+        radius = max(3, self.node_radius * min(1.0, zoom))
+        self.visible_radius = radius
+        pad = radius + 40  # Etiketler için pay
+        bounds = (-pad, -pad, view_width + pad, view_height + pad)
+        
+        if zoom < self.cluster_zoom:
+            # Uzak görünüm: tek tek düğümler yerine kümeler ve küme arası bağlantılar
+            self._clear_detail()
+            self._render_clusters(bounds)
+            return
+        self._clear_clusters()
+        
+        left, top, right, bottom = bounds
+        world = self._to_world(bounds)
+        visible = {}
+        for username in self.position_index.query(*world):
+            if username in self.nodes_data:
+                visible[username] = self._to_screen(self.positions[username])
+        show_labels = zoom >= self.label_zoom
+        
+        # Görüş alanından çıkan veya ayrılan düğümlerin öğelerini sil
+        for username in list(self.node_items):
+            if username not in visible:
+                self._delete_node(username)
+        
+        # Bağlantılar: indeksteki adaylardan sınır kutusu görüş alanıyla kesişenler çizilir
+        seen_edges = set()
+        edge_created = False
+        for key in self.edge_index.query(*world):
+            conn = self.edge_data.get(key)
+            from_pos = self.positions.get(key[0])
+            to_pos = self.positions.get(key[1])
+            if conn is None or from_pos is None or to_pos is None:
+                continue
+            from_pos = self._to_screen(from_pos)
+            to_pos = self._to_screen(to_pos)
+            if (max(from_pos[0], to_pos[0]) < left or min(from_pos[0], to_pos[0]) > right or
+                    max(from_pos[1], to_pos[1]) < top or min(from_pos[1], to_pos[1]) > bottom):
+                continue
+            
+            seen_edges.add(key)
+            if self._update_edge(key, from_pos, to_pos, conn.get("quality", 0), show_labels):
+                edge_created = True
+        
+        for key in list(self.edge_items):
+            if key not in seen_edges:
+                self._delete_edge(key)
+        
+        # Düğümler
+        for username, pos in visible.items():
+            self._update_node(username, pos, radius, self.nodes_data[username], show_labels)
+        
+        # Yeni bağlantı çizgileri düğümlerin altında kalsın
+        if edge_created:
+            self.canvas.tag_raise("node")
+            if self.current_tooltip:
+                self.canvas.tag_raise(self.current_tooltip)
+    
+    def _to_screen(self, pos):
+        """Dünya koordinatını ekran koordinatına çevirir"""
+        return (pos[0] * self.zoom + self.offset_x, pos[1] * self.zoom + self.offset_y)
+    
+    def _to_world(self, bounds):
+        """Ekran dikdörtgenini dünya koordinatlarına çevirir"""
+        left, top, right, bottom = bounds
+        return (
+            (left - self.offset_x) / self.zoom,
+            (top - self.offset_y) / self.zoom,
+            (right - self.offset_x) / self.zoom,
+            (bottom - self.offset_y) / self.zoom
+        )
+    
+    def _cluster_members(self, bounds):
+        """Ekran dikdörtgenindeki düğümleri küme hücrelerine dağıtır
+        
+        {hücre: [x toplamı, y toplamı, düğüm sayısı]} ve {username: hücre} döndürür.
+        """
+        cell = self.cluster_cell
+        members = {}
+        sums = {}
+        for username in self.position_index.query(*self._to_world(bounds)):
+            if username not in self.nodes_data:
+                continue
+            x, y = self._to_screen(self.positions[username])
+            key = (int(x // cell), int(y // cell))
+            members[username] = key
+            acc = sums.get(key)
+            if acc is None:
+                sums[key] = [x, y, 1]
+            else:
+                acc[0] += x
+                acc[1] += y
+                acc[2] += 1
+        return sums, members
+    
+    def _render_clusters(self, bounds):
+        """Uzaklaştırılmış görünümde düğümleri ızgara hücrelerinde toplar
+        
+        Bağlantılar hücre çiftleri başına tek çizgiye indirgenir (ortalama kalite).
+        Sadece görüş alanına değen hücreler ve onlardan çıkan bağlantıların karşı
+        uçtaki hücreleri hesaplanır.
+        """
+        left, top, right, bottom = bounds
+        cell = self.cluster_cell
+        
+        # Görüş alanına değen hücrelerin tamamı: sınırlar hücre kenarlarına genişletilir
+        cell_bounds = (
+            math.floor(left / cell) * cell,
+            math.floor(top / cell) * cell,
+            (math.floor(right / cell) + 1) * cell,
+            (math.floor(bottom / cell) + 1) * cell
+        )
+        sums, members = self._cluster_members(cell_bounds)
+        centers = {key: (sx / count, sy / count, count) for key, (sx, sy, count) in sums.items()}
+        visible = {
+            key: center for key, center in centers.items()
+            if left <= center[0] <= right and top <= center[1] <= bottom
+        }
+        
+        def center_of(key):
+            """Görüş alanı dışındaki hücrenin ağırlık merkezi (sadece o hücre sorgulanır)"""
+            if key not in centers:
+                i, j = key
+                acc = self._cluster_members((i * cell, j * cell, (i + 1) * cell, (j + 1) * cell))[0].get(key)
+                centers[key] = (acc[0] / acc[2], acc[1] / acc[2], acc[2]) if acc else None
+            return centers[key]
+        
+        # Küme çiftleri arası bağlantılar (en az bir ucu görünür), görünür düğümlerin komşuluğundan
+        links = {}  # {(hücre1, hücre2): [kalite toplamı, bağlantı sayısı]}
+        for username, a in members.items():
+            if a not in visible:
+                continue
+            for edge in self.adjacency.get(username, ()):
+                other = edge[1] if edge[0] == username else edge[0]
+                pos = self.positions.get(other)
+                if other not in self.nodes_data or pos is None:
+                    continue
+                b = members.get(other)
+                if b is None:
+                    x, y = self._to_screen(pos)
+                    b = (int(x // cell), int(y // cell))
+                # İki ucu da görünürse bağlantı bir kez, ilk uçtan sayılır
+                if a == b or (b in visible and edge[0] != username):
+                    continue
+                if center_of(b) is None:
+                    continue
+                quality = self.edge_data[edge].get("quality", 0)
+                pair = (a, b) if a <= b else (b, a)
+                acc = links.get(pair)
+                if acc is None:
+                    links[pair] = [quality, 1]
+                else:
+                    acc[0] += quality
+                    acc[1] += 1
+        
+        for pair in list(self.cluster_edge_items):
+            if pair not in links:
+                self.canvas.delete(self.cluster_edge_items.pop(pair)["line"])
+        
+        edge_created = False
+        for pair, (quality_sum, count) in links.items():
+            a, b = pair
+            coords = (centers[a][0], centers[a][1], centers[b][0], centers[b][1])
+            color = self._edge_style(quality_sum / count)[0]
+            style = (color, 1 + min(6, int(math.log2(count))))
+            items = self.cluster_edge_items.get(pair)
+            
+            if items is None:
+                self.cluster_edge_items[pair] = {
+                    "line": self.canvas.create_line(*coords, fill=color, width=style[1], tags=("connection",)),
+                    "coords": coords,
+                    "style": style
+                }
+                edge_created = True
+                continue
             
-            if from_user in positions and to_user in positions:
-                from_x, from_y = positions[from_user]
-                to_x, to_y = positions[to_user]
-                self._draw_connection(from_x, from_y, to_x, to_y, quality)
-        
-        # Sonra düğümleri çiz
-        for username, pos in positions.items():
-            x, y = pos
-            node_data = nodes_data.get(username, {})
-            latency = node_data.get("latency", 0)
+            if items["coords"] != coords:
+                self.canvas.coords(items["line"], *coords)
+                items["coords"] = coords
+            if items["style"] != style:
+                self.canvas.itemconfig(items["line"], fill=color, width=style[1])
+                items["style"] = style
+        
+        for key in list(self.cluster_items):
+            if key not in visible:
+                items = self.cluster_items.pop(key)
+                self.canvas.delete(items["oval"], items["text"])
+        
+        for key, (x, y, count) in visible.items():
+            r = min(cell / 2, 4 + 2 * math.sqrt(count))
+            pos = (x, y, r)
+            items = self.cluster_items.get(key)
             
-            # Düğümü çiz
-            self._draw_node(username, x, y, latency)
+            if items is None:
+                self.cluster_items[key] = {
+                    "oval": self.canvas.create_oval(
+                        x - r, y - r, x + r, y + r,
+                        fill="#1877f2",
+                        outline="",
+                        tags=("node",)
+                    ),
+                    "text": self.canvas.create_text(
+                        x, y,
+                        text=str(count),
+                        fill="white",
+                        font=("Segoe UI", 7, "bold"),
+                        tags=("node",)
+                    ),
+                    "pos": pos,
+                    "count": count
+                }
+                continue
+            
+            if items["pos"] != pos:
+                self.canvas.coords(items["oval"], x - r, y - r, x + r, y + r)
+                self.canvas.coords(items["text"], x, y)
+                items["pos"] = pos
+            if items["count"] != count:
+                self.canvas.itemconfig(items["text"], text=str(count))
+                items["count"] = count
+        
+        if edge_created:
+            self.canvas.tag_raise("node")
+    
+    def _clear_detail(self):
+        """Tek tek çizilmiş düğüm ve bağlantı öğelerini siler"""
+        for username in list(self.node_items):
+            self._delete_node(username)
+        for key in list(self.edge_items):
+            self._delete_edge(key)
     
-    def _calculate_node_positions(self, usernames):
-        """Düğümlerin daire üzerindeki pozisyonlarını hesaplar"""
-        positions = {}
-        
-        count = len(usernames)
-        if count == 0:
-            return positions
-        
-        # Tek düğüm varsa merkezde olsun
-        if count == 1:
-            positions[usernames[0]] = (self.width / 2, self.height / 2)
-            return positions
-        
-        # Çoklu düğümler için daire üzerinde yerleştir
-        radius = min(self.width, self.height) * 0.35
-        center_x = self.width / 2
-        center_y = self.height / 2
-        
-        for i, username in enumerate(usernames):
-            angle = i * (2 * math.pi / count)
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            positions[username] = (x, y)
-        
-        return positions
+    def _clear_clusters(self):
+        """Küme görünümünün öğelerini siler"""
+        for items in self.cluster_items.values():
+            self.canvas.delete(items["oval"], items["text"])
+        for items in self.cluster_edge_items.values():
+            self.canvas.delete(items["line"])
+        self.cluster_items = {}
+        self.cluster_edge_items = {}
+    
+    def _request_layout(self, nodes_data, connections):
+        """Yerleşimi arka planda yeniden hesaplatır, o ana kadar geçici pozisyon verir"""
+        usernames = sorted(nodes_data)
+        
+        if not NUMPY_AVAILABLE:
+            # NumPy yoksa daire düzeni (hızlı, doğrudan Tk thread'inde)
+            self._set_positions(circle_layout(usernames, self.width, self.height))
+            return
+        
+        # Ayrılanları çıkar, yenileri sonuç gelene kadar merkeze yakın yerleştir
+        positions = {name: self.positions[name] for name in usernames if name in self.positions}
+        spread = min(self.width, self.height) / 4
+        for name in usernames:
+            if name not in positions:
+                positions[name] = (
+                    self.width / 2 + random.uniform(-spread, spread),
+                    self.height / 2 + random.uniform(-spread, spread)
+                )
+        self._set_positions(positions)
+        
+        edges = [(conn.get("from"), conn.get("to"), conn.get("latency")) for conn in connections]
+        self.layout.width = self.width
+        self.layout.height = self.height
+        
+        with self.layout_lock:
+            # Bekleyen eski istek varsa yenisi onun yerine geçer
+            self.layout_request = (usernames, edges, dict(positions))
+            if self.layout_thread is None:
+                self.layout_thread = threading.Thread(target=self._layout_worker)
+                self.layout_thread.daemon = True
+                self.layout_thread.start()
+                self.master.after(50, self._poll_layout)
     
-    def _draw_node(self, username, x, y, latency=0):
-        """Düğüm çizer"""
+    def _layout_worker(self):
+        """Bekleyen yerleşim isteklerini sırayla hesaplar (arka plan thread'i)"""
+        while True:
+            with self.layout_lock:
+                request = self.layout_request
+                self.layout_request = None
+                if request is None:
+                    self.layout_thread = None
+                    return
+            
+            try:
+                result = self.layout.compute(*request)
+            except Exception as e:
+                print(f"[TOPO] Yerleşim hesaplama hatası: {e}")
+                continue
+            
+            with self.layout_lock:
+                self.layout_result = result
+    
+    def _poll_layout(self):
+        """Hesaplanan yerleşimi Tk thread'inde uygular"""
+        with self.layout_lock:
+            result = self.layout_result
+            self.layout_result = None
+            running = self.layout_thread is not None
+        
+        if result is not None and self.last_topology is not None:
+            # Sonuç hesaplanırken katılan düğümlerin geçici pozisyonu korunur
+            positions = dict(self.positions)
+            positions.update((name, pos) for name, pos in result.items() if name in positions)
+            self._set_positions(positions)
+            self._render()
+        
+        if running:
+            self.master.after(50, self._poll_layout)
+    
+    def _node_style(self, node_data):
+        """Düğüm verisinden (dolgu rengi, kenar rengi, gecikme metni) üretir"""
+        latency = node_data.get("latency") or 0
+        loss = node_data.get("loss") or 0
+        
         # Gecikme süresine göre renk belirle
-        if latency == 0:
+        if latency == 0 and loss == 0:
             color = "#1877f2"  # Varsayılan mavi
         else:
-            # Düşük gecikme: yeşil, yüksek gecikme: kırmızı
-            normalized_latency = min(1.0, latency / 1000)  # 1 saniye veya fazlası için maksimum kırmızı
-            hue = 0.33 * (1 - normalized_latency)  # 0.33 = yeşil, 0 = kırmızı
+            # Kuyruk gecikmesi (p99) ve kayıp oranından kötü olanı renge yansır
+            tail_latency = node_data.get("p99") or latency
+            normalized_latency = min(1.0, tail_latency / 1000)  # 1 saniye veya fazlası için maksimum kırmızı
+            severity = max(normalized_latency, min(1.0, loss * 4))  # %25 kayıp tam kırmızı
+            hue = 0.33 * (1 - severity)  # 0.33 = yeşil, 0 = kırmızı
             r, g, b = colorsys.hsv_to_rgb(hue, 0.8, 0.9)
             color = f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
         
-        # Düğüm dairesi
-        node_id = self.canvas.create_oval(
-            x - self.node_radius, 
-            y - self.node_radius,
-            x + self.node_radius, 
-            y + self.node_radius,
-            fill=color,
-            outline=""
-        )
-        
-        # Kullanıcı adı
-        self.canvas.create_text(
-            x,
-            y + self.node_radius + 10,
-            text=username,
-            fill="#333333",
-            font=("Segoe UI", 8)
-        )
-        
-        # Gecikme bilgisi
-        if latency > 0:
-            self.canvas.create_text(
-                x,
-                y,
-                text=f"{latency:.0f}ms",
-                fill="white",
-                font=("Segoe UI", 7, "bold")
-            )
+        outline = "#d32f2f" if loss > 0.05 else ""
+        text = f"{latency:.0f}ms" if latency > 0 else ""
+        return color, outline, text
+    
+    def _update_node(self, username, pos, r, node_data, show_labels=True):
+        """Düğümün öğelerini oluşturur veya sadece değişen özelliklerini günceller"""
+        x, y = pos
+        pos = (x, y, r)
+        color, outline, text = self._node_style(node_data)
+        label = username if show_labels else ""
+        style = (color, outline, text if show_labels else "", label)
+        items = self.node_items.get(username)
+        
+        if items is None:
+            color, outline, text, label = style
+            items = {
+                # Düğüm dairesi
+                "oval": self.canvas.create_oval(
+                    x - r, y - r, x + r, y + r,
+                    fill=color,
+                    outline=outline,
+                    width=2,
+                    tags=("node",)
+                ),
+                # Kullanıcı adı
+                "label": self.canvas.create_text(
+                    x,
+                    y + r + 10,
+                    text=label,
+                    fill="#333333",
+                    font=("Segoe UI", 8),
+                    tags=("node",)
+                ),
+                # Gecikme bilgisi
+                "latency": self.canvas.create_text(
+                    x,
+                    y,
+                    text=text,
+                    fill="white",
+                    font=("Segoe UI", 7, "bold"),
+                    tags=("node",)
+                ),
+                "pos": pos,
+                "style": style
+            }
+            self.node_items[username] = items
+        else:
+            if items["pos"] != pos:
+                self.canvas.coords(items["oval"], x - r, y - r, x + r, y + r)
+                self.canvas.coords(items["label"], x, y + r + 10)
+                self.canvas.coords(items["latency"], x, y)
+                items["pos"] = pos
+            
+            if items["style"] != style:
+                color, outline, text, label = style
+                self.canvas.itemconfig(items["oval"], fill=color, outline=outline)
+                self.canvas.itemconfig(items["latency"], text=text)
+                self.canvas.itemconfig(items["label"], text=label)
+                items["style"] = style
         
         # Düğüm pozisyonunu kaydet
-        self.nodes[username] = (x, y, node_id)
+        self.nodes[username] = (x, y, items["oval"])
+    
+    def _delete_node(self, username):
+        """Ayrılan düğümün canvas öğelerini siler"""
+        items = self.node_items.pop(username)
+        self.canvas.delete(items["oval"], items["label"], items["latency"])
+        self.nodes.pop(username, None)
+        if self.tooltip_user == username:
+            self.hide_tooltip()
     
-    def _draw_connection(self, x1, y1, x2, y2, quality=0):
-        """İki düğüm arasındaki bağlantıyı çizer"""
+    def _edge_style(self, quality):
+        """Kaliteden (renk, kalınlık, kesikli çizgi, etiket) üretir"""
         # Kaliteye göre renk belirle
         normalized_quality = max(0, min(100, quality)) / 100
         hue = 0.33 * normalized_quality  # 0.33 = yeşil, 0 = kırmızı
@@ -256,26 +741,54 @@ class TopologyView:
         
         # Kaliteye göre çizgi kalınlığını belirle
         thickness = 1 + int(normalized_quality * 2)
-        
-        # Çizgiyi çiz
-        line_id = self.canvas.create_line(
-            x1, y1, x2, y2,
-            fill=color,
-            width=thickness,
-            dash=(5, 2) if quality < 50 else None,
-            tags=("connection",)
-        )
-        
-        # Kalite etiketi
-        mid_x = (x1 + x2) / 2
-        mid_y = (y1 + y2) / 2
-        self.canvas.create_text(
-            mid_x,
-            mid_y,
-            text=f"{quality:.0f}%",
-            fill="#333333",
-            font=("Segoe UI", 7),
-            tags=("connection_label",)
-        )
-        
-        return line_id
+        dash = (5, 2) if quality < 50 else ""
+        return color, thickness, dash, f"{quality:.0f}%"
+    
+    def _update_edge(self, key, from_pos, to_pos, quality, show_labels=True):
+        """Bağlantının öğelerini oluşturur veya günceller; yeni oluşturulduysa True döner"""
+        coords = (from_pos[0], from_pos[1], to_pos[0], to_pos[1])
+        mid = ((from_pos[0] + to_pos[0]) / 2, (from_pos[1] + to_pos[1]) / 2)
+        style = self._edge_style(quality)
+        if not show_labels:
+            style = style[:3] + ("",)
+        items = self.edge_items.get(key)
+        
+        if items is None:
+            color, thickness, dash, text = style
+            self.edge_items[key] = {
+                "line": self.canvas.create_line(
+                    *coords,
+                    fill=color,
+                    width=thickness,
+                    dash=dash,
+                    tags=("connection",)
+                ),
+                # Kalite etiketi
+                "label": self.canvas.create_text(
+                    *mid,
+                    text=text,
+                    fill="#333333",
+                    font=("Segoe UI", 7),
+                    tags=("connection_label",)
+                ),
+                "coords": coords,
+                "style": style
+            }
+            return True
+        
+        if items["coords"] != coords:
+            self.canvas.coords(items["line"], *coords)
+            self.canvas.coords(items["label"], *mid)
+            items["coords"] = coords
+        
+        if items["style"] != style:
+            color, thickness, dash, text = style
+            self.canvas.itemconfig(items["line"], fill=color, width=thickness, dash=dash)
+            self.canvas.itemconfig(items["label"], text=text)
+            items["style"] = style
+        return False
+    
+    def _delete_edge(self, key):
+        """Kaldırılan bağlantının canvas öğelerini siler"""
+        items = self.edge_items.pop(key)
+        self.canvas.delete(items["line"], items["label"])